@@ -8,7 +8,7 @@ from fastapi import FastAPI, Header, HTTPException, WebSocket, WebSocketDisconne
 
 from utils import trading_controller
 from database import signal_logger, sqlite_logger
-from execution.ws_signal_listener import get_top_reasons
+from execution.ws_signal_listener import get_pipeline_stats, get_top_reasons
 
 app = FastAPI()
 
@@ -104,6 +104,8 @@ def status():
         "running": bot_state["running"],
         "strategy": bot_state["strategy"],
         "top_reasons": get_top_reasons(),
+        "signal_log": signal_logger.signal_log_stats(),
+        "signal_pipeline": get_pipeline_stats(),
     }
 
 
@@ -1,16 +1,12 @@
 import pandas as pd
 
+from utils.ohlcv_store import load_file
+
 
 def load_csv(filepath: str, start: str | None = None, end: str | None = None) -> pd.DataFrame:
-    """Muat data CSV dan filter sesuai rentang waktu."""
+    """Muat data CSV dan filter sesuai rentang waktu.
+
+    Pembacaan lewat store Parquet; CSV dimigrasikan otomatis sekali.
+    """
 
-    df = pd.read_csv(filepath)
-    df.columns = [col.lower() for col in df.columns]
-    df["timestamp"] = pd.to_datetime(df["timestamp"])
-    df.sort_values("timestamp", inplace=True)
-    if start:
-        df = df[df["timestamp"] >= pd.to_datetime(start)]
-    if end:
-        df = df[df["timestamp"] <= pd.to_datetime(end)]
-    df.set_index("timestamp", inplace=True)
-    return df
+    return load_file(filepath, start, end)
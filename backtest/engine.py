@@ -2,9 +2,11 @@ import json
 import os
 import pandas as pd
 import logging
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, Iterator
 
 from strategies_base.strategy_manager import StrategyManager
-from strategies.scalping_strategy import confirm_by_higher_tf
+from strategies.scalping_strategy import higher_tf_confirmation
 from risk_management.position_manager import apply_trailing_sl
 from execution.order_monitor import check_exit_condition
 from risk_management.risk_calculator import calculate_order_qty
@@ -13,6 +15,16 @@ from .data_loader import load_csv
 from .metrics import calculate_metrics
 
 
+def trim_window(df: pd.DataFrame, start: str | None = None, end: str | None = None) -> pd.DataFrame:
+    """Urutkan ``df`` lalu potong ke rentang ``start``..``end`` (inklusif)."""
+    df = df.sort_index()
+    if start:
+        df = df[df.index >= pd.to_datetime(start)]
+    if end:
+        df = df[df.index <= pd.to_datetime(end)]
+    return df
+
+
 def run_backtest(
     df: pd.DataFrame,
     initial_capital: float = 22,
@@ -25,18 +37,20 @@ def run_backtest(
     timeframe: str = "5m",
     risk_per_trade: float = 1.0,
     leverage: int = 14,
+    vectorized: bool = True,
+    htf: pd.DataFrame | None = None,
 ):
     """Jalankan backtest bar-per-bar secara modular.
 
     Parameter start dan end dapat berupa string waktu yang dapat
-    diubah ke pandas.Timestamp.
+    diubah ke pandas.Timestamp. Bila ``vectorized`` aktif dan strategi
+    mendukungnya, sinyal dihitung sekali untuk seluruh data; jika tidak,
+    sinyal dihitung ulang pada potongan data setiap bar. ``htf`` berisi
+    bar 15m tertutup (mis. dari :mod:`utils.tf_cache`) untuk konfirmasi
+    timeframe besar; tanpa itu bar 15m dibentuk dari ``df``.
     """
 
-    df = df.sort_index()
-    if start:
-        df = df[df.index >= pd.to_datetime(start)]
-    if end:
-        df = df[df.index <= pd.to_datetime(end)]
+    df = trim_window(df, start, end)
 
     config = config or {}
     config.setdefault("score_threshold", score_threshold)
@@ -46,6 +60,9 @@ def run_backtest(
         f"Backtest menggunakan strategi {strategy.__class__.__name__}"
     )
     df = strategy.apply_indicators(df)
+    df = df.join(higher_tf_confirmation(df, config, htf))
+    signals = strategy.generate_signals_vectorized(df.copy(), symbol, timeframe) if vectorized else None
+    rows = signals.to_dict("records") if signals is not None else None
 
     capital = initial_capital
     risk_pct = risk_per_trade / 100
@@ -56,11 +73,15 @@ def run_backtest(
     trade_count: dict[tuple[str, str], int] = {}
 
     for i in range(len(df)):
-        df_slice = df.iloc[: i + 1].copy()
-        df_slice = strategy.generate_signals(df_slice, symbol)
-        row = df_slice.iloc[-1]
+        ts = df.index[i]
+        if rows is not None:
+            row = rows[i]
+        else:
+            df_slice = df.iloc[: i + 1].copy()
+            df_slice = strategy.generate_signals(df_slice, symbol, timeframe)
+            row = df_slice.iloc[-1]
         price = row["close"]
-        time = df_slice.index[-1].isoformat()
+        time = ts.isoformat()
 
         if active_trade:
             hold += 1
@@ -81,7 +102,7 @@ def run_backtest(
                 breakeven_pct=active_trade.breakeven_threshold,
             )
 
-            long_ok, short_ok = confirm_by_higher_tf(df_slice, config)
+            long_ok, short_ok = row["htf_long_ok"], row["htf_short_ok"]
             need_close = check_exit_condition(
                 price,
                 active_trade.trailing_sl,
@@ -112,13 +133,13 @@ def run_backtest(
         if not active_trade:
             allow_long = direction in ("long", "both")
             allow_short = direction in ("short", "both")
-            hour = df_slice.index[-1].hour
+            hour = ts.hour
             start_h = config.get("trade_start_hour", 0) if config else 0
             end_h = config.get("trade_end_hour", 24) if config else 24
             if not (start_h <= hour < end_h):
                 continue
 
-            date_key = df_slice.index[-1].date().isoformat()
+            date_key = ts.date().isoformat()
             max_trades = config.get("max_trades_per_day", 4) if config else 4
             count = trade_count.get((symbol, date_key), 0)
             if count >= max_trades:
@@ -238,12 +259,72 @@ def run_backtest(
     return trades, equity_df, capital
 
 
+def _backtest_symbol(
+    sym: str,
+    timeframe: str,
+    start: str | None,
+    end: str | None,
+    kwargs: dict,
+) -> tuple[str, dict[str, float]]:
+    """Backtest satu simbol; dipakai langsung maupun di proses worker."""
+    path = os.path.join(
+        "data", "historical_data", timeframe, f"{sym}_{timeframe}.csv"
+    )
+    df = load_csv(path, start, end)
+    trades, equity, _ = run_backtest(
+        df,
+        symbol=sym,
+        start=start,
+        end=end,
+        timeframe=timeframe,
+        **kwargs,
+    )
+    met = calculate_metrics(trades)
+    return sym, {
+        "winrate": met.get("Persentase Menang", 0.0),
+        "profit_factor": met.get("Profit Factor", 0.0),
+        "trades": met.get("Total Transaksi", 0),
+        "avg_win": met.get("Rata-rata Profit", 0.0),
+        "avg_loss": met.get("Rata-rata Rugi", 0.0),
+    }
+
+
+def iter_backtest_symbols(
+    symbols: list[str],
+    timeframe: str,
+    start: str | None = None,
+    end: str | None = None,
+    workers: int = 1,
+    **kwargs,
+) -> Iterator[tuple[str, dict[str, float]]]:
+    """Hasilkan ``(simbol, metrik)`` segera setelah tiap simbol selesai.
+
+    Dengan ``workers > 1`` simbol dibagi ke process pool; tiap worker
+    memuat CSV-nya sendiri sehingga hanya metrik yang dikirim balik.
+    Urutan hasil mengikuti waktu selesai, bukan urutan ``symbols``.
+    """
+    if workers <= 1 or len(symbols) <= 1:
+        for sym in symbols:
+            yield _backtest_symbol(sym, timeframe, start, end, kwargs)
+        return
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(symbols))) as executor:
+        futures = [
+            executor.submit(_backtest_symbol, sym, timeframe, start, end, kwargs)
+            for sym in symbols
+        ]
+        for fut in as_completed(futures):
+            yield fut.result()
+
+
 def backtest_symbols(
     symbols: list[str],
     timeframe: str,
     start: str | None = None,
     end: str | None = None,
     export_path: str | None = None,
+    workers: int = 1,
+    on_result: Callable[[str, dict[str, float]], None] | None = None,
     **kwargs,
 ):
     """Jalankan backtest untuk banyak simbol dan simpan metrik.
@@ -258,32 +339,24 @@ def backtest_symbols(
         Rentang waktu data.
     export_path
         Jika diberikan, hasil metrik disimpan ke berkas JSON ini.
+    workers
+        Jumlah proses paralel; ``1`` berarti berjalan serial.
+    on_result
+        Dipanggil ``(simbol, metrik)`` begitu satu simbol selesai.
     kwargs
         Parameter tambahan untuk `run_backtest`.
     """
 
-    hasil: dict[str, dict[str, float]] = {}
-    for sym in symbols:
-        path = os.path.join(
-            "data", "historical_data", timeframe, f"{sym}_{timeframe}.csv"
-        )
-        df = load_csv(path, start, end)
-        trades, equity, _ = run_backtest(
-            df,
-            symbol=sym,
-            start=start,
-            end=end,
-            timeframe=timeframe,
-            **kwargs,
-        )
-        met = calculate_metrics(trades)
-        hasil[sym] = {
-            "winrate": met.get("Persentase Menang", 0.0),
-            "profit_factor": met.get("Profit Factor", 0.0),
-            "trades": met.get("Total Transaksi", 0),
-            "avg_win": met.get("Rata-rata Profit", 0.0),
-            "avg_loss": met.get("Rata-rata Rugi", 0.0),
-        }
+    selesai: dict[str, dict[str, float]] = {}
+    for sym, met in iter_backtest_symbols(
+        symbols, timeframe, start=start, end=end, workers=workers, **kwargs
+    ):
+        selesai[sym] = met
+        if on_result:
+            on_result(sym, met)
+
+    # Urutan ekspor tetap mengikuti urutan simbol input
+    hasil = {sym: selesai[sym] for sym in symbols if sym in selesai}
 
     if export_path:
         os.makedirs(os.path.dirname(export_path), exist_ok=True)
@@ -291,4 +364,3 @@ def backtest_symbols(
             json.dump(hasil, fh, indent=2)
 
     return hasil
-
@@ -5,14 +5,22 @@ from __future__ import annotations
 import json
 import logging
 import os
-import random
 
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from functools import partial
 
-from backtest.engine import run_backtest
+import pandas as pd
+
+from backtest.engine import run_backtest, trim_window
 from backtest.metrics import calculate_metrics
+from backtest.search import GuidedSampler, sample_unique, successive_halving
+from backtest.shared_frame import SharedFrame, SharedFrameSpec, attach_frame
+from indicators import compute_indicators, data_fingerprint, indicator_cache
+from strategies_base.strategy_manager import StrategyManager
 from utils.historical_data import load_historical_data
+from utils.ohlcv_mmap import OHLCV_COLUMNS, open_mmap
 from utils.strategy_config import load_strategy_config
+from utils.tf_cache import load_timeframe
 from tqdm import tqdm
 
 try:  # streamlit opsional
@@ -23,6 +31,9 @@ except Exception:  # pragma: no cover
 
 optimal_params_in_memory: dict[str, dict] = {}
 
+# Riwayat 15m sebelum bar pertama agar indikator konfirmasi HTF sudah matang
+HTF_WARMUP = pd.Timedelta(days=2)
+
 
 # Nilai dasar bila simbol belum memiliki konfigurasi
 DEFAULT_BASE = {
@@ -63,9 +74,142 @@ def build_local_grid(base: dict, delta: float = 0.2) -> dict[str, list]:
     return grid
 
 
-def _sample_params(grid: dict[str, list]) -> dict:
-    """Ambil kombinasi parameter secara acak dari grid lokal."""
-    return {k: random.choice(v) for k, v in grid.items()}
+def _run_trial(df: pd.DataFrame, p: dict, ctx: dict, bars: int | None = None) -> tuple[dict, dict]:
+    # run_backtest tidak mengubah input (sort_index membuat frame baru),
+    # jadi view read-only bisa dipakai langsung tanpa copy per trial
+    data = df.tail(bars) if bars else df
+    trades, equity, _ = run_backtest(
+        data,
+        symbol=ctx["symbol"],
+        initial_capital=ctx["initial_capital"],
+        config=p,
+        score_threshold=p.get("score_threshold", 2.0),
+        timeframe=ctx["tf"],
+        start=ctx["start"],
+        end=ctx["end"],
+        htf=ctx.get("htf"),
+    )
+    hasil = calculate_metrics(trades, equity)
+    metrik = hasil[0] if isinstance(hasil, tuple) else hasil
+    metrik.setdefault("Rasio Sharpe", 0.0)
+    return p, metrik
+
+
+def _fixed_indicator_specs(grid: dict[str, list]) -> dict[str, dict]:
+    """Indikator strategi yang parameternya sama untuk semua nilai grid."""
+
+    def spec(config: dict) -> tuple[list[str], dict[str, dict]]:
+        strat = StrategyManager.get("ScalpingStrategy")
+        strat.load_config(config)
+        return strat.indicator_spec()
+
+    first = {k: v[0] for k, v in grid.items() if v}
+    names, base = spec(first)
+    fixed = set(names)
+    for k, values in grid.items():
+        for v in values[1:]:
+            _, other = spec({**first, k: v})
+            fixed = {n for n in fixed if other.get(n) == base.get(n)}
+    return {n: base.get(n, {}) for n in names if n in fixed}
+
+
+def _shared_indicators(
+    df: pd.DataFrame, grid: dict[str, list], ctx: dict
+) -> tuple[pd.DataFrame, list[tuple]] | None:
+    """Hitung sekali di induk kolom indikator yang tidak bergantung trial.
+
+    :data:`indicators.indicator_cache` hidup per proses sehingga worker
+    process pool mulai dengan cache kosong. Kolom ini dibagikan lewat
+    shared memory lalu dimasukkan ke cache tiap worker oleh
+    :func:`_seed_indicator_cache`. Mengembalikan ``(kolom, entri)`` dengan
+    entri ``(nama, parameter, nama kolom)``, atau ``None``.
+    """
+    specs = _fixed_indicator_specs(grid)
+    data = trim_window(df, ctx["start"], ctx["end"])
+    if not specs or data.empty:
+        return None
+    frames, entries = [], []
+    for name, params in specs.items():
+        out = compute_indicators(data.copy(), [name], {name: params})
+        cols = [c for c in out.columns if c not in data.columns]
+        if cols:
+            frames.append(out[cols])
+            entries.append((name, params, tuple(cols)))
+    if not frames:
+        return None
+    return pd.concat(frames, axis=1), entries
+
+
+# State per proses worker: DataFrame yang menunjuk ke shared memory
+_worker_df: pd.DataFrame | None = None
+_worker_shm = None
+_worker_ind_shm = None
+_worker_ctx: dict = {}
+
+
+def _seed_indicator_cache(df: pd.DataFrame, ctx: dict) -> None:
+    """Isi cache indikator worker dengan kolom bersama dari induk."""
+    global _worker_ind_shm
+    shared = ctx.get("indicators")
+    if shared is None:
+        return
+    spec, entries = shared
+    cols, _worker_ind_shm = attach_frame(spec)
+    # Kunci cache memakai data yang sama persis dengan yang dilihat trial
+    data = trim_window(df, ctx["start"], ctx["end"])
+    if len(data) != len(cols):
+        return
+    fingerprint = data_fingerprint(data)
+    for name, params, names in entries:
+        result = cols[names[0]] if len(names) == 1 else cols[list(names)]
+        indicator_cache.put(indicator_cache.key(fingerprint, name, params), result.set_axis(data.index))
+
+
+def _init_worker(spec: SharedFrameSpec, ctx: dict) -> None:
+    global _worker_df, _worker_shm, _worker_ctx
+    _worker_df, _worker_shm = attach_frame(spec)
+    _worker_ctx = ctx
+    _seed_indicator_cache(_worker_df, ctx)
+
+
+def _init_worker_mmap(first: pd.Timestamp, last: pd.Timestamp, ctx: dict) -> None:
+    global _worker_df, _worker_ctx
+    _worker_df = open_mmap(ctx["symbol"], ctx["tf"], first, last)
+    _worker_ctx = ctx
+    _seed_indicator_cache(_worker_df, ctx)
+
+
+def _mmap_view(df: pd.DataFrame, symbol: str, tf: str) -> pd.DataFrame | None:
+    """View mmap yang identik dengan ``df``; None bila tidak tersedia."""
+    if df.empty or list(df.columns) != OHLCV_COLUMNS:
+        return None
+    try:
+        view = open_mmap(symbol, tf, df.index[0], df.index[-1])
+    except Exception as e:
+        logging.debug(f"mmap {symbol} {tf} tidak tersedia: {e}")
+        return None
+    if view is None or len(view) != len(df) or not view.index.equals(df.index):
+        return None
+    return view
+
+
+def _htf_frame(df: pd.DataFrame, symbol: str, tf: str) -> pd.DataFrame | None:
+    """Bar 15m tertutup dari cache timeframe turunan untuk konfirmasi HTF.
+
+    Diambil sekali per optimasi (dengan pemanasan indikator sebelum bar
+    pertama) sehingga trial tidak me-resample ``df`` berulang kali.
+    """
+    if df.empty or tf not in ("1m", "5m"):
+        return None
+    try:
+        return load_timeframe(symbol, "15m", df.index[0] - HTF_WARMUP, df.index[-1], base_tf=tf)
+    except Exception as e:
+        logging.debug(f"Cache 15m {symbol} tidak tersedia: {e}")
+        return None
+
+
+def _worker_trial(p: dict, bars: int | None = None) -> tuple[dict, dict]:
+    return _run_trial(_worker_df, p, _worker_ctx, bars)
 
 
 def optimize_strategy(
@@ -80,11 +224,29 @@ def optimize_strategy(
     fast_mode: bool = False,
     early_stop: bool = False,
     use_optimizer: bool = True,
+    executor: str | None = None,
+    search: str | None = None,
 ):
     """Cari kombinasi parameter terbaik dan simpan ke strategy_params.json.
 
     Prioritas seleksi berdasarkan winrate kemudian Profit Factor.
     Target minimum: winrate >= 75% dan Profit Factor > 3.
+
+    ``executor`` bernilai ``"process"`` (default, env ``OPT_EXECUTOR``) atau
+    ``"thread"``. Pada mode proses, data OHLCV ditaruh sekali di shared
+    memory dan tiap worker hanya menerima parameter trial. Cache indikator
+    bersifat per proses, jadi kolom indikator yang parameternya tetap di
+    seluruh grid dihitung sekali di induk dan ikut dibagikan ke worker;
+    indikator yang bergantung parameter trial hanya dipakai ulang di dalam
+    worker yang sama.
+
+    ``search`` (env ``OPT_SEARCH``) memilih cara mencari kandidat:
+    ``"random"`` (default) membacktest penuh ``n_iter`` sampel acak,
+    ``"halving"`` menyaring ``n_iter`` kandidat di jendela pendek dan hanya
+    mempromosikan sepertiga terbaik tiap rung ke data lebih panjang,
+    ``"guided"`` memakai model surrogate untuk mengusulkan parameter
+    berikutnya dari hasil sebelumnya. Gate MIN_WR/MIN_PF/MIN_SHARPE hanya
+    dinilai pada backtest data penuh.
     """
 
     cfg_strategy = load_strategy_config()
@@ -93,8 +255,10 @@ def optimize_strategy(
         return manual.get(symbol, manual.get("DEFAULT", {})), {}
 
     n_iter = n_iter or int(os.getenv("N_ITER", 30))
-    n_jobs = n_jobs or int(os.getenv("N_JOBS", 2))
-    n_jobs = max(1, min(n_jobs, 2))
+    n_jobs = n_jobs or int(os.getenv("N_JOBS", os.cpu_count() or 1))
+    n_jobs = max(1, min(n_jobs, n_iter))
+    executor = executor or os.getenv("OPT_EXECUTOR", "process")
+    search = search or os.getenv("OPT_SEARCH", "random")
     max_bars = max_bars or int(os.getenv("MAX_BARS", 1000))
 
     df = load_historical_data(symbol, tf, start, end)
@@ -125,70 +289,112 @@ def optimize_strategy(
     MIN_SHARPE = 1.0
     MIN_AVG = 0.0
 
-    def single_trial(p: dict) -> tuple[dict, dict]:
-        trades, equity, _ = run_backtest(
-            df.copy(),
-            symbol=symbol,
-            initial_capital=initial_capital,
-            config=p,
-            score_threshold=p.get("score_threshold", 2.0),
-            timeframe=tf,
-            start=start,
-            end=end,
+    ctx = {
+        "symbol": symbol,
+        "initial_capital": initial_capital,
+        "tf": tf,
+        "start": start,
+        "end": end,
+        "htf": _htf_frame(df, symbol, tf),
+    }
+
+    shared: SharedFrame | None = None
+    shared_ind: SharedFrame | None = None
+    if executor == "process" and n_jobs > 1:
+        indicators = _shared_indicators(df, grid, ctx)
+        if indicators is not None:
+            shared_ind = SharedFrame(indicators[0])
+            ctx["indicators"] = (shared_ind.spec, indicators[1])
+        # Utamakan layout mmap di disk; worker membukanya sendiri tanpa
+        # salinan. Bila tidak ada, salin sekali ke shared memory.
+        if _mmap_view(df, symbol, tf) is not None:
+            init, initargs = _init_worker_mmap, (df.index[0], df.index[-1], ctx)
+        else:
+            shared = SharedFrame(df)
+            init, initargs = _init_worker, (shared.spec, ctx)
+        pool = ProcessPoolExecutor(
+            max_workers=n_jobs,
+            initializer=init,
+            initargs=initargs,
         )
-        hasil = calculate_metrics(trades, equity)
-        metrik = hasil[0] if isinstance(hasil, tuple) else hasil
-        metrik.setdefault("Rasio Sharpe", 0.0)
-        return p, metrik
-
-    futures = []
-    with ThreadPoolExecutor(max_workers=n_jobs) as executor:
-        while len(futures) < n_iter:
-            params = _sample_params(grid)
-            key = tuple(sorted(params.items()))
-            if key in tried:
-                continue
-            tried.add(key)
-            futures.append(executor.submit(single_trial, params))
-
-        for fut in tqdm(as_completed(futures), total=len(futures), desc="Optimasi"):
-            params, metrik = fut.result()
-            winrate = metrik.get("Persentase Menang", 0.0)
-            pf = metrik.get("Profit Factor", 0.0)
-            sharpe = metrik.get("Rasio Sharpe", 0.0)
-            avg = metrik.get("Rata-rata PnL", 0.0)
-
-            if overall_params is None or winrate > overall_metrik.get("Persentase Menang", 0.0):
-                overall_params, overall_metrik = params, metrik
-
+        submit = partial(pool.submit, _worker_trial)
+    else:
+        pool = ThreadPoolExecutor(max_workers=n_jobs)
+        submit = partial(pool.submit, _run_trial, df, ctx=ctx)
+
+    def evaluate(batch: list[dict], bars: int | None = None):
+        futures = [submit(p, bars=bars) for p in batch]
+        desc = "Optimasi" if bars is None else f"Optimasi ({bars} bar)"
+        for fut in tqdm(as_completed(futures), total=len(futures), desc=desc):
+            yield fut.result()
+
+    def consider(params: dict, metrik: dict) -> bool:
+        """Perbarui kandidat terbaik; True bila boleh berhenti lebih awal."""
+        nonlocal terbaik_params, terbaik_metrik, overall_params, overall_metrik
+        winrate = metrik.get("Persentase Menang", 0.0)
+        pf = metrik.get("Profit Factor", 0.0)
+        sharpe = metrik.get("Rasio Sharpe", 0.0)
+        avg = metrik.get("Rata-rata PnL", 0.0)
+
+        if overall_params is None or winrate > overall_metrik.get("Persentase Menang", 0.0):
+            overall_params, overall_metrik = params, metrik
+
+        if (
+            winrate < MIN_WR
+            or pf < MIN_PF
+            or sharpe < MIN_SHARPE
+            or metrik.get("Total Transaksi", 0) > MAX_TRADES
+            or avg < MIN_AVG
+        ):
+            return False
+
+        if terbaik_params is None:
+            terbaik_params, terbaik_metrik = params, metrik
+        else:
+            best_wr = terbaik_metrik.get("Persentase Menang", 0.0)
+            best_pf = terbaik_metrik.get("Profit Factor", 0.0)
+            best_sh = terbaik_metrik.get("Rasio Sharpe", 0.0)
             if (
-                winrate < MIN_WR
-                or pf < MIN_PF
-                or sharpe < MIN_SHARPE
-                or metrik.get("Total Transaksi", 0) > MAX_TRADES
-                or avg < MIN_AVG
+                winrate > best_wr
+                or (winrate == best_wr and pf > best_pf)
+                or (
+                    winrate == best_wr
+                    and pf == best_pf
+                    and sharpe > best_sh
+                )
             ):
-                continue
-
-            if terbaik_params is None:
                 terbaik_params, terbaik_metrik = params, metrik
-            else:
-                best_wr = terbaik_metrik.get("Persentase Menang", 0.0)
-                best_pf = terbaik_metrik.get("Profit Factor", 0.0)
-                best_sh = terbaik_metrik.get("Rasio Sharpe", 0.0)
-                if (
-                    winrate > best_wr
-                    or (winrate == best_wr and pf > best_pf)
-                    or (
-                        winrate == best_wr
-                        and pf == best_pf
-                        and sharpe > best_sh
-                    )
-                ):
-                    terbaik_params, terbaik_metrik = params, metrik
-
-            if early_stop and winrate >= MIN_WR and pf >= MIN_PF:
-                break
+
+        return early_stop and winrate >= MIN_WR and pf >= MIN_PF
+
+    try:
+        if search == "halving":
+            candidates = sample_unique(grid, n_iter, tried)
+            for params, metrik in successive_halving(candidates, evaluate, len(df)):
+                if consider(params, metrik):
+                    break
+        elif search == "guided":
+            sampler = GuidedSampler(grid, n_init=min(8, n_iter))
+            done = 0
+            stop = False
+            while done < n_iter and not stop:
+                batch = sampler.propose(min(n_jobs, n_iter - done), tried)
+                if not batch:
+                    break
+                hasil = list(evaluate(batch))
+                sampler.observe(hasil)
+                done += len(hasil)
+                stop = any([consider(params, metrik) for params, metrik in hasil])
+        else:
+            for params, metrik in evaluate(sample_unique(grid, n_iter, tried)):
+                if consider(params, metrik):
+                    break
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+        if shared is not None:
+            shared.close()
+        if shared_ind is not None:
+            shared_ind.close()
 
     if terbaik_params is None:
         logging.warning("Tidak ada kombinasi memenuhi kriteria minimum")
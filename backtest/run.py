@@ -9,10 +9,32 @@ def main():
     parser.add_argument("--from", dest="start", required=False, help="Tanggal mulai (YYYY-MM-DD)")
     parser.add_argument("--to", dest="end", required=False, help="Tanggal akhir (YYYY-MM-DD)")
     parser.add_argument("--export", required=True, help="Path berkas JSON hasil")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Jumlah proses paralel (default 1 = serial)",
+    )
     args = parser.parse_args()
 
     symbols = [s.strip() for s in args.symbols.split(",") if s.strip()]
-    backtest_symbols(symbols, args.tf, start=args.start, end=args.end, export_path=args.export)
+
+    def tampilkan(sym: str, met: dict) -> None:
+        print(
+            f"[{sym}] WR {met['winrate']:.2f}% | PF {met['profit_factor']:.2f} | "
+            f"{met['trades']} trade",
+            flush=True,
+        )
+
+    backtest_symbols(
+        symbols,
+        args.tf,
+        start=args.start,
+        end=args.end,
+        export_path=args.export,
+        workers=args.workers,
+        on_result=tampilkan,
+    )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,150 @@
+"""Strategi pencarian parameter untuk optimizer.
+
+Berisi successive halving (penolakan dini ala Hyperband) dan sampler
+berbasis model surrogate. Keduanya tidak menjalankan backtest sendiri;
+pemanggil memberikan fungsi ``evaluate(params_list, bars)`` yang
+mengembalikan ``[(params, metrik), ...]``.
+"""
+
+from __future__ import annotations
+
+import math
+import random
+from typing import Callable, Iterable
+
+import numpy as np
+
+Evaluate = Callable[[list[dict], int | None], Iterable[tuple[dict, dict]]]
+
+
+def rank_key(metrik: dict) -> tuple[float, float, float]:
+    """Urutan sama dengan seleksi optimizer: winrate, PF, lalu Sharpe."""
+    return (
+        metrik.get("Persentase Menang", 0.0),
+        metrik.get("Profit Factor", 0.0),
+        metrik.get("Rasio Sharpe", 0.0),
+    )
+
+
+def objective(metrik: dict) -> float:
+    """Skor skalar untuk model surrogate; PF dibatasi agar tidak mendominasi."""
+    wr, pf, sharpe = rank_key(metrik)
+    return wr + 10.0 * min(pf, 5.0) + 5.0 * max(-3.0, min(sharpe, 3.0))
+
+
+def param_key(params: dict) -> tuple:
+    return tuple(sorted(params.items()))
+
+
+def sample_unique(grid: dict[str, list], k: int, tried: set[tuple]) -> list[dict]:
+    """Ambil hingga ``k`` kombinasi acak yang belum pernah dicoba."""
+    hasil: list[dict] = []
+    for _ in range(max(k, 1) * 50):
+        if len(hasil) >= k:
+            break
+        params = {name: random.choice(vals) for name, vals in grid.items()}
+        key = param_key(params)
+        if key in tried:
+            continue
+        tried.add(key)
+        hasil.append(params)
+    return hasil
+
+
+def halving_budgets(n_bars: int, eta: int = 3, min_bars: int = 200, max_rungs: int = 3) -> list[int]:
+    """Panjang jendela tiap rung, diakhiri data penuh."""
+    budgets = [n_bars]
+    while len(budgets) < max_rungs:
+        nxt = budgets[0] // eta
+        if nxt < min_bars:
+            break
+        budgets.insert(0, nxt)
+    return budgets
+
+
+def successive_halving(
+    candidates: list[dict],
+    evaluate: Evaluate,
+    n_bars: int,
+    eta: int = 3,
+    min_bars: int = 200,
+) -> list[tuple[dict, dict]]:
+    """Uji semua kandidat di jendela pendek lalu promosikan ``1/eta`` terbaik.
+
+    Jendela diambil dari bar terakhir dan diperpanjang ``eta`` kali tiap
+    rung hingga data penuh. Hanya hasil rung terakhir (data penuh) yang
+    dikembalikan sehingga gate metrik diterapkan pada backtest lengkap.
+    """
+    budgets = halving_budgets(n_bars, eta, min_bars)
+    alive = list(candidates)
+    for bars in budgets[:-1]:
+        hasil = list(evaluate(alive, bars))
+        hasil.sort(key=lambda item: rank_key(item[1]), reverse=True)
+        keep = max(1, math.ceil(len(hasil) / eta))
+        alive = [params for params, _ in hasil[:keep]]
+    return list(evaluate(alive, None))
+
+
+class GuidedSampler:
+    """Usulkan parameter berikutnya dari hasil sebelumnya.
+
+    Setelah ``n_init`` percobaan acak, sebuah random forest dilatih pada
+    (parameter -> :func:`objective`) dan dipakai menilai kumpulan kandidat
+    acak; kandidat dengan prediksi tertinggi ditambah sedikit ketidakpastian
+    (deviasi antar pohon) yang diusulkan.
+    """
+
+    def __init__(self, grid: dict[str, list], n_init: int = 8, pool_size: int = 256, kappa: float = 1.0) -> None:
+        self.grid = grid
+        self.n_init = n_init
+        self.pool_size = pool_size
+        self.kappa = kappa
+        # Hanya parameter numerik yang bervariasi dipakai sebagai fitur
+        self.features = [
+            name
+            for name, vals in grid.items()
+            if len(vals) > 1 and all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in vals)
+        ]
+        self.X: list[list[float]] = []
+        self.y: list[float] = []
+
+    def _vector(self, params: dict) -> list[float]:
+        return [float(params[name]) for name in self.features]
+
+    def observe(self, results: Iterable[tuple[dict, dict]]) -> None:
+        for params, metrik in results:
+            self.X.append(self._vector(params))
+            self.y.append(objective(metrik))
+
+    def propose(self, k: int, tried: set[tuple]) -> list[dict]:
+        if len(self.y) < self.n_init or not self.features:
+            return sample_unique(self.grid, k, tried)
+
+        from sklearn.ensemble import RandomForestRegressor
+
+        model = RandomForestRegressor(n_estimators=50, min_samples_leaf=2, random_state=len(self.y))
+        model.fit(np.asarray(self.X), np.asarray(self.y))
+
+        pool = sample_unique(self.grid, self.pool_size, set(tried))
+        if not pool:
+            return []
+        Xp = np.asarray([self._vector(p) for p in pool])
+        per_tree = np.stack([tree.predict(Xp) for tree in model.estimators_])
+        acq = per_tree.mean(axis=0) + self.kappa * per_tree.std(axis=0)
+
+        hasil = []
+        for i in np.argsort(-acq)[:k]:
+            params = pool[int(i)]
+            tried.add(param_key(params))
+            hasil.append(params)
+        return hasil
+
+
+__all__ = [
+    "GuidedSampler",
+    "successive_halving",
+    "halving_budgets",
+    "sample_unique",
+    "rank_key",
+    "objective",
+]
@@ -0,0 +1,77 @@
+"""Berbagi DataFrame OHLCV ke proses worker lewat shared memory."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+
+@dataclass(frozen=True)
+class SharedFrameSpec:
+    """Deskripsi ringan yang dipickle ke worker, bukan datanya."""
+
+    name: str
+    rows: int
+    columns: tuple[str, ...]
+    index_name: str | None
+    unit: str
+    tz: str | None
+
+
+class SharedFrame:
+    """Salin kolom numerik DataFrame sekali ke blok shared memory.
+
+    Blok berisi index (int64 sesuai unit index) diikuti nilai kolom (float64,
+    row-major). Worker cukup menerima :attr:`spec` lalu memanggil
+    :func:`attach_frame` tanpa data ikut dipickle per trial.
+    """
+
+    def __init__(self, df: pd.DataFrame) -> None:
+        rows, cols = len(df), len(df.columns)
+        index = pd.DatetimeIndex(df.index)
+        size = max(1, rows * (cols + 1) * 8)
+        self._shm = shared_memory.SharedMemory(create=True, size=size)
+        buf = np.ndarray((rows, cols + 1), dtype=np.float64, buffer=self._shm.buf)
+        buf[:, 1:] = df.to_numpy(dtype=np.float64)
+        buf[:, 0].view(np.int64)[:] = index.asi8
+        self.spec = SharedFrameSpec(
+            name=self._shm.name,
+            rows=rows,
+            columns=tuple(df.columns),
+            index_name=df.index.name,
+            unit=index.unit,
+            tz=str(index.tz) if index.tz else None,
+        )
+
+    def close(self) -> None:
+        self._shm.close()
+        self._shm.unlink()
+
+    def __enter__(self) -> "SharedFrame":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def attach_frame(spec: SharedFrameSpec) -> tuple[pd.DataFrame, shared_memory.SharedMemory]:
+    """Buka DataFrame read-only dari blok shared memory ``spec``.
+
+    Handle ``SharedMemory`` ikut dikembalikan dan harus tetap hidup selama
+    DataFrame dipakai karena nilainya menunjuk langsung ke blok tersebut.
+    """
+    shm = shared_memory.SharedMemory(name=spec.name)
+    buf = np.ndarray((spec.rows, len(spec.columns) + 1), dtype=np.float64, buffer=shm.buf)
+    index = pd.DatetimeIndex(buf[:, 0].view(np.int64).astype(f"datetime64[{spec.unit}]"), name=spec.index_name)
+    if spec.tz:
+        index = index.tz_localize("UTC").tz_convert(spec.tz)
+    values = buf[:, 1:]
+    values.flags.writeable = False
+    df = pd.DataFrame(values, index=index, columns=list(spec.columns), copy=False)
+    return df, shm
+
+
+__all__ = ["SharedFrame", "SharedFrameSpec", "attach_frame"]
@@ -2,13 +2,33 @@ import sqlite3
 import pandas as pd
 import os
 import json
-from datetime import datetime, UTC
+import queue
+import atexit
+import logging
+import threading
+import time
+from datetime import datetime, timedelta, UTC
 
 DB_PATH = './runtime_state/signal_history.db'
+QUEUE_SIZE = int(os.getenv("SIGNAL_LOG_QUEUE", 10000))
+FLUSH_INTERVAL = float(os.getenv("SIGNAL_LOG_FLUSH", 1.0))  # detik
+BATCH_SIZE = 1000
+
+_INSERT = 'INSERT INTO signals (symbol, time, direction, score, components, skip_reason) VALUES (?,?,?,?,?,?)'
+
+
+def _connect() -> sqlite3.Connection:
+    os.makedirs(os.path.dirname(DB_PATH) or ".", exist_ok=True)
+    # Koneksi writer dipakai dari thread latar maupun flush() pemanggil;
+    # aksesnya sudah diserialkan oleh lock SignalWriter.
+    conn = sqlite3.connect(DB_PATH, check_same_thread=False)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    return conn
+
 
 def init_db():
-    os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
-    with sqlite3.connect(DB_PATH) as conn:
+    with _connect() as conn:
         c = conn.cursor()
         c.execute('''CREATE TABLE IF NOT EXISTS signals (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -19,33 +39,178 @@ def init_db():
             components TEXT,
             skip_reason TEXT
         )''')
+        c.execute('CREATE INDEX IF NOT EXISTS idx_signals_time ON signals (time)')
+        c.execute('CREATE INDEX IF NOT EXISTS idx_signals_symbol_time ON signals (symbol, time)')
+    conn.close()
+
+
+class SignalWriter:
+    """Penulis sinyal di thread latar dengan antrean terbatas.
+
+    :meth:`put` tidak pernah memblokir pemanggil (loop websocket). Baris
+    dikumpulkan lalu ditulis dalam satu transaksi setiap ``flush_interval``
+    detik atau saat antrean mencapai ``batch_size``. Bila antrean penuh,
+    sinyal baru dibuang dan dihitung di ``dropped``.
+    """
+
+    def __init__(self, maxsize: int = QUEUE_SIZE, flush_interval: float = FLUSH_INTERVAL,
+                 batch_size: int = BATCH_SIZE) -> None:
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self._queue: queue.Queue = queue.Queue(maxsize)
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._stop = threading.Event()
+        self._conn: sqlite3.Connection | None = None
+        self._path: str | None = None
+        self.enqueued = 0
+        self.written = 0
+        self.dropped = 0
+        self.batches = 0
+        self.failed = 0
+        self.max_depth = 0
+        self.last_flush_ms = 0.0
+        self._reported_drops = 0
+
+    def stats(self) -> dict:
+        """Metrik backpressure: kedalaman antrean, baris dibuang, dsb."""
+        return {
+            "depth": self._queue.qsize(),
+            "capacity": self._queue.maxsize,
+            "max_depth": self.max_depth,
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "batches": self.batches,
+            "last_flush_ms": self.last_flush_ms,
+        }
+
+    def put(self, row: tuple) -> bool:
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            self.dropped += 1
+            return False
+        self.enqueued += 1
+        self.max_depth = max(self.max_depth, self._queue.qsize())
+        return True
+
+    def start(self) -> "SignalWriter":
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="signal-writer", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        self.flush()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            deadline = time.monotonic() + self.flush_interval
+            while self._queue.qsize() < self.batch_size and not self._stop.is_set():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._stop.wait(min(remaining, 0.05))
+            self.flush()
+
+    def flush(self) -> int:
+        """Tulis semua baris yang antre dalam satu transaksi per batch."""
+        written = 0
+        with self._lock:
+            while True:
+                rows = []
+                while len(rows) < self.batch_size:
+                    try:
+                        rows.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                if not rows:
+                    break
+                started = time.perf_counter()
+                try:
+                    conn = self._connection()
+                    with conn:
+                        conn.executemany(_INSERT, rows)
+                except Exception as e:
+                    self.failed += len(rows)
+                    logging.error(f"Gagal menulis {len(rows)} sinyal: {e}")
+                    break
+                self.last_flush_ms = (time.perf_counter() - started) * 1000
+                self.batches += 1
+                self.written += len(rows)
+                written += len(rows)
+            if self.dropped > self._reported_drops:
+                logging.warning(
+                    f"Antrean log sinyal penuh: {self.dropped - self._reported_drops} sinyal dibuang"
+                )
+                self._reported_drops = self.dropped
+        return written
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None or self._path != DB_PATH:
+            if self._conn is not None:
+                self._conn.close()
+            self._conn = _connect()
+            self._path = DB_PATH
+        return self._conn
+
+
+_writer: SignalWriter | None = None
+_writer_lock = threading.Lock()
+
+
+def get_writer() -> SignalWriter:
+    """Penulis sinyal bersama proses ini (dijalankan saat pertama dipakai)."""
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = SignalWriter().start()
+            atexit.register(_writer.stop)
+        return _writer
+
+
+def flush_signals() -> int:
+    """Paksa tulis sinyal yang masih antre (mis. sebelum membaca atau keluar)."""
+    return _writer.flush() if _writer is not None else 0
+
+
+def signal_log_stats() -> dict:
+    return get_writer().stats()
 
 
 def log_signal(symbol: str, direction: str, score: float, components=None, skip_reason: str = "") -> None:
-    with sqlite3.connect(DB_PATH) as conn:
-        c = conn.cursor()
-        c.execute(
-            'INSERT INTO signals (symbol, time, direction, score, components, skip_reason) VALUES (?,?,?,?,?,?)',
-            (
-                symbol,
-                datetime.now(UTC).isoformat(),
-                direction,
-                score,
-                json.dumps(components or {}),
-                skip_reason,
-            ),
+    """Antrikan satu sinyal; penulisan ke SQLite terjadi di thread latar."""
+    get_writer().put(
+        (
+            symbol,
+            datetime.now(UTC).isoformat(),
+            direction,
+            score,
+            json.dumps(components or {}),
+            skip_reason,
         )
-        conn.commit()
+    )
 
 
 def get_signals_today() -> pd.DataFrame:
-    today = datetime.now(UTC).date().isoformat()
+    """Sinyal hari ini (UTC), termasuk yang masih antre di writer."""
+    flush_signals()
+    today = datetime.now(UTC).date()
     with sqlite3.connect(DB_PATH) as conn:
         query = (
             "SELECT symbol, time, direction, score, components, skip_reason FROM signals "
-            "WHERE DATE(time) = ? ORDER BY time DESC"
+            "WHERE time >= ? AND time < ? ORDER BY time DESC"
+        )
+        df = pd.read_sql_query(
+            query, conn, params=(today.isoformat(), (today + timedelta(days=1)).isoformat())
         )
-        df = pd.read_sql_query(query, conn, params=(today,))
     return df
 
 
@@ -1,47 +1,125 @@
+import logging
 import sqlite3
+import threading
 import pandas as pd
 import os
 from models.trade import Trade
 
 DB_PATH = './runtime_state/trade_history.db'
 
+# Satu koneksi per thread, dipakai ulang selama DB_PATH tidak berubah.
+_local = threading.local()
+# Callback ``cb(trade)`` yang dipanggil setelah trade tersimpan
+_listeners: tuple = ()
+
+_SCHEMA = (
+    '''CREATE TABLE IF NOT EXISTS trades (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        symbol TEXT, side TEXT,
+        entry_time TEXT, entry REAL,
+        exit_time TEXT, exit REAL,
+        pnl REAL, size REAL
+    )''',
+    'CREATE INDEX IF NOT EXISTS idx_trades_symbol_entry ON trades (symbol, entry_time)',
+    'CREATE INDEX IF NOT EXISTS idx_trades_entry ON trades (entry_time)',
+)
+
+
+def _conn() -> sqlite3.Connection:
+    conn = getattr(_local, "conn", None)
+    if conn is not None and _local.path == DB_PATH:
+        return conn
+    if conn is not None:
+        conn.close()
+    os.makedirs(os.path.dirname(DB_PATH) or ".", exist_ok=True)
+    conn = sqlite3.connect(DB_PATH)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    for stmt in _SCHEMA:
+        conn.execute(stmt)
+    conn.commit()
+    _local.conn, _local.path = conn, DB_PATH
+    return conn
+
+
+def close_db() -> None:
+    """Tutup koneksi milik thread ini (dibuka ulang otomatis bila perlu)."""
+    conn = getattr(_local, "conn", None)
+    if conn is not None:
+        conn.close()
+        _local.conn = None
+
+
 def init_db():
-    os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
-    with sqlite3.connect(DB_PATH) as conn:
-        c = conn.cursor()
-        c.execute('''CREATE TABLE IF NOT EXISTS trades (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            symbol TEXT, side TEXT,
-            entry_time TEXT, entry REAL,
-            exit_time TEXT, exit REAL,
-            pnl REAL, size REAL
-        )''')
+    _conn()
+
+
+def add_trade_listener(callback) -> None:
+    """Panggil ``callback(trade)`` setiap kali :func:`log_trade` berhasil."""
+    global _listeners
+    _listeners = _listeners + (callback,)
+
+
+def remove_trade_listener(callback) -> None:
+    global _listeners
+    _listeners = tuple(cb for cb in _listeners if cb != callback)
 
 def log_trade(trade: Trade):
-    with sqlite3.connect(DB_PATH) as conn:
-        c = conn.cursor()
-        c.execute('''INSERT INTO trades (symbol, side, entry_time, entry, exit_time, exit, pnl, size)
-                     VALUES (?, ?, ?, ?, ?, ?, ?, ?)''',
-                  (trade.symbol, trade.side, trade.entry_time, trade.entry_price,
-                   trade.exit_time, trade.exit_price, trade.pnl, trade.size))
-        conn.commit()
+    conn = _conn()
+    conn.execute('''INSERT INTO trades (symbol, side, entry_time, entry, exit_time, exit, pnl, size)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)''',
+                 (trade.symbol, trade.side, trade.entry_time, trade.entry_price,
+                  trade.exit_time, trade.exit_price, trade.pnl, trade.size))
+    conn.commit()
+    for callback in _listeners:
+        try:
+            callback(trade)
+        except Exception as e:
+            logging.error(f"Listener trade {trade.symbol} gagal: {e}", exc_info=True)
 
 def get_all_trades():
-    with sqlite3.connect(DB_PATH) as conn:
-        return pd.read_sql_query("SELECT * FROM trades ORDER BY entry_time DESC", conn)
+    return pd.read_sql_query("SELECT * FROM trades ORDER BY entry_time DESC", _conn())
 
-def get_trades_filtered(symbol: str | None = None, start: str | None = None, end: str | None = None) -> pd.DataFrame:
-    """Ambil histori trade dengan filter optional."""
-    df = get_all_trades()
-    if df.empty:
-        return df
+
+def _where(symbol: str | None, start: str | None, end: str | None) -> tuple[str, list]:
+    """Klausa WHERE untuk filter simbol dan rentang ``entry_time`` (inklusif).
+
+    ``entry_time`` disimpan sebagai string ISO sehingga perbandingan string
+    setara dengan perbandingan waktu dan bisa memakai index. Batas atas
+    dibuat eksklusif satu detik setelah ``end`` agar suffix pecahan detik
+    atau zona waktu tetap tercakup.
+    """
+    clauses, params = [], []
     if symbol:
-        df = df[df['symbol'] == symbol.upper()]
+        clauses.append("symbol = ?")
+        params.append(symbol.upper())
     if start:
-        df = df[pd.to_datetime(df['entry_time']) >= pd.to_datetime(start)]
+        clauses.append("entry_time >= ?")
+        params.append(pd.Timestamp(start).strftime("%Y-%m-%dT%H:%M:%S"))
     if end:
-        df = df[pd.to_datetime(df['entry_time']) <= pd.to_datetime(end)]
-    return df
+        clauses.append("entry_time < ?")
+        params.append((pd.Timestamp(end) + pd.Timedelta(seconds=1)).strftime("%Y-%m-%dT%H:%M:%S"))
+    return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+
+def get_trades_filtered(
+    symbol: str | None = None,
+    start: str | None = None,
+    end: str | None = None,
+    columns: tuple[str, ...] | None = None,
+) -> pd.DataFrame:
+    """Ambil histori trade dengan filter optional (dijalankan di SQL)."""
+    where, params = _where(symbol, start, end)
+    cols = ", ".join(columns) if columns else "*"
+    query = f"SELECT {cols} FROM trades{where} ORDER BY entry_time DESC"
+    return pd.read_sql_query(query, _conn(), params=params)
+
+
+def count_trades(symbol: str | None = None, start: str | None = None, end: str | None = None) -> int:
+    """Jumlah trade sesuai filter tanpa memuat barisnya."""
+    where, params = _where(symbol, start, end)
+    return _conn().execute(f"SELECT COUNT(*) FROM trades{where}", params).fetchone()[0]
+
 
 def export_trades_csv(path: str) -> str:
     """Export seluruh histori trade ke CSV dan kembalikan path."""
@@ -3,75 +3,103 @@ import time
 import logging
 import streamlit as st
 from datetime import datetime, timezone
-from typing import Dict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
 
 from execution.order_router import safe_close_order_market
-from execution.ws_listener import get_price
+from execution.ws_listener import get_price, price_store
+from execution.price_store import MAX_PRICE_AGE, PriceStore
 from risk_management.position_manager import apply_trailing_sl, check_exit_condition
-from utils.state_manager import load_state, save_state
+from utils.state_manager import load_state, save_state, state_lock, state_version, trade_key
 from utils.notifikasi import kirim_notifikasi_exit, kirim_notifikasi_telegram
-from database.sqlite_logger import log_trade, get_all_trades
+from database.sqlite_logger import add_trade_listener, get_all_trades, log_trade, remove_trade_listener
 from models.trade import Trade
 from risk_management.circuit_breaker import CircuitBreaker
 
 
+PERSIST_INTERVAL = 1.0  # detik; jeda minimum antar penulisan state
+_stale_warned: Dict[str, float] = {}
+
+
+def _warn_stale(symbol: str, every: float = 60.0) -> None:
+    now = time.time()
+    if now - _stale_warned.get(symbol, 0.0) >= every:
+        _stale_warned[symbol] = now
+        logging.warning(f"Harga {symbol} tidak tersedia/basi (> {MAX_PRICE_AGE:.0f}s), exit ditunda")
+
+
+def _evaluate_exit(trade_data: dict, price: float) -> bool:
+    """Perbarui trailing SL ``trade_data`` lalu cek apakah SL/TP tersentuh."""
+    side = trade_data["side"]
+    if trade_data.get("trailing_enabled", True):
+        step = (
+            trade_data.get("atr_multiplier")
+            if trade_data.get("trailing_mode") == "atr"
+            else trade_data.get("trailing_offset_pct")
+            or trade_data.get("trailing_offset")
+            or 0.3
+        )
+        trade_data["trailing_sl"] = apply_trailing_sl(
+            price,
+            trade_data["entry_price"],
+            side,
+            trade_data.get("trailing_sl", trade_data["sl"]),
+            trade_data.get("trailing_trigger_pct")
+            or trade_data.get("trigger_threshold")
+            or 1.0,
+            step,
+            mode=trade_data.get("trailing_mode", "pct"),
+            atr=trade_data.get("atr"),
+            breakeven_pct=trade_data.get("breakeven_trigger_pct"),
+        )
+    return check_exit_condition(price, trade_data["trailing_sl"], trade_data["tp"], 0, direction=side)
+
+
+def _close_trade(client, trade_data: dict, price: float, symbol_steps: Dict[str, Dict], notif_exit: bool) -> None:
+    symbol = trade_data["symbol"]
+    side = trade_data["side"]
+    order = safe_close_order_market(
+        client,
+        symbol,
+        "SELL" if side == "long" else "BUY",
+        trade_data["size"],
+        symbol_steps,
+    )
+    exit_price = price
+    trade = Trade(**trade_data)
+    trade.exit_price = exit_price
+    trade.exit_time = datetime.now(timezone.utc).isoformat()
+    trade.pnl = (
+        (exit_price - trade.entry_price) * trade.size
+        if side == "long"
+        else (trade.entry_price - exit_price) * trade.size
+    )
+    log_trade(trade)
+    logging.info(
+        f"Auto close {symbol} {side} @ {exit_price} PnL {trade.pnl:.2f}"
+    )
+    if notif_exit:
+        kirim_notifikasi_exit(symbol, exit_price, trade.pnl, trade.order_id)
+
+
 def check_and_close_positions(client, symbol_steps: Dict[str, Dict], notif_exit: bool = True):
-    """Cek semua posisi aktif dan tutup jika kena SL/TP/trailing."""
+    """Cek semua posisi aktif dan tutup jika kena SL/TP/trailing.
+
+    Sapuan penuh atas file state; jalur utama live adalah :class:`ExitEngine`.
+    """
     active = load_state()
     updated = []
     for trade_data in active:
         symbol = trade_data["symbol"]
-        side = trade_data["side"]
-        price = get_price(symbol)
+        price = get_price(symbol, max_age=MAX_PRICE_AGE)
         if price is None:
+            # Harga belum ada atau basi: jangan memicu SL/TP dari data lama
+            _warn_stale(symbol)
             updated.append(trade_data)
             continue
 
-        if trade_data.get("trailing_enabled", True):
-            step = (
-                trade_data.get("atr_multiplier")
-                if trade_data.get("trailing_mode") == "atr"
-                else trade_data.get("trailing_offset_pct")
-                or trade_data.get("trailing_offset")
-                or 0.3
-            )
-            trade_data["trailing_sl"] = apply_trailing_sl(
-                price,
-                trade_data["entry_price"],
-                side,
-                trade_data.get("trailing_sl", trade_data["sl"]),
-                trade_data.get("trailing_trigger_pct")
-                or trade_data.get("trigger_threshold")
-                or 1.0,
-                step,
-                mode=trade_data.get("trailing_mode", "pct"),
-                atr=trade_data.get("atr"),
-                breakeven_pct=trade_data.get("breakeven_trigger_pct"),
-            )
-
-        if check_exit_condition(price, trade_data["trailing_sl"], trade_data["tp"], 0, direction=side):
-            order = safe_close_order_market(
-                client,
-                symbol,
-                "SELL" if side == "long" else "BUY",
-                trade_data["size"],
-                symbol_steps,
-            )
-            exit_price = price
-            trade = Trade(**trade_data)
-            trade.exit_price = exit_price
-            trade.exit_time = datetime.now(timezone.utc).isoformat()
-            trade.pnl = (
-                (exit_price - trade.entry_price) * trade.size
-                if side == "long"
-                else (trade.entry_price - exit_price) * trade.size
-            )
-            log_trade(trade)
-            logging.info(
-                f"Auto close {symbol} {side} @ {exit_price} PnL {trade.pnl:.2f}"
-            )
-            if notif_exit:
-                kirim_notifikasi_exit(symbol, exit_price, trade.pnl, trade.order_id)
+        if _evaluate_exit(trade_data, price):
+            _close_trade(client, trade_data, price, symbol_steps, notif_exit)
         else:
             updated.append(trade_data)
 
@@ -80,6 +108,133 @@ def check_and_close_positions(client, symbol_steps: Dict[str, Dict], notif_exit:
     return updated
 
 
+class ExitEngine:
+    """Exit berbasis event: posisi di memori, dievaluasi saat harga berubah.
+
+    :meth:`on_price` dipanggil oleh price store untuk simbol yang baru
+    berdetak; hanya posisi simbol itu yang dihitung. Order penutupan
+    dikirim di thread pool agar loop websocket tidak tertahan REST, dan
+    perubahan (trailing SL, posisi tertutup) ditulis ke file state oleh
+    thread penulis yang menggabungkan perubahan per ``persist_interval``.
+    Posisi baru yang disimpan modul lain terdeteksi lewat ``state_version``.
+    """
+
+    def __init__(
+        self,
+        client,
+        symbol_steps: Dict[str, Dict],
+        notif_exit: bool = True,
+        persist_interval: float = PERSIST_INTERVAL,
+    ) -> None:
+        self.client = client
+        self.symbol_steps = symbol_steps
+        self.notif_exit = notif_exit
+        self.persist_interval = persist_interval
+        self._lock = threading.RLock()
+        self._book: Dict[str, List[dict]] = {}
+        self._closing: set = set()
+        self._closed: set = set()  # sudah ditutup, belum tersimpan
+        self._version = -1
+        self._dirty = threading.Event()
+        self._stop = threading.Event()
+        self._pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="exit")
+        self._writer: threading.Thread | None = None
+
+    def reload(self) -> None:
+        """Muat ulang posisi dari file; trailing SL di memori dipertahankan."""
+        with state_lock:
+            version = state_version()
+            trades = load_state()
+        with self._lock:
+            current = {trade_key(t): t for ts in self._book.values() for t in ts}
+            book: Dict[str, List[dict]] = {}
+            for trade_data in trades:
+                key = trade_key(trade_data)
+                if key in self._closed:
+                    continue
+                trade_data = current.get(key, trade_data)
+                book.setdefault(trade_data["symbol"], []).append(trade_data)
+            self._book = book
+            self._version = version
+
+    def sync(self) -> None:
+        """Muat ulang hanya bila state diubah sejak terakhir dibaca."""
+        if state_version() != self._version:
+            self.reload()
+
+    def positions(self) -> List[dict]:
+        with self._lock:
+            return [dict(t) for ts in self._book.values() for t in ts]
+
+    def on_price(self, symbol: str, price: float) -> None:
+        self.sync()
+        exits = []
+        with self._lock:
+            for trade_data in self._book.get(symbol, ()):
+                key = trade_key(trade_data)
+                if key in self._closing:
+                    continue
+                before = trade_data.get("trailing_sl")
+                if _evaluate_exit(trade_data, price):
+                    self._closing.add(key)
+                    exits.append(trade_data)
+                elif trade_data.get("trailing_sl") != before:
+                    self._dirty.set()
+        for trade_data in exits:
+            self._pool.submit(self._close, trade_data, price)
+
+    def _close(self, trade_data: dict, price: float) -> None:
+        key = trade_key(trade_data)
+        try:
+            _close_trade(self.client, trade_data, price, self.symbol_steps, self.notif_exit)
+        except Exception as e:
+            logging.error(f"Gagal menutup {trade_data['symbol']}: {e}", exc_info=True)
+            with self._lock:
+                self._closing.discard(key)
+            return
+        with self._lock:
+            trades = self._book.get(trade_data["symbol"], [])
+            self._book[trade_data["symbol"]] = [t for t in trades if trade_key(t) != key]
+            self._closing.discard(key)
+            self._closed.add(key)
+        self._dirty.set()
+
+    def persist(self) -> None:
+        """Tulis posisi di memori ke file state (digabung dengan perubahan luar)."""
+        with state_lock:
+            self.sync()
+            with self._lock:
+                data = [t for ts in self._book.values() for t in ts]
+                self._dirty.clear()
+                save_state(data)
+                self._version = state_version()
+                self._closed.clear()
+
+    def _persist_loop(self) -> None:
+        while not self._stop.is_set():
+            if not self._dirty.wait(timeout=self.persist_interval):
+                continue
+            try:
+                self.persist()
+            except Exception as e:
+                logging.error(f"Gagal menyimpan state exit: {e}")
+            self._stop.wait(self.persist_interval)
+
+    def start(self, prices: PriceStore = price_store) -> "ExitEngine":
+        self.reload()
+        self._writer = threading.Thread(target=self._persist_loop, daemon=True)
+        self._writer.start()
+        prices.add_listener(self.on_price)
+        return self
+
+    def stop(self, prices: PriceStore = price_store) -> None:
+        prices.remove_listener(self.on_price)
+        self._stop.set()
+        self._pool.shutdown(wait=True)
+        if self._dirty.is_set():
+            self.persist()
+
+
 def start_exit_monitor(
     client,
     symbol_steps: Dict[str, Dict],
@@ -88,17 +243,30 @@ def start_exit_monitor(
     max_dd: float = 50.0,
     max_losses: int = 3,
 ):
+    """Mulai exit engine berbasis event dan thread pemeriksa circuit breaker.
+
+    SL/TP dievaluasi oleh :class:`ExitEngine` setiap kali harga simbol
+    berubah; thread ``loop`` hanya menjalankan circuit breaker dan
+    memperingatkan posisi yang harganya basi setiap ``interval`` detik.
+    """
     stop_event = threading.Event()
     circuit = CircuitBreaker(max_drawdown=max_dd, max_losses=max_losses)
+    add_trade_listener(circuit.record_trade)
+    engine = ExitEngine(client, symbol_steps, notif_exit).start()
 
     def loop():
         while not stop_event.is_set() and not st.session_state.get("stop_signal"):
             try:
-                check_and_close_positions(client, symbol_steps, notif_exit)
+                engine.sync()
+                for trade_data in engine.positions():
+                    if price_store.is_stale(trade_data["symbol"], MAX_PRICE_AGE):
+                        _warn_stale(trade_data["symbol"])
                 circuit.check()
             except Exception as e:
                 logging.error(f"Exit monitor error: {e}", exc_info=True)
-            time.sleep(interval)
+            stop_event.wait(interval)
+        engine.stop()
+        remove_trade_listener(circuit.record_trade)
 
     thread = threading.Thread(target=loop, daemon=True)
     try:
@@ -0,0 +1,167 @@
+"""Snapshot harga terakhir per simbol berbasis NumPy.
+
+Tiap simbol mendapat satu baris tetap: harga terakhir, bid, ask, event
+time bursa (ms), waktu terima lokal dan nomor urut update. Penulis
+(websocket) memakai pola *seqlock*: nomor urut dibuat ganjil selama
+menulis dan genap setelah selesai. Pembaca tidak mengambil lock; ia cukup
+mengulang bila nomor urut berubah atau ganjil selama membaca.
+"""
+import logging
+import math
+import os
+import threading
+import time
+from typing import Callable, Dict, List, NamedTuple
+
+import numpy as np
+
+MAX_PRICE_AGE = float(os.getenv("MAX_PRICE_AGE", 5.0))  # detik
+_PRICE, _BID, _ASK = range(3)
+
+
+class PriceSnapshot(NamedTuple):
+    symbol: str
+    price: float
+    bid: float
+    ask: float
+    event_time: int  # ms, dari bursa
+    received: float  # epoch detik saat diterima
+    seq: int  # jumlah update sejak simbol pertama muncul
+
+    def age(self, now: float | None = None) -> float:
+        return (time.time() if now is None else now) - self.received
+
+
+class PriceStore:
+    """Penyimpanan harga lock-free untuk pembaca, satu lock untuk penulis."""
+
+    def __init__(self, capacity: int = 64) -> None:
+        self._index: Dict[str, int] = {}
+        self._write_lock = threading.Lock()
+        self._arrays = self._alloc(capacity)
+        self._listeners: tuple = ()
+
+    def add_listener(self, callback: Callable[[str, float], None]) -> None:
+        """Panggil ``callback(symbol, price)`` setiap kali harga berubah.
+
+        Callback berjalan di thread penulis (loop websocket), jadi harus
+        cepat dan tidak boleh memblokir.
+        """
+        self._listeners = self._listeners + (callback,)
+
+    def remove_listener(self, callback: Callable[[str, float], None]) -> None:
+        self._listeners = tuple(cb for cb in self._listeners if cb != callback)
+
+    @staticmethod
+    def _alloc(capacity: int) -> tuple:
+        return (
+            np.full((capacity, 3), np.nan, dtype=np.float64),
+            np.zeros(capacity, dtype=np.int64),
+            np.zeros(capacity, dtype=np.float64),
+            np.zeros(capacity, dtype=np.uint64),
+        )
+
+    def _slot(self, symbol: str) -> int:
+        slot = self._index.get(symbol)
+        if slot is not None:
+            return slot
+        slot = len(self._index)
+        arrays = self._arrays
+        if slot >= len(arrays[1]):
+            grown = self._alloc(len(arrays[1]) * 2)
+            for dst, src in zip(grown, arrays):
+                dst[: len(src)] = src
+            # Ganti sekaligus; pembaca lama tetap melihat array yang konsisten
+            self._arrays = grown
+        self._index[symbol] = slot
+        return slot
+
+    def update(
+        self,
+        symbol: str,
+        price: float | None = None,
+        bid: float | None = None,
+        ask: float | None = None,
+        event_time: int | None = None,
+        received: float | None = None,
+    ) -> bool:
+        """Tulis harga baru; pesan dengan event time lebih lama diabaikan."""
+        received = time.time() if received is None else received
+        with self._write_lock:
+            slot = self._slot(symbol)
+            values, events, stamps, seqs = self._arrays
+            if event_time is not None and event_time < events[slot]:
+                return False
+            seqs[slot] += 1
+            if price is not None:
+                values[slot, _PRICE] = price
+            if bid is not None:
+                values[slot, _BID] = bid
+            if ask is not None:
+                values[slot, _ASK] = ask
+            events[slot] = int(received * 1000) if event_time is None else event_time
+            stamps[slot] = received
+            seqs[slot] += 1
+        if price is not None:
+            for callback in self._listeners:
+                try:
+                    callback(symbol, price)
+                except Exception as e:
+                    logging.error(f"Listener harga {symbol} gagal: {e}", exc_info=True)
+        return True
+
+    def snapshot(self, symbol: str) -> PriceSnapshot | None:
+        """Salinan konsisten satu simbol tanpa lock; ``None`` bila belum ada."""
+        slot = self._index.get(symbol)
+        if slot is None:
+            return None
+        while True:
+            values, events, stamps, seqs = self._arrays
+            before = int(seqs[slot])
+            if before & 1:
+                time.sleep(0)
+                continue
+            price, bid, ask = (float(v) for v in values[slot])
+            event_time, received = int(events[slot]), float(stamps[slot])
+            if int(seqs[slot]) == before and self._arrays[3] is seqs:
+                break
+        if before == 0 or math.isnan(price):
+            return None
+        return PriceSnapshot(symbol, price, bid, ask, event_time, received, before // 2)
+
+    def price(self, symbol: str, max_age: float | None = None) -> float | None:
+        """Harga terakhir, atau ``None`` bila belum ada / lebih tua dari ``max_age``."""
+        snap = self.snapshot(symbol)
+        if snap is None or (max_age is not None and snap.age() > max_age):
+            return None
+        return snap.price
+
+    def age(self, symbol: str, now: float | None = None) -> float:
+        """Umur harga dalam detik; ``inf`` bila simbol belum pernah diperbarui."""
+        snap = self.snapshot(symbol)
+        return math.inf if snap is None else snap.age(now)
+
+    def is_stale(self, symbol: str, max_age: float = MAX_PRICE_AGE, now: float | None = None) -> bool:
+        return self.age(symbol, now) > max_age
+
+    def stale_symbols(self, max_age: float = MAX_PRICE_AGE, now: float | None = None) -> List[str]:
+        """Semua simbol yang harganya lebih tua dari ``max_age``."""
+        now = time.time() if now is None else now
+        stamps = self._arrays[2]
+        index = dict(self._index)
+        if not index:
+            return []
+        slots = np.fromiter(index.values(), dtype=np.int64, count=len(index))
+        stale = (now - stamps[slots]) > max_age
+        return [sym for sym, flag in zip(index, stale) if flag]
+
+    def symbols(self) -> List[str]:
+        return list(self._index)
+
+    def clear(self) -> None:
+        with self._write_lock:
+            self._index = {}
+            self._arrays = self._alloc(len(self._arrays[1]))
+
+
+__all__ = ["PriceStore", "PriceSnapshot", "MAX_PRICE_AGE"]
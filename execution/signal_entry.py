@@ -22,9 +22,9 @@ from notifications.notifier import (
     catat_error,
 )
 from utils.data_provider import load_symbol_filters
-from database.sqlite_logger import get_trades_filtered
+from database.sqlite_logger import count_trades
 import utils.bot_flags as bot_flags
-from execution.ws_listener import get_price  # Ganti shared_price dengan get_price
+from execution.ws_listener import get_price, is_price_stale  # Ganti shared_price dengan get_price
 
 def on_signal(
     symbol: str,
@@ -69,7 +69,7 @@ def on_signal(
         today = datetime.now(UTC).date()
         start = today.isoformat()
         end = (today + timedelta(days=1)).isoformat()
-        trades_today = len(get_trades_filtered(symbol, start, end))
+        trades_today = count_trades(symbol, start, end)
         if trades_today >= max_trades:
             logging.info(f"Skipped {symbol} - trade harian mencapai batas")
             return
@@ -84,6 +84,9 @@ def on_signal(
 
         # Perbaikan di sini: gunakan get_price() bukan shared_price
         current_price = get_price(symbol)
+        if current_price is not None and is_price_stale(symbol):
+            logging.info(f"Harga live {symbol} basi, pakai close candle")
+            current_price = None
         price = current_price if current_price is not None else row.get('close')
 
         if price is None or not isinstance(price, (int, float)):
@@ -0,0 +1,218 @@
+"""Pipeline sinyal bertahap di atas asyncio.
+
+Tiap tahap punya antrean terbatas dan sejumlah worker. Fungsi tahap yang
+sinkron dijalankan di thread pool sehingga event loop tetap bebas menerima
+pesan websocket; fungsi async dijalankan langsung di loop. Hasil satu
+tahap diteruskan ke antrean tahap berikutnya; ``None`` menghentikan item.
+
+Bila tahap pertama penuh, item tertua dibuang agar penerima websocket tidak
+pernah menunggu. Tahap berikutnya memberi backpressure dengan ``await
+put`` ke tahap sebelumnya. Item dengan kunci sama (mis. simbol) diproses
+berurutan dalam satu tahap.
+"""
+import asyncio
+import inspect
+import logging
+import os
+import time
+from concurrent.futures import Executor
+from typing import Any, Callable, Dict, List
+
+STAGE_QUEUE_SIZE = int(os.getenv("SIGNAL_STAGE_QUEUE", 256))
+_EWMA = 0.2
+
+log = logging.getLogger(__name__)
+
+
+class StageMetrics:
+    """Latensi (tunggu antrean dan proses) serta penghitung satu tahap."""
+
+    def __init__(self) -> None:
+        self.processed = 0
+        self.errors = 0
+        self.dropped = 0
+        self.max_depth = 0
+        self.wait_ms = 0.0
+        self.service_ms = 0.0
+        self.max_service_ms = 0.0
+
+    def record(self, wait: float, service: float) -> None:
+        wait, service = wait * 1000, service * 1000
+        if self.processed == 0:
+            self.wait_ms, self.service_ms = wait, service
+        else:
+            self.wait_ms += _EWMA * (wait - self.wait_ms)
+            self.service_ms += _EWMA * (service - self.service_ms)
+        self.max_service_ms = max(self.max_service_ms, service)
+        self.processed += 1
+
+    def as_dict(self, depth: int, capacity: int) -> Dict[str, Any]:
+        return {
+            "depth": depth,
+            "capacity": capacity,
+            "max_depth": self.max_depth,
+            "processed": self.processed,
+            "errors": self.errors,
+            "dropped": self.dropped,
+            "wait_ms": round(self.wait_ms, 3),
+            "service_ms": round(self.service_ms, 3),
+            "max_service_ms": round(self.max_service_ms, 3),
+        }
+
+
+class Stage:
+    """Satu tahap pipeline: antrean terbatas, worker dan fungsi pemroses."""
+
+    def __init__(
+        self,
+        name: str,
+        func: Callable[[Any], Any],
+        workers: int = 1,
+        maxsize: int = STAGE_QUEUE_SIZE,
+        executor: Executor | None = None,
+        key: Callable[[Any], Any] | None = None,
+    ) -> None:
+        self.name = name
+        self.func = func
+        self.workers = workers
+        self.maxsize = maxsize
+        self.executor = executor
+        self.key = key
+        self.metrics = StageMetrics()
+        self.next: "Stage | None" = None
+        self.pipeline: "SignalPipeline | None" = None
+        self.queue: asyncio.Queue | None = None
+        self._locks: Dict[Any, asyncio.Lock] = {}
+        self._tasks: List[asyncio.Task] = []
+
+    def start(self, loop: asyncio.AbstractEventLoop) -> None:
+        self.queue = asyncio.Queue(self.maxsize)
+        self._tasks = [loop.create_task(self._worker()) for _ in range(self.workers)]
+
+    def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+
+    def _note_depth(self) -> None:
+        self.metrics.max_depth = max(self.metrics.max_depth, self.queue.qsize())
+
+    async def put(self, entry: tuple) -> None:
+        await self.queue.put(entry)
+        self._note_depth()
+
+    def put_nowait(self, entry: tuple) -> bool:
+        """Masukkan tanpa menunggu; buang item tertua bila antrean penuh."""
+        dropped = False
+        while self.queue.full():
+            self.queue.get_nowait()
+            self.queue.task_done()
+            self.metrics.dropped += 1
+            dropped = True
+        self.queue.put_nowait(entry)
+        self._note_depth()
+        return not dropped
+
+    async def _run(self, item: Any) -> Any:
+        if inspect.iscoroutinefunction(self.func):
+            return await self.func(item)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self.func, item)
+
+    async def _worker(self) -> None:
+        while True:
+            item, created, queued = await self.queue.get()
+            try:
+                started = time.perf_counter()
+                key = self.key(item) if self.key else None
+                if key is None:
+                    result = await self._run(item)
+                else:
+                    lock = self._locks.setdefault(key, asyncio.Lock())
+                    async with lock:
+                        result = await self._run(item)
+                self.metrics.record(started - queued, time.perf_counter() - started)
+                if result is None:
+                    continue
+                if self.next is not None:
+                    await self.next.put((result, created, time.perf_counter()))
+                elif self.pipeline is not None:
+                    self.pipeline._finished(created)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.metrics.errors += 1
+                if self.pipeline is not None and self.pipeline.on_error is not None:
+                    try:
+                        self.pipeline.on_error(self.name, item, e)
+                    except Exception:
+                        log.exception(f"[PIPE] Handler error tahap {self.name} gagal")
+                else:
+                    log.warning(f"[PIPE] Tahap {self.name} gagal: {e}")
+            finally:
+                self.queue.task_done()
+
+
+class SignalPipeline:
+    """Rangkaian :class:`Stage` dengan metrik per tahap dan end-to-end."""
+
+    def __init__(self, stages: List[Stage], on_error: Callable[[str, Any, Exception], None] | None = None) -> None:
+        self.stages = stages
+        self.on_error = on_error
+        for stage, nxt in zip(stages, stages[1:] + [None]):
+            stage.next = nxt
+            stage.pipeline = self
+        self.completed = 0
+        self.latency_ms = 0.0
+        self.max_latency_ms = 0.0
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def is_running(self) -> bool:
+        return self._loop is not None
+
+    def start(self, loop: asyncio.AbstractEventLoop | None = None) -> "SignalPipeline":
+        self._loop = loop or asyncio.get_event_loop()
+        for stage in self.stages:
+            stage.start(self._loop)
+        return self
+
+    def stop(self) -> None:
+        for stage in self.stages:
+            stage.stop()
+        self._loop = None
+
+    def submit(self, item: Any) -> bool:
+        """Masukkan item ke tahap pertama tanpa menunggu (aman dari loop)."""
+        if self._loop is None:
+            return False
+        now = time.perf_counter()
+        return self.stages[0].put_nowait((item, now, now))
+
+    async def join(self) -> None:
+        """Tunggu sampai semua antrean kosong (untuk test / shutdown)."""
+        for stage in self.stages:
+            await stage.queue.join()
+
+    def _finished(self, created: float) -> None:
+        latency = (time.perf_counter() - created) * 1000
+        if self.completed == 0:
+            self.latency_ms = latency
+        else:
+            self.latency_ms += _EWMA * (latency - self.latency_ms)
+        self.max_latency_ms = max(self.max_latency_ms, latency)
+        self.completed += 1
+
+    def stats(self) -> Dict[str, Any]:
+        stages = {
+            s.name: s.metrics.as_dict(s.queue.qsize() if s.queue else 0, s.maxsize)
+            for s in self.stages
+        }
+        return {
+            "stages": stages,
+            "completed": self.completed,
+            "latency_ms": round(self.latency_ms, 3),
+            "max_latency_ms": round(self.max_latency_ms, 3),
+        }
+
+
+__all__ = ["SignalPipeline", "Stage", "StageMetrics", "STAGE_QUEUE_SIZE"]
@@ -0,0 +1,237 @@
+"""Multiplexer websocket combined-stream Binance Futures.
+
+Semua stream (ticker dan kline seluruh simbol) dibawa oleh satu koneksi
+``/stream?streams=a/b/c``; bila jumlah stream melewati ``MAX_STREAMS``,
+stream dibagi ke beberapa koneksi (shard). Pesan diteruskan ke handler
+sesuai nama stream. Handler async diproses berurutan per stream di task
+tersendiri sehingga pembaca socket tidak pernah tertahan.
+
+Koneksi yang putus dibuka ulang dengan backoff eksponensial; karena URL
+selalu memuat seluruh stream shard, langganan otomatis pulih.
+"""
+import asyncio
+import inspect
+import json
+import logging
+import os
+from typing import Any, Awaitable, Callable, Dict, Iterable, List
+
+import websockets
+
+FUTURES_STREAM_URL = "wss://fstream.binance.com/stream"
+TESTNET_STREAM_URL = "wss://stream.binancefuture.com/stream"
+MAX_STREAMS = 200  # batas stream per koneksi futures
+RECONNECT_MAX = 30.0
+MULTIPLEX_ENABLED = os.getenv("WS_MULTIPLEX", "1") != "0"
+
+Handler = Callable[[dict], Awaitable[None] | None]
+
+log = logging.getLogger(__name__)
+
+
+def ticker_stream(symbol: str) -> str:
+    return f"{symbol.lower()}@ticker"
+
+
+def kline_stream(symbol: str, interval: str) -> str:
+    return f"{symbol.lower()}@kline_{interval}"
+
+
+class _Shard:
+    """Satu koneksi websocket beserta daftar stream yang dibawanya."""
+
+    def __init__(self, mux: "StreamMux") -> None:
+        self.mux = mux
+        self.streams: List[str] = []
+        self.ws: Any = None
+        self.task: asyncio.Task | None = None
+        self._req_id = 0
+
+    def url(self, streams: List[str]) -> str:
+        return f"{self.mux.url}?streams={'/'.join(streams)}"
+
+    async def _send(self, method: str, streams: List[str]) -> None:
+        ws = self.ws
+        if ws is None:
+            return  # belum tersambung; stream ikut URL saat connect
+        self._req_id += 1
+        try:
+            await ws.send(json.dumps({"method": method, "params": streams, "id": self._req_id}))
+        except Exception as e:
+            log.warning(f"[WS] {method} {streams} gagal: {e}")
+
+    def request(self, method: str, streams: List[str]) -> None:
+        if self.ws is not None and self.mux._loop is not None:
+            self.mux._loop.create_task(self._send(method, streams))
+
+    async def run(self) -> None:
+        delay = 1.0
+        while self.streams:
+            try:
+                streams = list(self.streams)
+                async with websockets.connect(self.url(streams), max_size=None) as ws:
+                    self.ws = ws
+                    delay = 1.0
+                    # Stream yang ditambahkan selama proses connect
+                    late = [name for name in self.streams if name not in streams]
+                    if late:
+                        await self._send("SUBSCRIBE", late)
+                    log.info(f"[WS] Combined stream tersambung ({len(self.streams)} stream)")
+                    async for raw in ws:
+                        self.mux.dispatch(json.loads(raw))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log.warning(f"[WS] Combined stream terputus: {e}")
+            finally:
+                self.ws = None
+            if not self.streams:
+                break
+            self.mux.reconnects += 1
+            log.info(f"[WS] Menyambung ulang dalam {delay:.0f}s")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, RECONNECT_MAX)
+
+
+class StreamMux:
+    """Router pesan combined-stream ke handler per nama stream."""
+
+    def __init__(self, url: str = FUTURES_STREAM_URL, max_streams: int = MAX_STREAMS) -> None:
+        self.url = url
+        self.max_streams = max_streams
+        self.reconnects = 0
+        self._handlers: Dict[str, Handler] = {}
+        self._shards: List[_Shard] = []
+        self._queues: Dict[str, asyncio.Queue] = {}
+        self._workers: Dict[str, asyncio.Task] = {}
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    @property
+    def streams(self) -> List[str]:
+        return list(self._handlers)
+
+    @property
+    def connections(self) -> int:
+        return sum(1 for s in self._shards if s.streams)
+
+    def is_running(self) -> bool:
+        return any(s.task is not None and not s.task.done() for s in self._shards)
+
+    def subscribe(self, stream: str, handler: Handler) -> None:
+        """Daftarkan ``handler`` untuk ``stream``; koneksi aktif ikut SUBSCRIBE."""
+        known = stream in self._handlers
+        self._handlers[stream] = handler
+        if known:
+            return
+        shard = next((s for s in self._shards if len(s.streams) < self.max_streams), None)
+        if shard is None:
+            shard = _Shard(self)
+            self._shards.append(shard)
+        shard.streams.append(stream)
+        shard.request("SUBSCRIBE", [stream])
+        if self._loop is not None and (shard.task is None or shard.task.done()):
+            shard.task = self._loop.create_task(shard.run())
+
+    def unsubscribe(self, stream: str) -> None:
+        if self._handlers.pop(stream, None) is None:
+            return
+        worker = self._workers.pop(stream, None)
+        if worker is not None:
+            worker.cancel()
+        self._queues.pop(stream, None)
+        for shard in self._shards:
+            if stream in shard.streams:
+                shard.streams.remove(stream)
+                if shard.streams:
+                    shard.request("UNSUBSCRIBE", [stream])
+                elif shard.task is not None:
+                    shard.task.cancel()
+                    shard.task = None
+
+    def start(self, loop: asyncio.AbstractEventLoop | None = None) -> None:
+        """Jadwalkan koneksi semua shard pada ``loop``.
+
+        Loop pertama dipertahankan agar pemanggil berikutnya (stream harga
+        dan sinyal) berbagi koneksi yang sama.
+        """
+        if self._loop is None or self._loop.is_closed():
+            self._loop = loop or asyncio.get_event_loop()
+        for shard in self._shards:
+            if shard.streams and (shard.task is None or shard.task.done()):
+                shard.task = self._loop.create_task(shard.run())
+
+    def stop(self) -> None:
+        """Batalkan koneksi dan worker; langganan dibuang."""
+        for task in [s.task for s in self._shards] + list(self._workers.values()):
+            if task is not None:
+                task.cancel()
+        self._shards.clear()
+        self._workers.clear()
+        self._queues.clear()
+        self._handlers.clear()
+
+    def dispatch(self, msg: dict) -> None:
+        """Teruskan satu pesan ``{"stream": ..., "data": ...}`` ke handlernya."""
+        stream = msg.get("stream")
+        handler = self._handlers.get(stream) if stream else None
+        if handler is None:
+            return  # respons SUBSCRIBE atau stream yang sudah dilepas
+        data = msg.get("data", {})
+        if inspect.iscoroutinefunction(handler):
+            queue = self._queues.get(stream)
+            if queue is None:
+                queue = self._queues[stream] = asyncio.Queue()
+                self._workers[stream] = asyncio.get_running_loop().create_task(self._drain(stream, queue))
+            queue.put_nowait(data)
+            return
+        try:
+            handler(data)
+        except Exception as e:
+            log.warning(f"[WS] Handler {stream} gagal: {e}")
+
+    async def _drain(self, stream: str, queue: asyncio.Queue) -> None:
+        while True:
+            data = await queue.get()
+            handler = self._handlers.get(stream)
+            if handler is None:
+                return
+            try:
+                await handler(data)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log.warning(f"[WS] Handler {stream} gagal: {e}")
+
+
+_shared: StreamMux | None = None
+
+
+def shared_mux(testnet: bool = False) -> StreamMux:
+    """Multiplexer bersama proses ini untuk stream harga dan sinyal."""
+    global _shared
+    url = TESTNET_STREAM_URL if testnet else FUTURES_STREAM_URL
+    if _shared is None or (not _shared.streams and _shared.url != url):
+        _shared = StreamMux(url)
+    return _shared
+
+
+def release_shared(streams: Iterable[str] = ()) -> None:
+    """Lepas ``streams`` dari multiplexer bersama; hentikan bila sudah kosong."""
+    global _shared
+    if _shared is None:
+        return
+    for stream in streams:
+        _shared.unsubscribe(stream)
+    if not _shared.streams:
+        _shared.stop()
+        _shared = None
+
+
+__all__ = [
+    "StreamMux",
+    "shared_mux",
+    "release_shared",
+    "ticker_stream",
+    "kline_stream",
+    "MULTIPLEX_ENABLED",
+]
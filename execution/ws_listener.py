@@ -1,9 +1,10 @@
 import asyncio
 import nest_asyncio
 from binance import AsyncClient, BinanceSocketManager
-import threading
 from typing import Dict, Optional
 from notifications.notifier import laporkan_error
+from execution import stream_mux
+from execution.price_store import MAX_PRICE_AGE, PriceSnapshot, PriceStore
 
 _loop: asyncio.AbstractEventLoop | None = None
 
@@ -17,31 +18,65 @@ def _ensure_loop() -> asyncio.AbstractEventLoop:
     else:
         nest_asyncio.apply()
     return _loop
-# data harga terakhir
-price_data: Dict[str, float] = {}
-price_lock = threading.Lock()
+# snapshot harga terakhir per simbol (pembacaan tanpa lock)
+price_store = PriceStore()
 
 _bsm: BinanceSocketManager | None = None
 _async_client: AsyncClient | None = None
 _tasks: Dict[str, asyncio.Task] = {}
+# Stream ticker yang dilanggan lewat multiplexer bersama
+_streams: list[str] = []
+MULTIPLEX = stream_mux.MULTIPLEX_ENABLED
 
 
-def get_price(symbol: str) -> Optional[float]:
-    """Mengambil harga terakhir dari memori."""
-    with price_lock:
-        return price_data.get(symbol)
+def get_price(symbol: str, max_age: Optional[float] = None) -> Optional[float]:
+    """Mengambil harga terakhir dari memori.
 
+    Bila ``max_age`` (detik) diberikan, harga yang lebih tua dianggap tidak
+    tersedia sehingga pemanggil tidak bertindak atas harga basi.
+    """
+    return price_store.price(symbol, max_age)
 
-def update_price(symbol: str, price: float) -> None:
+
+def get_price_snapshot(symbol: str) -> Optional[PriceSnapshot]:
+    """Harga, bid/ask, event time dan nomor urut update terakhir."""
+    return price_store.snapshot(symbol)
+
+
+def is_price_stale(symbol: str, max_age: float = MAX_PRICE_AGE) -> bool:
+    """True bila harga belum ada atau lebih tua dari ``max_age`` detik."""
+    return price_store.is_stale(symbol, max_age)
+
+
+def update_price(
+    symbol: str,
+    price: float,
+    bid: Optional[float] = None,
+    ask: Optional[float] = None,
+    event_time: Optional[int] = None,
+) -> None:
     """Memperbarui harga pada memori bersama."""
-    with price_lock:
-        price_data[symbol] = price
+    price_store.update(symbol, price, bid, ask, event_time)
 
 
 def clear_prices() -> None:
     """Mengosongkan data harga."""
-    with price_lock:
-        price_data.clear()
+    price_store.clear()
+
+
+def _to_float(value) -> Optional[float]:
+    return float(value) if value not in (None, "") else None
+
+
+def _on_ticker(data: dict) -> None:
+    """Handler ``<symbol>@ticker`` dari combined stream."""
+    update_price(
+        data["s"],
+        float(data["c"]),
+        bid=_to_float(data.get("b")),
+        ask=_to_float(data.get("a")),
+        event_time=data.get("E"),
+    )
 
 
 async def _socket_runner(symbol: str) -> None:
@@ -51,9 +86,7 @@ async def _socket_runner(symbol: str) -> None:
         while True:
             try:
                 msg = await s.recv()
-                sym = msg["s"]
-                price = float(msg["c"])
-                update_price(sym, price)
+                _on_ticker(msg)
             except asyncio.CancelledError:
                 break
             except Exception as e:  # pragma: no cover
@@ -62,9 +95,23 @@ async def _socket_runner(symbol: str) -> None:
 
 
 def start_price_stream(client, symbols):
-    """Memulai websocket harga."""
+    """Memulai websocket harga.
+
+    Secara default ticker semua simbol dilanggan pada multiplexer bersama
+    (satu koneksi untuk harga dan kline); ``WS_MULTIPLEX=0`` memakai satu
+    socket per simbol.
+    """
     global _bsm, _tasks, _async_client
     loop = _ensure_loop()
+    if MULTIPLEX:
+        mux = stream_mux.shared_mux(getattr(client, "testnet", False))
+        for sym in symbols:
+            stream = stream_mux.ticker_stream(sym)
+            mux.subscribe(stream, _on_ticker)
+            if stream not in _streams:
+                _streams.append(stream)
+        mux.start(loop)
+        return mux
     try:
         _async_client = loop.run_until_complete(
             AsyncClient.create(
@@ -89,6 +136,9 @@ def start_price_stream(client, symbols):
 def stop_price_stream(_: BinanceSocketManager | None) -> None:
     """Menghentikan websocket harga."""
     global _tasks, _bsm, _async_client
+    if _streams:
+        stream_mux.release_shared(_streams)
+        _streams.clear()
     for task in _tasks.values():
         task.cancel()
     _tasks.clear()
@@ -101,4 +151,4 @@ def stop_price_stream(_: BinanceSocketManager | None) -> None:
 
 def is_price_stream_running() -> bool:
     """Mengecek status stream harga."""
-    return bool(_tasks)
+    return bool(_tasks) or bool(_streams)
@@ -5,13 +5,21 @@ import streamlit as st
 import logging
 from utils.data_provider import fetch_latest_data
 from strategies_base.strategy_manager import StrategyManager
-from ml.predictor import predict_ml
+from ml.batch_predictor import MLBatcher
 from database.signal_logger import log_signal, init_db
+from utils.ohlcv_buffer import OHLCVRingBuffer, interval_to_ms
+from utils.tf_cache import TimeframeCache
+from execution import stream_mux
+from execution.signal_pipeline import SignalPipeline, Stage
 import utils.bot_flags as bot_flags
 from binance.client import Client
 from notifications.notifier import laporkan_error, kirim_notifikasi_telegram
 from collections import defaultdict, Counter
+from concurrent.futures import ThreadPoolExecutor
+from operator import itemgetter
+import os
 import time
+import pandas as pd
 
 log = logging.getLogger(__name__)
 _loop: asyncio.AbstractEventLoop | None = None
@@ -36,6 +44,22 @@ ws_manager: BinanceSocketManager | None = None
 async_client: AsyncClient | None = None
 client_global: Client | None = None
 _tasks: dict[str, asyncio.Task] = {}
+# Stream kline yang dilanggan lewat multiplexer bersama
+_streams: list[str] = []
+_idle_notified: dict[str, bool] = {}
+MULTIPLEX = stream_mux.MULTIPLEX_ENABLED
+WINDOW_SIZE = 100
+_indicator_streams: dict = {}
+_buffers: dict[str, OHLCVRingBuffer] = {}
+_ml_batcher = MLBatcher()
+FEATURE_WORKERS = int(os.getenv("SIGNAL_FEATURE_WORKERS", 4))
+_pipeline: SignalPipeline | None = None
+_worker_pool: ThreadPoolExecutor | None = None
+_order_pool: ThreadPoolExecutor | None = None
+HIGHER_TFS = ("1h", "4h")
+_tf_caches: dict[str, TimeframeCache] = {}
+# simbol -> tf -> (kunci bar, (long_ok, short_ok))
+_htf_state: dict[str, dict[str, tuple]] = {}
 
 
 def apply_indicators(df, params):
@@ -45,10 +69,12 @@ def apply_indicators(df, params):
     return strat.apply_indicators(df)
 
 
-def generate_signals_pythontrading_style(df, params, symbol: str = ""):
+def generate_signals_pythontrading_style(
+    df, params, symbol: str = "", timeframe: str | None = None, ml_precomputed: bool = False
+):
     strat = StrategyManager.get("ScalpingStrategy")
     strat.load_config(params)
-    return strat.generate_signals(df, symbol)
+    return strat.generate_signals(df, symbol, timeframe, ml_precomputed=ml_precomputed)
 
 
 def generate_signals_legacy(df, threshold, symbol: str | None = None, config: dict | None = None):
@@ -57,22 +83,116 @@ def generate_signals_legacy(df, threshold, symbol: str | None = None, config: di
     return generate_signals_pythontrading_style(df, params, symbol or "")
 
 
-def _higher_tf_trend(symbol: str, params: dict) -> tuple[bool, bool]:
-    """Validasi arah tren pada timeframe 1H dan 4H."""
+def _trend_flags(df: pd.DataFrame, params: dict) -> tuple[bool, bool]:
+    df = apply_indicators(df, params)
+    ema, sma = df['ema'].iloc[-1], df['sma'].iloc[-1]
+    return bool(ema > sma), bool(ema < sma)
+
+
+def _seed_higher_tf(symbol: str, cache: TimeframeCache, tf: str, open_time: int) -> None:
+    """Seed satu timeframe besar: bar tertutup dan bucket berjalan via REST."""
+    current = pd.to_datetime(open_time, unit="ms")
+    step = pd.Timedelta(milliseconds=interval_to_ms(tf))
+    df = fetch_latest_data(symbol, client_global, interval=tf, limit=WINDOW_SIZE + 1)
+    closed = df[df.index + step <= current]
+    start = closed.index[-1] + step if not closed.empty else current - step
+    missing = int((current - start) / pd.Timedelta(milliseconds=cache.base_ms))
+    base = None
+    if missing > 0:
+        base = fetch_latest_data(symbol, client_global, interval=cache.base_tf, limit=missing + 1)
+        base = base[(base.index >= start) & (base.index < current)]
+    cache.seed(tf, closed, base)
+
+
+def _higher_tf_cache(symbol: str, kline: dict | None, timeframe: str) -> TimeframeCache | None:
+    """Cache bar 1H/4H simbol yang diperbarui dengan kline dasar tertutup.
+
+    REST hanya dipakai saat seed pertama atau setelah bar dasar terputus.
+    ``None`` bila cache tidak bisa dipakai sehingga pemanggil memakai REST.
+    """
+    if not kline or "t" not in kline:
+        return None
+    open_time = int(kline["t"])
+    cache = _tf_caches.get(symbol)
+    if (
+        cache is None
+        or cache.base_tf != timeframe
+        or (cache.last_time is not None and open_time - cache.last_time > cache.base_ms)
+    ):
+        cache = TimeframeCache(timeframe, HIGHER_TFS, WINDOW_SIZE)
+        if len(cache.tfs) != len(HIGHER_TFS):
+            return None
+        _tf_caches[symbol] = cache
+    for tf in cache.tfs:
+        if not cache.seeded(tf):
+            _seed_higher_tf(symbol, cache, tf, open_time)
+    cache.append(open_time, _kline_to_bar(kline))
+    return cache
+
+
+def _cached_trend(symbol: str, tf: str, bar_key: int, params: dict, load) -> tuple[bool, bool]:
+    """Arah tren ``tf``; indikator dihitung ulang hanya saat bar ``tf`` berganti.
+
+    ``bar_key`` menandai bar tertutup terakhir (atau bucket berjalan untuk
+    jalur REST); ``load`` dipanggil untuk mengambil data hanya bila perlu.
+    """
+    key = (bar_key, repr(sorted(params.items())))
+    state = _htf_state.setdefault(symbol, {})
+    hit = state.get(tf)
+    if hit is not None and hit[0] == key:
+        return hit[1]
+    flags = _trend_flags(load(), params)
+    state[tf] = (key, flags)
+    return flags
+
+
+def _closed_rest_frame(symbol: str, tf: str) -> pd.DataFrame:
+    """Bar ``tf`` dari REST tanpa bar yang belum tutup (sama dengan jalur cache)."""
+    df = fetch_latest_data(symbol, client_global, interval=tf, limit=WINDOW_SIZE + 1)
+    now = pd.Timestamp(time.time(), unit="s")
+    return df[df.index + pd.Timedelta(milliseconds=interval_to_ms(tf)) <= now]
+
+
+def _higher_tf_trend(
+    symbol: str, params: dict, kline: dict | None = None, timeframe: str = "5m"
+) -> tuple[bool, bool]:
+    """Validasi arah tren pada timeframe 1H dan 4H.
+
+    Tren dihitung hanya dari bar 1H/4H yang sudah tutup, baik lewat
+    :class:`TimeframeCache` maupun fallback REST; bar yang masih berjalan
+    tidak ikut dinilai. Hasil per simbol disimpan dan baru dihitung ulang
+    ketika bar 1H/4H tutup, sehingga kline dasar di antaranya tidak memicu
+    REST maupun perhitungan indikator.
+    """
     long_ok = short_ok = False
     if client_global is None:
         log.warning(f"[TF] Binance client_global belum siap, skip filter higher TF untuk {symbol}")
         return True, True  # fallback: tidak blok sinyal
     try:
-        df1h = fetch_latest_data(symbol, client_global, interval="1h", limit=100)
-        df1h = apply_indicators(df1h, params)
-        long1 = df1h['ema'].iloc[-1] > df1h['sma'].iloc[-1]
-        short1 = df1h['ema'].iloc[-1] < df1h['sma'].iloc[-1]
-
-        df4h = fetch_latest_data(symbol, client_global, interval="4h", limit=100)
-        df4h = apply_indicators(df4h, params)
-        long4 = df4h['ema'].iloc[-1] > df4h['sma'].iloc[-1]
-        short4 = df4h['ema'].iloc[-1] < df4h['sma'].iloc[-1]
+        try:
+            cache = _higher_tf_cache(symbol, kline, timeframe)
+        except Exception as e:
+            log.debug(f"Cache higher TF {symbol} tidak tersedia: {e}")
+            _tf_caches.pop(symbol, None)
+            cache = None
+        flags = []
+        for tf in HIGHER_TFS:
+            if cache is not None:
+                flags.append(
+                    _cached_trend(symbol, tf, cache.last_closed(tf), params, lambda tf=tf: cache.frame(tf))
+                )
+            else:
+                bucket = int(time.time() * 1000) // interval_to_ms(tf)
+                flags.append(
+                    _cached_trend(
+                        symbol,
+                        tf,
+                        bucket,
+                        params,
+                        lambda tf=tf: _closed_rest_frame(symbol, tf),
+                    )
+                )
+        (long1, short1), (long4, short4) = flags
 
         long_ok = long1 and long4
         short_ok = short1 and short4
@@ -82,15 +202,243 @@ def _higher_tf_trend(symbol: str, params: dict) -> tuple[bool, bool]:
     return long_ok, short_ok
 
 
+def _kline_to_bar(kline: dict) -> dict:
+    """Ubah payload ``msg["k"]`` menjadi bar OHLCV."""
+    return {
+        "timestamp": pd.to_datetime(kline["t"], unit="ms"),
+        "open": float(kline["o"]),
+        "high": float(kline["h"]),
+        "low": float(kline["l"]),
+        "close": float(kline["c"]),
+        "volume": float(kline["v"]),
+    }
+
+
+def _seed_stream(symbol: str, params: dict, timeframe: str, open_time: int) -> bool:
+    """Seed state indikator dan ring buffer simbol dari satu request REST."""
+    strat = StrategyManager.get("ScalpingStrategy")
+    strat.load_config(params)
+    stream = strat.create_indicator_stream()
+    if stream is None:
+        return False
+    df = fetch_latest_data(symbol, client_global, interval=timeframe, limit=WINDOW_SIZE)
+    if df.empty:
+        return False
+    df = df[df.index < pd.to_datetime(open_time, unit="ms")]
+    seeded = stream.seed(df)
+    buf = OHLCVRingBuffer(WINDOW_SIZE, interval_to_ms(timeframe), seeded.columns)
+    for ts, row in zip(seeded.index, seeded.to_dict("records")):
+        buf.append(int(ts.value // 1_000_000), row)
+    _indicator_streams[symbol] = stream
+    _buffers[symbol] = buf
+    return True
+
+
+def _backfill(symbol: str, timeframe: str, open_time: int) -> None:
+    """Isi bar yang terlewat sebelum ``open_time`` lewat REST."""
+    buf = _buffers[symbol]
+    stream = _indicator_streams[symbol]
+    missing = buf.missing_bars(open_time)
+    log.info(f"[WS] {symbol} kehilangan {missing} bar, backfill via REST")
+    df = fetch_latest_data(symbol, client_global, interval=timeframe, limit=missing + 2)
+    start = pd.to_datetime(buf.last_time, unit="ms")
+    df = df[(df.index > start) & (df.index < pd.to_datetime(open_time, unit="ms"))]
+    for ts, bar in zip(df.index, df.to_dict("records")):
+        buf.append(int(ts.value // 1_000_000), stream.update(bar))
+
+
+def _stream_frame(symbol: str, kline: dict, params: dict, timeframe: str) -> pd.DataFrame | None:
+    """Perbarui ring buffer dan state indikator dengan kline tertutup.
+
+    State di-seed sekali lewat REST; selanjutnya tiap kline cukup satu
+    ``update`` dan REST hanya dipakai bila urutan bar terputus. Mengembalikan
+    ``None`` bila mode inkremental tidak bisa dipakai sehingga pemanggil
+    memakai jalur lama.
+    """
+    try:
+        bar = _kline_to_bar(kline)
+        open_time = int(kline["t"])
+        buf = _buffers.get(symbol)
+        if buf is None or buf.missing_bars(open_time) >= WINDOW_SIZE:
+            if not _seed_stream(symbol, params, timeframe, open_time):
+                return None
+        elif buf.missing_bars(open_time):
+            _backfill(symbol, timeframe, open_time)
+        buf = _buffers[symbol]
+        if open_time > (buf.last_time or -1):
+            buf.append(open_time, _indicator_streams[symbol].update(bar))
+        return buf.to_frame()
+    except Exception as e:
+        log.debug(f"Indikator inkremental {symbol} tidak tersedia: {e}")
+        _indicator_streams.pop(symbol, None)
+        _buffers.pop(symbol, None)
+        return None
+
+
 def register_signal_handler(symbol: str, callback):
     signal_callbacks[symbol.upper()] = callback
 
 
+def _compute_features(job: dict) -> dict:
+    """Tahap fitur (thread pool): indikator kline dan filter tren 1H/4H."""
+    symbol, kline, params, timeframe = job["symbol"], job["kline"], job["params"], job["timeframe"]
+    df = _stream_frame(symbol, kline, params, timeframe)
+    if df is None:
+        df = fetch_latest_data(symbol, client_global, interval=timeframe, limit=WINDOW_SIZE)
+        df = apply_indicators(df, params)
+    job["df"] = df
+    job["trend"] = _higher_tf_trend(symbol, params, kline, timeframe)
+    return job
+
+
+async def _infer(job: dict) -> dict:
+    """Tahap inferensi: prediksi ML dibatch lintas simbol oleh ``_ml_batcher``."""
+    df, symbol = job["df"], job["symbol"]
+    try:
+        ml_sig, ml_conf = await _ml_batcher.predict(df, symbol, job["timeframe"])
+        df.loc[df.index[-1], 'ml_signal'] = ml_sig
+        df.loc[df.index[-1], 'ml_confidence'] = ml_conf
+    except Exception as e:  # pragma: no cover - fallback jika ML gagal
+        log.warning(f"ML signal {symbol} gagal: {e}")
+        df.loc[df.index[-1], 'ml_signal'] = 1
+        df.loc[df.index[-1], 'ml_confidence'] = 0.0
+    return job
+
+
+def _evaluate_signal(job: dict) -> dict:
+    """Tahap sinyal (thread pool): skor strategi, filter tren dan log sinyal."""
+    symbol, params = job["symbol"], job["params"]
+    # ml_signal/ml_confidence sudah diisi tahap _infer lewat batch ML
+    df = generate_signals_pythontrading_style(
+        job["df"], params, symbol, job["timeframe"], ml_precomputed=True
+    )
+    long_ok, short_ok = job["trend"]
+    last = df.iloc[-1]
+    last_long = bool(last.get("long_signal")) and long_ok
+    last_short = bool(last.get("short_signal")) and short_ok
+    last["long_signal"], last["short_signal"] = last_long, last_short
+    direction = "long" if last_long else "short" if last_short else "none"
+    score_val = float(
+        last.get("score_long" if last_long else "score_short", 0)
+    )
+    try:
+        log_signal(
+            symbol,
+            direction,
+            score_val,
+            components=last.get("components_detail"),
+            skip_reason=last.get("skip_reason", ""),
+        )
+    except Exception:
+        pass
+    job["last"] = last
+    return job
+
+
+async def _dispatch(job: dict) -> dict:
+    """Tahap dispatch: publish event di loop, jalur order di thread tersendiri."""
+    symbol, last = job["symbol"], job["last"]
+    if event_publisher:
+        try:
+            event_publisher(
+                {
+                    "symbol": symbol,
+                    "score": float(last.get("score", 0)),
+                    "long_signal": bool(last.get("long_signal")),
+                    "short_signal": bool(last.get("short_signal")),
+                    "skip_reason": last.get("skip_reason", ""),
+                    "components": last.get("components_detail", {}),
+                    "skip_reasons": last.get("skip_reasons", []),
+                }
+            )
+        except Exception as e:
+            log.warning(f"Publish event gagal: {e}")
+    _reason_counter[symbol][last.get("skip_reason", "")] += 1
+    now = time.time()
+    if now - _last_summary[symbol] >= 300:
+        top = _reason_counter[symbol].most_common(1)
+        if top:
+            _top_reasons[symbol] = top[0][0]
+            if event_publisher:
+                event_publisher(
+                    {"symbol": symbol, "top_reason": top[0][0]}
+                )
+        _reason_counter[symbol].clear()
+        _last_summary[symbol] = now
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(_order_pool, _deliver_signal, symbol, last)
+    return job
+
+
+def _deliver_signal(symbol: str, last) -> None:
+    """Panggil callback order simbol; satu thread agar state order berurutan."""
+    if symbol in signal_callbacks:
+        signal_callbacks[symbol](symbol, last)
+    if not last.get("long_signal") and not last.get("short_signal"):
+        logging.info(f"Skipped {symbol} - {last.get('skip_reason', 'wait')}")
+        if not _idle_notified.get(symbol):
+            kirim_notifikasi_telegram(f"Menunggu sinyal {symbol}...")
+            _idle_notified[symbol] = True
+    else:
+        _idle_notified[symbol] = False
+
+
+def _pipeline_error(stage: str, job: dict, error: Exception) -> None:
+    laporkan_error(f"WS signal error {job.get('symbol', '')} [{stage}]: {error}")
+
+
+def _start_pipeline(loop: asyncio.AbstractEventLoop, n_symbols: int) -> SignalPipeline:
+    """Bangun pipeline fitur -> inferensi -> sinyal -> dispatch pada ``loop``."""
+    global _pipeline, _worker_pool, _order_pool
+    _stop_pipeline()
+    _worker_pool = ThreadPoolExecutor(FEATURE_WORKERS, thread_name_prefix="signal")
+    _order_pool = ThreadPoolExecutor(1, thread_name_prefix="order")
+    _ml_batcher.executor = _worker_pool
+    by_symbol = itemgetter("symbol")
+    _pipeline = SignalPipeline(
+        [
+            Stage("features", _compute_features, FEATURE_WORKERS, executor=_worker_pool, key=by_symbol),
+            # Worker sebanyak simbol agar batcher bisa mengumpulkan satu candle
+            Stage("inference", _infer, max(1, n_symbols), key=by_symbol),
+            Stage("signal", _evaluate_signal, FEATURE_WORKERS, executor=_worker_pool, key=by_symbol),
+            Stage("dispatch", _dispatch, 1),
+        ],
+        on_error=_pipeline_error,
+    ).start(loop)
+    return _pipeline
+
+
+def _stop_pipeline() -> None:
+    global _pipeline, _worker_pool, _order_pool
+    if _pipeline is not None:
+        _pipeline.stop()
+        _pipeline = None
+    for pool in (_worker_pool, _order_pool):
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+    _worker_pool = _order_pool = None
+    _ml_batcher.executor = None
+
+
+def _submit_kline(symbol: str, kline: dict, params: dict, timeframe: str) -> None:
+    """Tahap terima: serahkan kline tertutup ke pipeline tanpa menunggu."""
+    if _pipeline is None:
+        log.warning(f"[WS] Pipeline sinyal belum berjalan, kline {symbol} diabaikan")
+        return
+    if not _pipeline.submit({"symbol": symbol, "kline": kline, "params": params, "timeframe": timeframe}):
+        log.warning("[WS] Antrean pipeline sinyal penuh, kline tertua dibuang")
+
+
+def get_pipeline_stats() -> dict:
+    """Kedalaman antrean dan latensi per tahap pipeline sinyal."""
+    return _pipeline.stats() if _pipeline is not None else {}
+
+
 async def _socket_runner(symbol: str, strategy_params: dict, timeframe: str):
     assert ws_manager is not None
     socket = ws_manager.kline_socket(symbol=symbol.lower(), interval=timeframe)
     async with socket as s:
-        idle_notified = False
+        _idle_notified[symbol] = False
         logging.info(f"\ud83d\udcf1 {symbol} Loop aktif - menunggu sinyal....")
         while True:
             try:
@@ -101,74 +449,7 @@ async def _socket_runner(symbol: str, strategy_params: dict, timeframe: str):
                 if st.session_state.get("stop_signal"):
                     break
                 if msg["k"]["x"]:
-                    df = fetch_latest_data(symbol, client_global, interval=timeframe, limit=100)
-                    df = apply_indicators(df, strategy_params[symbol])
-                    params = strategy_params[symbol]
-                    try:
-                        ml_sig, ml_conf = predict_ml(df, symbol)
-                        df.loc[df.index[-1], 'ml_signal'] = ml_sig
-                        df.loc[df.index[-1], 'ml_confidence'] = ml_conf
-                    except Exception as e:  # pragma: no cover - fallback jika ML gagal
-                        log.warning(f"ML signal {symbol} gagal: {e}")
-                        df.loc[df.index[-1], 'ml_signal'] = 1
-                        df.loc[df.index[-1], 'ml_confidence'] = 0.0
-                    df = generate_signals_pythontrading_style(df, params, symbol)
-                    signal_result = df.iloc[-1]
-                    long_ok, short_ok = _higher_tf_trend(symbol, strategy_params[symbol])
-                    last = signal_result
-                    last_long = bool(last.get("long_signal")) and long_ok
-                    last_short = bool(last.get("short_signal")) and short_ok
-                    last["long_signal"], last["short_signal"] = last_long, last_short
-                    direction = "long" if last_long else "short" if last_short else "none"
-                    score_val = float(
-                        last.get("score_long" if last_long else "score_short", 0)
-                    )
-                    try:
-                        log_signal(
-                            symbol,
-                            direction,
-                            score_val,
-                            components=last.get("components_detail"),
-                            skip_reason=last.get("skip_reason", ""),
-                        )
-                    except Exception:
-                        pass
-                    if event_publisher:
-                        try:
-                            event_publisher(
-                                {
-                                    "symbol": symbol,
-                                    "score": float(last.get("score", 0)),
-                                    "long_signal": bool(last_long),
-                                    "short_signal": bool(last_short),
-                                    "skip_reason": last.get("skip_reason", ""),
-                                    "components": last.get("components_detail", {}),
-                                    "skip_reasons": last.get("skip_reasons", []),
-                                }
-                            )
-                        except Exception as e:
-                            log.warning(f"Publish event gagal: {e}")
-                    _reason_counter[symbol][last.get("skip_reason", "")] += 1
-                    now = time.time()
-                    if now - _last_summary[symbol] >= 300:
-                        top = _reason_counter[symbol].most_common(1)
-                        if top:
-                            _top_reasons[symbol] = top[0][0]
-                            if event_publisher:
-                                event_publisher(
-                                    {"symbol": symbol, "top_reason": top[0][0]}
-                                )
-                        _reason_counter[symbol].clear()
-                        _last_summary[symbol] = now
-                    if symbol in signal_callbacks:
-                        signal_callbacks[symbol](symbol, last)
-                    if not last.get("long_signal") and not last.get("short_signal"):
-                        logging.info(f"Skipped {symbol} - {last.get('skip_reason', 'wait')}")
-                        if not idle_notified:
-                            kirim_notifikasi_telegram(f"Menunggu sinyal {symbol}...")
-                            idle_notified = True
-                    else:
-                        idle_notified = False
+                    _submit_kline(symbol, msg["k"], strategy_params[symbol], timeframe)
             except asyncio.CancelledError:
                 break
             except Exception as e:  # pragma: no cover
@@ -176,16 +457,60 @@ async def _socket_runner(symbol: str, strategy_params: dict, timeframe: str):
                 break
 
 
+def _kline_handler(symbol: str, strategy_params: dict, timeframe: str):
+    """Handler ``<symbol>@kline_<tf>`` untuk multiplexer combined stream."""
+
+    async def handle(data: dict) -> None:
+        kline = data.get("k", {})
+        if not kline.get("x") or st.session_state.get("stop_signal"):
+            return
+        if client_global is None:
+            log.warning(f"[WS] Binance client belum tersedia, abaikan sinyal {symbol}")
+            return
+        try:
+            _submit_kline(symbol, kline, strategy_params[symbol], timeframe)
+        except Exception as e:  # pragma: no cover
+            laporkan_error(f"WS signal error: {e}")
+
+    return handle
+
+
 def start_signal_stream(client, symbols: list[str], strategy_params, timeframe: str = "5m"):
-    """Mulai stream sinyal berdasarkan kline."""
+    """Mulai stream sinyal berdasarkan kline.
+
+    Secara default kline semua simbol dilanggan pada multiplexer bersama
+    dengan stream harga; ``WS_MULTIPLEX=0`` memakai satu socket per simbol.
+    Kline tertutup diproses oleh pipeline bertahap (fitur, inferensi,
+    sinyal, dispatch) sehingga penerima websocket tidak pernah menunggu.
+    """
     global ws_manager, client_global, _tasks, async_client
-    if not bot_flags.IS_READY or _tasks:
+    if not bot_flags.IS_READY or _tasks or _streams:
         if not bot_flags.IS_READY:
             print("Bot belum siap, signal stream tidak dimulai")
         return
     client_global = client
+    _indicator_streams.clear()
+    _buffers.clear()
+    _tf_caches.clear()
+    _htf_state.clear()
+    _ml_batcher.expected = len(symbols)
+    _idle_notified.clear()
     init_db()
     loop = _ensure_loop()
+    _start_pipeline(loop, len(symbols))
+    if MULTIPLEX:
+        mux = stream_mux.shared_mux(getattr(client, "testnet", False))
+        for sym in symbols:
+            stream = stream_mux.kline_stream(sym, timeframe)
+            mux.subscribe(stream, _kline_handler(sym, strategy_params, timeframe))
+            _streams.append(stream)
+            if sym in signal_callbacks:
+                try:
+                    signal_callbacks[sym](sym, {})
+                except Exception:
+                    pass
+        mux.start(loop)
+        return
     try:
         async_client = loop.run_until_complete(
             AsyncClient.create(
@@ -197,6 +522,7 @@ def start_signal_stream(client, symbols: list[str], strategy_params, timeframe:
         ws_manager = BinanceSocketManager(async_client)
     except Exception as e:  # pragma: no cover
         laporkan_error(f"WS signal init error: {e}")
+        _stop_pipeline()
         return
 
     for sym in symbols:
@@ -214,9 +540,13 @@ def start_signal_stream(client, symbols: list[str], strategy_params, timeframe:
 def stop_signal_stream() -> None:
     """Hentikan stream sinyal jika aktif."""
     global ws_manager, _tasks, async_client
+    if _streams:
+        stream_mux.release_shared(_streams)
+        _streams.clear()
     for task in _tasks.values():
         task.cancel()
     _tasks.clear()
+    _stop_pipeline()
     loop = _loop or asyncio.get_event_loop()
     if async_client:
         loop.run_until_complete(async_client.close_connection())
@@ -226,7 +556,7 @@ def stop_signal_stream() -> None:
 
 def is_signal_stream_running() -> bool:
     """Periksa apakah signal stream sedang aktif."""
-    return bool(_tasks)
+    return bool(_tasks) or bool(_streams)
 
 
 def get_top_reasons():
@@ -1,5 +1,11 @@
 """Modul indikator teknikal."""
-from .indicator_manager import register_indicator, compute_indicators
+from .indicator_manager import (
+    register_indicator,
+    compute_indicators,
+    IndicatorStream,
+    create_indicator_stream,
+)
+from .cache import IndicatorCache, indicator_cache, data_fingerprint
 
 # Impor indikator standar agar otomatis terdaftar
 def _load_standard() -> None:
@@ -11,4 +17,12 @@ try:
 except Exception:
     pass
 
-__all__ = ["register_indicator", "compute_indicators"]
+__all__ = [
+    "register_indicator",
+    "compute_indicators",
+    "IndicatorStream",
+    "create_indicator_stream",
+    "IndicatorCache",
+    "indicator_cache",
+    "data_fingerprint",
+]
@@ -1,15 +1,31 @@
 """Kelas dasar indikator."""
 from abc import ABC, abstractmethod
+from collections import deque
 from typing import Dict, Any
 import pandas as pd
 
 
 class BaseIndicator(ABC):
     name: str = ""
+    # Panjang riwayat untuk update bawaan yang menghitung ulang compute()
+    history_size: int = 500
 
     def __init__(self, **params: Any) -> None:
         self.params: Dict[str, Any] = params
+        self._history: deque = deque(maxlen=self.history_size)
 
     @abstractmethod
     def compute(self, df: pd.DataFrame) -> pd.Series | pd.DataFrame:
         raise NotImplementedError
+
+    def update(self, bar: Dict[str, Any]) -> Dict[str, float]:
+        """Perbarui indikator dengan satu bar baru dan kembalikan nilainya.
+
+        Implementasi bawaan menghitung ulang :meth:`compute` pada riwayat
+        terbatas; override untuk versi inkremental O(1).
+        """
+        self._history.append(bar)
+        result = self.compute(pd.DataFrame(list(self._history)))
+        if isinstance(result, pd.Series):
+            return {result.name: result.iloc[-1]}
+        return result.iloc[-1].to_dict()
@@ -0,0 +1,108 @@
+"""Cache LRU hasil indikator berdasarkan sidik data dan parameter."""
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Tuple
+
+import pandas as pd
+
+OHLCV_COLUMNS = ("open", "high", "low", "close", "volume")
+DEFAULT_MAX_BYTES = int(float(os.getenv("INDICATOR_CACHE_MB", 128)) * 1024 * 1024)
+
+
+def data_fingerprint(df: pd.DataFrame) -> str:
+    """Sidik data OHLCV: hash index dan kolom harga/volume.
+
+    Kolom indikator yang sudah ada di ``df`` tidak ikut dihitung sehingga
+    sidik tetap sama sebelum dan sesudah indikator ditambahkan.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    h.update(str(len(df)).encode())
+    if isinstance(df.index, pd.DatetimeIndex):
+        h.update(df.index.asi8.tobytes())
+    else:
+        h.update(pd.util.hash_pandas_object(df.index, index=False).to_numpy().tobytes())
+    for col in OHLCV_COLUMNS:
+        if col in df.columns:
+            h.update(col.encode())
+            h.update(df[col].to_numpy(dtype="float64", na_value=float("nan")).tobytes())
+    return h.hexdigest()
+
+
+def _params_key(params: Dict[str, Any]) -> Hashable:
+    try:
+        key = tuple(sorted(params.items()))
+        hash(key)
+        return key
+    except TypeError:
+        return repr(sorted(params.items()))
+
+
+def _nbytes(result: pd.Series | pd.DataFrame) -> int:
+    usage = result.memory_usage(index=True, deep=False)
+    return int(usage.sum()) if isinstance(usage, pd.Series) else int(usage)
+
+
+class IndicatorCache:
+    """LRU ``(sidik data, nama indikator, parameter) -> hasil`` dengan batas memori.
+
+    Entri paling lama tidak dipakai dibuang ketika total ukuran melewati
+    ``max_bytes``; ``max_bytes=0`` mematikan cache.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Tuple, Tuple[pd.Series | pd.DataFrame, int]]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(fingerprint: str, name: str, params: Dict[str, Any]) -> Tuple:
+        return fingerprint, name, _params_key(params)
+
+    def get(self, key: Tuple) -> pd.Series | pd.DataFrame | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: Tuple, result: pd.Series | pd.DataFrame) -> None:
+        size = _nbytes(result)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size -= old[1]
+            self._entries[key] = (result, size)
+            self._size += size
+            while self._size > self.max_bytes and self._entries:
+                _, (_, freed) = self._entries.popitem(last=False)
+                self._size -= freed
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+            self.hits = 0
+            self.misses = 0
+
+    @property
+    def nbytes(self) -> int:
+        return self._size
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+indicator_cache = IndicatorCache()
+
+
+__all__ = ["IndicatorCache", "indicator_cache", "data_fingerprint"]
@@ -1,8 +1,9 @@
 """Pengelola registrasi indikator."""
-from typing import Dict, Type, List
+from typing import Any, Dict, Type, List
 import pandas as pd
 
 from .base import BaseIndicator
+from .cache import data_fingerprint, indicator_cache
 
 _registry: Dict[str, Type[BaseIndicator]] = {}
 
@@ -12,15 +13,67 @@ def register_indicator(cls: Type[BaseIndicator]) -> Type[BaseIndicator]:
     return cls
 
 
-def compute_indicators(df: pd.DataFrame, indicators: List[str], params: Dict[str, Dict]) -> pd.DataFrame:
+def compute_indicators(
+    df: pd.DataFrame,
+    indicators: List[str],
+    params: Dict[str, Dict],
+    use_cache: bool = True,
+) -> pd.DataFrame:
+    """Tambahkan kolom indikator ke ``df``.
+
+    Hasil tiap indikator disimpan di :data:`indicator_cache` dengan kunci
+    (sidik data OHLCV, nama, parameter) sehingga trial optimizer dengan
+    parameter yang sama tidak menghitung ulang. Indikator diasumsikan hanya
+    membaca kolom OHLCV.
+    """
+    use_cache = use_cache and indicator_cache.max_bytes > 0
+    fingerprint = data_fingerprint(df) if use_cache else None
     for name in indicators:
         cls = _registry.get(name)
         if not cls:
             continue
-        indicator = cls(**params.get(name, {}))
-        result = indicator.compute(df)
+        ind_params = params.get(name, {})
+        key = indicator_cache.key(fingerprint, name, ind_params) if use_cache else None
+        result = indicator_cache.get(key) if use_cache else None
+        if result is None:
+            result = cls(**ind_params).compute(df)
+            if use_cache:
+                indicator_cache.put(key, result)
         if isinstance(result, pd.Series):
             df[result.name] = result
         else:
             df = df.join(result)
     return df
+
+
+class IndicatorStream:
+    """State indikator inkremental untuk satu simbol.
+
+    Di-seed sekali dari data historis lalu diperbarui per bar lewat
+    ``update`` milik tiap indikator terdaftar.
+    """
+
+    def __init__(self, indicators: List[str], params: Dict[str, Dict]) -> None:
+        self.indicators: List[BaseIndicator] = [
+            _registry[name](**params.get(name, {}))
+            for name in indicators
+            if name in _registry
+        ]
+        self.last: Dict[str, Any] = {}
+
+    def update(self, bar: Dict[str, Any]) -> Dict[str, Any]:
+        """Masukkan satu bar tertutup dan kembalikan bar beserta indikatornya."""
+        row = dict(bar)
+        for indicator in self.indicators:
+            row.update(indicator.update(bar))
+        self.last = row
+        return row
+
+    def seed(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Isi state dari data historis dan kembalikan nilai indikator per bar."""
+        rows = [self.update(bar) for bar in df.to_dict("records")]
+        return pd.DataFrame(rows, index=df.index)
+
+
+def create_indicator_stream(indicators: List[str], params: Dict[str, Dict]) -> IndicatorStream:
+    return IndicatorStream(indicators, params)
@@ -1,4 +1,8 @@
 """Kumpulan indikator teknikal standar."""
+import math
+from collections import deque
+from typing import Any, Dict
+
 from ta.trend import EMAIndicator as _EMA, SMAIndicator as _SMA, MACD as _MACD
 from ta.momentum import RSIIndicator as _RSI
 from ta.volatility import BollingerBands as _BB, AverageTrueRange as _ATR
@@ -7,38 +11,121 @@ import pandas as pd
 from .base import BaseIndicator
 from .indicator_manager import register_indicator
 
+NAN = float("nan")
+
+
+class _Ewm:
+    """EWM ``adjust=False`` inkremental, setara ``Series.ewm(...).mean()``."""
+
+    def __init__(self, alpha: float, min_periods: int) -> None:
+        self.alpha = alpha
+        self.min_periods = min_periods
+        self.value = NAN
+        self.count = 0
+
+    def update(self, x: float) -> float:
+        if x == x:
+            self.count += 1
+            if self.value != self.value:
+                self.value = x
+            elif self.value != x:
+                old = 1.0 - self.alpha
+                self.value = (old * self.value + self.alpha * x) / (old + self.alpha)
+        return self.value if self.count >= self.min_periods else NAN
+
+
+class _Window:
+    """Jendela geser berukuran tetap untuk rata-rata dan deviasi."""
+
+    def __init__(self, size: int) -> None:
+        self.size = size
+        self.values: deque = deque(maxlen=size)
+
+    def update(self, x: float) -> bool:
+        self.values.append(x)
+        return len(self.values) == self.size
+
+    def mean(self) -> float:
+        return math.fsum(self.values) / self.size
+
+    def std(self) -> float:
+        mean = self.mean()
+        return math.sqrt(math.fsum((v - mean) ** 2 for v in self.values) / self.size)
+
 
 @register_indicator
 class EMAIndicator(BaseIndicator):
     name = "ema"
 
+    def __init__(self, **params: Any) -> None:
+        super().__init__(**params)
+        window = self.params.get("window", 14)
+        self._ewm = _Ewm(2 / (window + 1), window)
+
     def compute(self, df: pd.DataFrame) -> pd.Series:
         window = self.params.get("window", 14)
         return _EMA(close=df["close"], window=window).ema_indicator().rename(self.name)
 
+    def update(self, bar: Dict[str, Any]) -> Dict[str, float]:
+        return {self.name: self._ewm.update(float(bar["close"]))}
+
 
 @register_indicator
 class SMAIndicator(BaseIndicator):
     name = "sma"
 
+    def __init__(self, **params: Any) -> None:
+        super().__init__(**params)
+        self._win = _Window(self.params.get("window", 14))
+
     def compute(self, df: pd.DataFrame) -> pd.Series:
         window = self.params.get("window", 14)
         return _SMA(close=df["close"], window=window).sma_indicator().rename(self.name)
 
+    def update(self, bar: Dict[str, Any]) -> Dict[str, float]:
+        full = self._win.update(float(bar["close"]))
+        return {self.name: self._win.mean() if full else NAN}
+
 
 @register_indicator
 class RSIIndicator(BaseIndicator):
     name = "rsi"
 
+    def __init__(self, **params: Any) -> None:
+        super().__init__(**params)
+        window = self.params.get("window", 14)
+        self._up = _Ewm(1 / window, window)
+        self._down = _Ewm(1 / window, window)
+        self._prev = NAN
+
     def compute(self, df: pd.DataFrame) -> pd.Series:
         window = self.params.get("window", 14)
         return _RSI(close=df["close"], window=window).rsi().rename(self.name)
 
+    def update(self, bar: Dict[str, Any]) -> Dict[str, float]:
+        close = float(bar["close"])
+        diff = close - self._prev
+        self._prev = close
+        up = self._up.update(diff if diff > 0 else 0.0)
+        down = self._down.update(-diff if diff < 0 else 0.0)
+        if down == 0:
+            return {self.name: 100.0}
+        return {self.name: 100 - (100 / (1 + up / down))}
+
 
 @register_indicator
 class MACDIndicator(BaseIndicator):
     name = "macd"
 
+    def __init__(self, **params: Any) -> None:
+        super().__init__(**params)
+        fast = self.params.get("fast", 12)
+        slow = self.params.get("slow", 26)
+        signal = self.params.get("signal", 9)
+        self._fast = _Ewm(2 / (fast + 1), fast)
+        self._slow = _Ewm(2 / (slow + 1), slow)
+        self._signal = _Ewm(2 / (signal + 1), signal)
+
     def compute(self, df: pd.DataFrame) -> pd.DataFrame:
         fast = self.params.get("fast", 12)
         slow = self.params.get("slow", 26)
@@ -50,11 +137,20 @@ class MACDIndicator(BaseIndicator):
         })
         return result
 
+    def update(self, bar: Dict[str, Any]) -> Dict[str, float]:
+        close = float(bar["close"])
+        macd = self._fast.update(close) - self._slow.update(close)
+        return {"macd": macd, "macd_signal": self._signal.update(macd)}
+
 
 @register_indicator
 class BollingerBandsIndicator(BaseIndicator):
     name = "bb"
 
+    def __init__(self, **params: Any) -> None:
+        super().__init__(**params)
+        self._win = _Window(self.params.get("window", 20))
+
     def compute(self, df: pd.DataFrame) -> pd.DataFrame:
         window = self.params.get("window", 20)
         dev = self.params.get("dev", 2)
@@ -65,12 +161,48 @@ class BollingerBandsIndicator(BaseIndicator):
             "bb_width": (bb.bollinger_hband() - bb.bollinger_lband()) / df["close"],
         })
 
+    def update(self, bar: Dict[str, Any]) -> Dict[str, float]:
+        close = float(bar["close"])
+        if not self._win.update(close):
+            return {"bb_upper": NAN, "bb_lower": NAN, "bb_width": NAN}
+        dev = self.params.get("dev", 2)
+        mavg = self._win.mean()
+        mstd = self._win.std()
+        upper = mavg + dev * mstd
+        lower = mavg - dev * mstd
+        return {"bb_upper": upper, "bb_lower": lower, "bb_width": (upper - lower) / close}
+
 
 @register_indicator
 class ATRIndicator(BaseIndicator):
     name = "atr"
 
+    def __init__(self, **params: Any) -> None:
+        super().__init__(**params)
+        self._count = 0
+        self._prev = NAN
+        self._first: list[float] = []
+        self._atr = 0.0
+
     def compute(self, df: pd.DataFrame) -> pd.Series:
         window = self.params.get("window", 14)
         atr = _ATR(df["high"], df["low"], df["close"], window=window)
         return atr.average_true_range().rename(self.name)
+
+    def update(self, bar: Dict[str, Any]) -> Dict[str, float]:
+        window = self.params.get("window", 14)
+        high = float(bar["high"])
+        low = float(bar["low"])
+        ranges = [high - low, abs(high - self._prev), abs(low - self._prev)]
+        tr = max(r for r in ranges if r == r)
+        self._prev = float(bar["close"])
+        self._count += 1
+        # Sama seperti ta: nol sebelum jendela penuh, lalu smoothing Wilder
+        if self._count < window:
+            self._first.append(tr)
+        elif self._count == window:
+            self._first.append(tr)
+            self._atr = math.fsum(self._first) / window
+        else:
+            self._atr = (self._atr * (window - 1) + tr) / float(window)
+        return {self.name: self._atr}
@@ -0,0 +1,64 @@
+"""Tahap batching inferensi ML lintas simbol pada batas candle."""
+import asyncio
+from concurrent.futures import Executor
+from typing import List, Tuple
+
+import pandas as pd
+
+from ml.predictor import extract_features, predict_ml_batch
+
+BATCH_WINDOW = 0.25  # detik menunggu simbol lain menutup candle yang sama
+
+
+class MLBatcher:
+    """Kumpulkan permintaan prediksi lalu jalankan dalam satu batch.
+
+    Tiap simbol memanggil :meth:`predict` setelah candle tertutup. Permintaan
+    ditahan paling lama ``window`` detik, atau sampai ``expected`` simbol
+    terkumpul, kemudian diprediksi bersama lewat :func:`predict_ml_batch`
+    di ``executor`` (default executor loop) agar loop tidak tertahan model.
+    """
+
+    def __init__(self, window: float = BATCH_WINDOW, expected: int = 0, executor: Executor | None = None) -> None:
+        self.window = window
+        self.expected = expected
+        self.executor = executor
+        self._pending: List[Tuple[str, str | None, pd.DataFrame | None, asyncio.Future]] = []
+        self._timer: asyncio.TimerHandle | None = None
+
+    async def predict(self, df: pd.DataFrame, symbol: str, timeframe: str | None = None) -> Tuple[int, float]:
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        self._pending.append((symbol, timeframe, extract_features(df), fut))
+        if self.expected and len(self._pending) >= self.expected:
+            self.flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self.flush)
+        return await fut
+
+    def flush(self) -> None:
+        """Prediksi semua permintaan yang tertunda."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        pending, self._pending = self._pending, []
+        if not pending:
+            return
+        loop = asyncio.get_running_loop()
+        job = loop.run_in_executor(self.executor, predict_ml_batch, [(s, tf, f) for s, tf, f, _ in pending])
+        job.add_done_callback(lambda done: self._resolve(pending, done))
+
+    @staticmethod
+    def _resolve(pending, done: asyncio.Future) -> None:
+        error = None if done.cancelled() else done.exception()
+        for i, (*_, fut) in enumerate(pending):
+            if fut.done():
+                continue
+            if done.cancelled():
+                fut.cancel()
+            elif error is not None:
+                fut.set_exception(error)
+            else:
+                fut.set_result(done.result()[i])
+
+__all__ = ["MLBatcher", "BATCH_WINDOW"]
@@ -0,0 +1,64 @@
+"""Registry model ML per (symbol, timeframe) dengan hot-reload."""
+import os
+import pickle
+import logging as log
+import threading
+from typing import Any, Dict, Tuple
+
+from utils.config_loader import load_global_config
+
+MODEL_DIR = "models"
+
+# path file model -> (mtime_ns, model); model None bila gagal dimuat
+_models: Dict[str, Tuple[int, Any]] = {}
+_lock = threading.Lock()
+
+
+def model_path(symbol: str, timeframe: str) -> str:
+    return os.path.join(MODEL_DIR, f"{symbol.upper()}_scalping_{timeframe}.pkl")
+
+
+def get_model(symbol: str, timeframe: str | None = None, path: str | None = None) -> Any:
+    """Ambil model dari cache dan muat ulang hanya bila file berubah.
+
+    Pengecekan per panggilan cukup satu ``os.stat``; unpickle hanya terjadi
+    saat pertama kali atau ketika mtime file model berganti. File yang gagal
+    dimuat dicatat sebagai ``(mtime, None)`` dan baru dicoba lagi setelah
+    file berubah. ``path`` menimpa lokasi default :func:`model_path`.
+    """
+    tf = timeframe or load_global_config().get("selected_timeframe", "5m")
+    path = path or model_path(symbol, tf)
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        with _lock:
+            _models.pop(path, None)
+        return None
+
+    cached = _models.get(path)
+    if cached and cached[0] == mtime:
+        return cached[1]
+
+    with _lock:
+        cached = _models.get(path)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        try:
+            with open(path, "rb") as f:
+                model = pickle.load(f)
+        except Exception as e:
+            log.error(f"[ML] Gagal memuat model {symbol} {tf}: {e}")
+            _models[path] = (mtime, None)
+            return None
+        _models[path] = (mtime, model)
+    log.info(f"[ML] Model {symbol} {tf} dimuat dari {path}")
+    return model
+
+
+def clear_models() -> None:
+    """Kosongkan cache model."""
+    with _lock:
+        _models.clear()
+
+
+__all__ = ["get_model", "clear_models", "model_path"]
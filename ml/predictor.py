@@ -1,37 +1,75 @@
-import os
-import pickle
 import logging as log
-from typing import Tuple
+from typing import Any, List, Sequence, Tuple
 
 import numpy as np
 import pandas as pd
 
+from ml.model_registry import get_model
 
-def predict_ml(df: pd.DataFrame, symbol: str) -> Tuple[int, float]:
+FEATURE_COLS = ['ema', 'sma', 'macd', 'rsi', 'atr', 'bb_width', 'volume']
+
+
+def extract_features(df: pd.DataFrame) -> pd.DataFrame | None:
+    """Ambil baris fitur bar terakhir; ``None`` bila masih ada NaN."""
+    fitur = df[FEATURE_COLS].ffill().iloc[-1:]
+    if fitur.isnull().values.any():
+        return None
+    return fitur
+
+
+def _predict_rows(model: Any, fitur: pd.DataFrame) -> List[Tuple[int, float]]:
+    if hasattr(model, "predict_proba"):
+        proba = np.asarray(model.predict_proba(fitur))
+        return list(zip(np.argmax(proba, axis=1).astype(int).tolist(), np.max(proba, axis=1).astype(float).tolist()))
+    return [(int(p), 0.5) for p in model.predict(fitur)]
+
+
+def predict_ml(df: pd.DataFrame, symbol: str, timeframe: str | None = None) -> Tuple[int, float]:
     """Prediksi sinyal ML untuk satu simbol."""
-    model_path = f"models/{symbol}_scalping_5m.pkl"
-    if not os.path.exists(model_path):
-        log.warning(f"[ML] Model tidak ditemukan: {model_path}")
+    model = get_model(symbol, timeframe)
+    if model is None:
+        log.warning(f"[ML] Model tidak ditemukan untuk {symbol} {timeframe or ''}".rstrip())
         return 1, 0.0
-    try:
-        with open(model_path, "rb") as f:
-            model = pickle.load(f)
-    except Exception as e:
-        log.error(f"[ML] Gagal memuat model {symbol}: {e}")
-        return 1, 0.0
-    fitur = df[['ema','sma','macd','rsi','atr','bb_width','volume']].ffill().iloc[-1:]
-    if fitur.isnull().values.any():
+    fitur = extract_features(df)
+    if fitur is None:
         log.warning("Fitur ML mengandung NaN, default ml_signal = 1")
         return 1, 0.0
     try:
-        if hasattr(model, "predict_proba"):
-            proba = model.predict_proba(fitur)[0]
-            konf = float(np.max(proba))
-            pred = int(np.argmax(proba))
-        else:
-            pred = int(model.predict(fitur)[0])
-            konf = 0.5
+        return _predict_rows(model, fitur)[0]
     except Exception as e:
         log.error(f"[ML] Prediksi ML {symbol} gagal: {e}")
         return 1, 0.0
-    return pred, konf
+
+
+def predict_ml_batch(
+    items: Sequence[Tuple[str, str | None, pd.DataFrame | None]]
+) -> List[Tuple[int, float]]:
+    """Prediksi banyak simbol sekaligus.
+
+    ``items`` berisi ``(symbol, timeframe, fitur)`` dengan ``fitur`` hasil
+    :func:`extract_features`. Baris yang memakai objek model yang sama
+    digabung sehingga ``predict_proba`` dipanggil sekali per model.
+    Urutan hasil mengikuti ``items``.
+    """
+    results: List[Tuple[int, float]] = [(1, 0.0)] * len(items)
+    groups: dict[int, tuple[Any, list[int]]] = {}
+    for i, (symbol, timeframe, fitur) in enumerate(items):
+        if fitur is None:
+            continue
+        model = get_model(symbol, timeframe)
+        if model is None:
+            log.warning(f"[ML] Model tidak ditemukan untuk {symbol} {timeframe or ''}".rstrip())
+            continue
+        groups.setdefault(id(model), (model, []))[1].append(i)
+
+    for model, idx in groups.values():
+        batch = pd.concat([items[i][2] for i in idx], ignore_index=True)
+        try:
+            preds = _predict_rows(model, batch)
+        except Exception as e:
+            symbols = ", ".join(items[i][0] for i in idx)
+            log.error(f"[ML] Prediksi ML batch {symbols} gagal: {e}")
+            continue
+        for i, pred in zip(idx, preds):
+            results[i] = pred
+    return results
@@ -155,8 +155,11 @@ def train_model(symbol: str, timeframe: str | None = None) -> float:
             logging.error("[ML] Folder %s tidak bisa ditulis, model tidak disimpan", model_dir)
         else:
             model_path = model_dir / f"{symbol}_scalping_{tf}.pkl"
-            with model_path.open("wb") as f:
+            # Tulis atomik agar registry model tidak membaca file setengah jadi
+            tmp_path = model_path.with_suffix(".pkl.tmp")
+            with tmp_path.open("wb") as f:
                 pickle.dump(model, f)
+            os.replace(tmp_path, model_path)
     else:
         print(
             f"[ML] Akurasi {acc:.2%} di bawah ambang {MIN_ACCURACY:.0%}, model tidak disimpan"
@@ -1,5 +1,10 @@
 import os
+import atexit
 import datetime
+import logging
+import threading
+import time
+from collections import deque
 from utils.logger import LOG_DIR
 try:
     import requests
@@ -13,20 +18,161 @@ except ModuleNotFoundError:
 
 TELEGRAM_TOKEN = os.getenv("TELEGRAM_TOKEN")
 TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID")
+HTTP_TIMEOUT = 10.0
+MAX_PENDING = 100  # pesan tertua dibuang bila antrean penuh
+PER_CHAT_INTERVAL = 1.0  # Telegram: ~1 pesan/detik per chat
+GLOBAL_INTERVAL = 1 / 30  # Telegram: ~30 pesan/detik per bot
+
+
+def _new_session():
+    session_cls = getattr(requests, "Session", None)
+    if session_cls is None:
+        return requests
+    session = session_cls()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=2)
+    session.mount("https://", adapter)
+    return session
+
+
+class TelegramDispatcher:
+    """Pengirim Telegram di thread latar agar jalur trading tidak menunggu.
+
+    Pesan identik yang masih antre digabung (diberi penanda ``(xN)``),
+    pengiriman dibatasi per chat dan global sesuai batas Telegram, respons
+    429 dihormati lewat ``retry_after``, dan bila antrean penuh pesan
+    tertua dibuang. ``session`` (objek dengan ``post``) bisa diberikan,
+    misalnya untuk test; default sesi HTTP keep-alive baru.
+    """
+
+    def __init__(self, max_pending: int = MAX_PENDING, session=None) -> None:
+        self.session = session if session is not None else _new_session()
+        self._pending: deque = deque()
+        self.max_pending = max_pending
+        self._cond = threading.Condition()
+        self._thread: threading.Thread | None = None
+        self._busy = False
+        self._last_chat: dict = {}
+        self._last_send = 0.0
+        self._blocked_until = 0.0
+        self.sent = 0
+        self.failed = 0
+        self.dropped = 0
+        self.coalesced = 0
+
+    def stats(self) -> dict:
+        return {
+            "pending": len(self._pending),
+            "sent": self.sent,
+            "failed": self.failed,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+        }
+
+    def submit(self, url: str, chat_id: str, text: str) -> None:
+        """Antrikan pesan; tidak pernah memblokir pemanggil."""
+        with self._cond:
+            for item in self._pending:
+                if item[1] == chat_id and item[2] == text:
+                    item[3] += 1
+                    self.coalesced += 1
+                    return
+            if len(self._pending) >= self.max_pending:
+                self._pending.popleft()
+                self.dropped += 1
+            self._pending.append([url, chat_id, text, 1])
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="telegram", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """Tunggu sampai antrean kosong; ``False`` bila waktu habis."""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while self._pending or self._busy:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def _next(self):
+        """Ambil pesan pertama yang boleh dikirim sekarang, atau waktu tunggu."""
+        now = time.monotonic()
+        wait = max(self._blocked_until, self._last_send + GLOBAL_INTERVAL) - now
+        if wait > 0:
+            return None, wait
+        wait = None
+        for i, item in enumerate(self._pending):
+            ready = self._last_chat.get(item[1], 0.0) + PER_CHAT_INTERVAL - now
+            if ready <= 0:
+                del self._pending[i]
+                return item, 0
+            wait = ready if wait is None else min(wait, ready)
+        return None, wait
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                item, wait = self._next()
+                while item is None:
+                    self._cond.wait(wait)
+                    item, wait = self._next()
+                self._busy = True
+                now = time.monotonic()
+                self._last_send = now
+                self._last_chat[item[1]] = now
+            try:
+                self._send(item)
+            finally:
+                with self._cond:
+                    self._busy = False
+                    self._cond.notify_all()
+
+    def _send(self, item: list) -> None:
+        url, chat_id, text, count = item
+        data = {
+            "chat_id": chat_id,
+            "text": text if count == 1 else f"{text} (x{count})",
+            "parse_mode": "Markdown"
+        }
+        try:
+            resp = self.session.post(url, data=data, timeout=HTTP_TIMEOUT)
+        except Exception as e:
+            self.failed += 1
+            logging.warning(f"[NOTIF] Gagal kirim Telegram: {e}")
+            return
+        if getattr(resp, "status_code", 200) == 429:
+            try:
+                retry = float(resp.json().get("parameters", {}).get("retry_after", 1))
+            except Exception:
+                retry = 1.0
+            with self._cond:
+                self._blocked_until = time.monotonic() + retry
+                self._pending.appendleft(item)
+            logging.warning(f"[NOTIF] Telegram membatasi pengiriman, tunggu {retry:.0f}s")
+            return
+        if getattr(resp, "ok", True) is False:
+            self.failed += 1
+            logging.warning(f"[NOTIF] Telegram menolak pesan: {getattr(resp, 'text', '')}")
+            return
+        self.sent += 1
+
+
+_dispatcher = TelegramDispatcher()
+atexit.register(lambda: _dispatcher.flush(timeout=5))
+
+
+def flush_notifications(timeout: float = 10.0) -> bool:
+    """Tunggu notifikasi yang masih antre terkirim (mis. saat shutdown)."""
+    return _dispatcher.flush(timeout)
+
 
 def kirim_notifikasi_telegram(pesan_markdown):
     if not TELEGRAM_TOKEN or not TELEGRAM_CHAT_ID:
         return
     url = f"https://api.telegram.org/bot{TELEGRAM_TOKEN}/sendMessage"
-    data = {
-        "chat_id": TELEGRAM_CHAT_ID,
-        "text": pesan_markdown,
-        "parse_mode": "Markdown"
-    }
-    try:
-        requests.post(url, data=data)
-    except Exception as e:
-        print(f"[NOTIF] Gagal kirim Telegram: {e}")
+    _dispatcher.submit(url, TELEGRAM_CHAT_ID, pesan_markdown)
 
 def kirim_notifikasi_entry(symbol, price, sl, tp, qty, order_id):
     msg = f"📈 *LONG ENTRY* [id {order_id}]: {symbol} @ {price}, SL: {sl}, TP: {tp}, Size: {qty}"
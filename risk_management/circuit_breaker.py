@@ -1,11 +1,72 @@
-from datetime import datetime, timezone
+import logging
+import threading
+from datetime import date, datetime, timezone
 import pandas as pd
-from database.sqlite_logger import get_all_trades
+from database.sqlite_logger import get_trades_filtered
 from notifications.notifier import kirim_notifikasi_telegram
 from risk_management.resume_state import save_resume_state, load_resume_state
 from utils import bot_flags
 
 
+def _utc_date(value) -> date | None:
+    try:
+        ts = pd.Timestamp(value)
+    except (TypeError, ValueError):
+        return None
+    if ts is pd.NaT:
+        return None
+    if ts.tzinfo is not None:
+        ts = ts.tz_convert("UTC")
+    return ts.date()
+
+
+class DailyPnL:
+    """Agregat PnL harian (UTC) yang diperbarui per trade tertutup.
+
+    Menyimpan total PnL, jumlah trade dan rentetan kerugian beruntun
+    terakhir untuk hari berjalan; reset otomatis saat tanggal UTC berganti.
+    """
+
+    def __init__(self, day: date | None = None) -> None:
+        self.day = day or datetime.now(timezone.utc).date()
+        self.pnl = 0.0
+        self.trades = 0
+        self.loss_streak = 0
+
+    @property
+    def drawdown(self) -> float:
+        return max(0.0, -self.pnl)
+
+    def rollover(self, today: date | None = None) -> bool:
+        """Mulai hari baru bila tanggal UTC sudah berganti."""
+        today = today or datetime.now(timezone.utc).date()
+        if today == self.day:
+            return False
+        self.day = today
+        self.pnl = 0.0
+        self.trades = 0
+        self.loss_streak = 0
+        return True
+
+    def add(self, pnl: float, day: date | None = None) -> bool:
+        """Catat satu trade; diabaikan bila bukan milik hari berjalan."""
+        if day is not None and day != self.day:
+            return False
+        pnl = float(pnl or 0.0)
+        self.pnl += pnl
+        self.trades += 1
+        self.loss_streak = self.loss_streak + 1 if pnl < 0 else 0
+        return True
+
+    def seed(self, df: pd.DataFrame) -> None:
+        """Isi dari histori hari ini (urutan bebas, diurutkan menurut waktu)."""
+        if df is None or df.empty:
+            return
+        df = df.sort_values("entry_time", kind="stable")
+        for entry_time, pnl in zip(df["entry_time"], df["pnl"]):
+            self.add(pnl, _utc_date(entry_time))
+
+
 class CircuitBreaker:
     def __init__(self, max_drawdown: float, max_losses: int):
         self.max_drawdown = max_drawdown
@@ -16,19 +77,29 @@ class CircuitBreaker:
         self.paused = state.get("paused", False)
         if self.paused:
             bot_flags.set_paused(True)
+        self._lock = threading.Lock()
+        self._daily = DailyPnL()
+        try:
+            self._daily.seed(self._get_today_trades())
+        except Exception as e:
+            logging.error(f"Gagal memuat trade hari ini untuk circuit breaker: {e}")
+        self._persisted = None
+
+    def record_trade(self, trade) -> None:
+        """Tambahkan trade tertutup ke agregat harian (listener ``log_trade``)."""
+        with self._lock:
+            self._daily.rollover()
+            self._daily.add(trade.pnl, _utc_date(trade.entry_time))
 
     def check(self) -> bool:
-        df = self._get_today_trades()
-        if not df.empty:
-            self.daily_drawdown = max(0.0, -df["pnl"].sum())
-            loss_flags = (df["pnl"] < 0).tolist()[::-1]
-            cnt = 0
-            for flag in loss_flags:
-                if flag:
-                    cnt += 1
-                else:
-                    break
-            self.consecutive_losses = cnt
+        with self._lock:
+            self._daily.rollover()
+            if self._daily.trades:
+                self.daily_drawdown = self._daily.drawdown
+                self.consecutive_losses = self._daily.loss_streak
+            else:
+                self.daily_drawdown = 0.0
+                self.consecutive_losses = 0
         triggered = (
             self.daily_drawdown >= self.max_drawdown
             or self.consecutive_losses >= self.max_losses
@@ -39,19 +110,20 @@ class CircuitBreaker:
             )
             self.paused = True
             bot_flags.set_paused(True)
-        save_resume_state(
-            {
-                "daily_drawdown": self.daily_drawdown,
-                "consecutive_losses": self.consecutive_losses,
-                "paused": self.paused,
-            }
-        )
+        state = {
+            "daily_drawdown": self.daily_drawdown,
+            "consecutive_losses": self.consecutive_losses,
+            "paused": self.paused,
+        }
+        if state != self._persisted:
+            save_resume_state(state)
+            self._persisted = state
         return self.paused
 
     def _get_today_trades(self) -> pd.DataFrame:
-        df = get_all_trades()
-        if df.empty:
-            return pd.DataFrame()
         today = datetime.now(timezone.utc).date()
-        df["entry_date"] = pd.to_datetime(df["entry_time"]).dt.date
-        return df[df["entry_date"] == today]
+        return get_trades_filtered(
+            start=today.isoformat(),
+            end=f"{today.isoformat()}T23:59:59",
+            columns=("entry_time", "pnl"),
+        )
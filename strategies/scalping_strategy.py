@@ -1,74 +1,74 @@
 import pandas as pd
-import pickle
 import os
 import logging
 import numpy as np
 from typing import Any
 
 from strategies_base.base_strategy import BaseStrategy
-from indicators.indicator_manager import compute_indicators
+from indicators.indicator_manager import (
+    IndicatorStream,
+    compute_indicators,
+    create_indicator_stream,
+)
+from ml import model_registry
 from utils.config_loader import load_global_config
 from utils.historical_data import MAX_DAYS
+from utils.tf_cache import resample_closed
 
 MODEL_PATH = "models/model_scalping.pkl"
-_ml_models: dict[str, Any] = {}
-_auto_trained: set[str] = set()
+_auto_trained: set[tuple[str, str]] = set()
+_missing: set[str] = set()
 
 def _get_model_path(symbol: str, timeframe: str | None = None) -> str:
     cfg = load_global_config()
     tf = timeframe or cfg.get("selected_timeframe", "5m")
-    return (
-        os.path.join("models", f"{symbol.upper()}_scalping_{tf}.pkl")
-        if symbol
-        else MODEL_PATH
-    )
+    return model_registry.model_path(symbol, tf) if symbol else MODEL_PATH
 
 def load_ml_model(symbol: str, path: str | None = None, timeframe: str | None = None) -> Any:
-    """Muat model ML per simbol sekali saat startup."""
-    global _ml_models, MODEL_PATH, _auto_trained
+    """Ambil model ML per simbol dan timeframe dari :mod:`ml.model_registry`.
+
+    Registry memuat ulang model saat file berubah sehingga hasil retrain
+    langsung terpakai. Tanpa ``symbol`` dipakai model default ``MODEL_PATH``.
+    """
+    global MODEL_PATH
     if path:
         MODEL_PATH = path
-    if symbol in _ml_models:
-        return _ml_models[symbol]
+    tf = timeframe or load_global_config().get("selected_timeframe", "5m")
+    model_path = _get_model_path(symbol, tf)
+    model = model_registry.get_model(symbol, tf, model_path)
+    if model is not None:
+        _missing.discard(model_path)
+        return model
 
-    model_path = _get_model_path(symbol, timeframe)
-    if os.path.exists(model_path):
-        with open(model_path, "rb") as f:
-            _ml_models[symbol] = pickle.load(f)
-        logging.info(f"Model ML {symbol or 'default'} berhasil dimuat.")
-        return _ml_models[symbol]
-
-    logging.error(f"Model ML untuk {symbol} tidak ditemukan di {model_path}.")
+    if model_path not in _missing:
+        logging.error(f"Model ML untuk {symbol} tidak ditemukan di {model_path}.")
+        _missing.add(model_path)
 
     # Auto-train jika MODE=test dan belum pernah
-    if os.getenv("MODE") == "test" and symbol not in _auto_trained:
+    if os.getenv("MODE") == "test" and (symbol, tf) not in _auto_trained:
         logging.info(f"Auto-training model untuk {symbol}...")
         try:
             from ml import historical_trainer
-            cfg = load_global_config()
             end = pd.Timestamp.utcnow().date().isoformat()
-            tf = timeframe or cfg.get("selected_timeframe", "5m")
             start = (
                 pd.Timestamp.utcnow() - pd.Timedelta(days=MAX_DAYS.get(tf, 30))
             ).date().isoformat()
-            historical_trainer.train_from_history(symbol, timeframe, start, end)
+            historical_trainer.train_from_history(symbol, tf, start, end)
         except Exception as e:  # pragma: no cover - training bisa gagal
             logging.error(f"Auto-training gagal: {e}")
-        _auto_trained.add(symbol)
-        if os.path.exists(model_path):
-            with open(model_path, "rb") as f:
-                _ml_models[symbol] = pickle.load(f)
+        _auto_trained.add((symbol, tf))
+        model = model_registry.get_model(symbol, tf, model_path)
+        if model is not None:
             logging.info(f"Model ML {symbol} dimuat setelah auto-training.")
-            return _ml_models[symbol]
+            return model
 
-    _ml_models[symbol] = None
     return None
 
 load_ml_model("")
 
-def generate_ml_signal(df, symbol: str = ""):
+def generate_ml_signal(df, symbol: str = "", timeframe: str | None = None):
     """Prediksi sinyal ML dan confidence untuk bar terakhir."""
-    model = load_ml_model(symbol)
+    model = load_ml_model(symbol, timeframe=timeframe)
     if model is None:
         logging.warning(f"Prediksi ML gagal atau model tidak ada untuk {symbol}, default ml_signal=1")
         df.loc[df.index[-1], 'ml_signal'] = 1
@@ -99,10 +99,44 @@ def generate_ml_signal(df, symbol: str = ""):
     df.loc[df.index[-1], 'ml_confidence'] = conf
     return df
 
+def generate_ml_signal_series(df, symbol: str = "", timeframe: str | None = None):
+    """Prediksi sinyal ML dan confidence untuk seluruh bar sekaligus.
+
+    Fitur di-ffill secara kausal sehingga nilai tiap bar sama dengan
+    hasil :func:`generate_ml_signal` pada potongan data sampai bar itu.
+    """
+    pred = pd.Series(1, index=df.index, dtype="int64")
+    conf = pd.Series(0.0, index=df.index)
+    model = load_ml_model(symbol, timeframe=timeframe)
+    if model is None:
+        logging.warning(f"Prediksi ML gagal atau model tidak ada untuk {symbol}, default ml_signal=1")
+        return pred, conf
+
+    features = df[
+        ['ema', 'sma', 'macd', 'rsi', 'atr', 'bb_width', 'volume']
+    ].ffill()
+    valid = ~features.isnull().any(axis=1)
+    if not valid.any():
+        return pred, conf
+    try:
+        if hasattr(model, "predict_proba"):
+            proba = np.asarray(model.predict_proba(features[valid]))
+            pred[valid] = np.argmax(proba, axis=1).astype(int)
+            conf[valid] = np.max(proba, axis=1).astype(float)
+        else:
+            pred[valid] = np.asarray(model.predict(features[valid])).astype(int)
+            conf[valid] = 0.5
+    except Exception as e:
+        logging.error(f"Prediksi ML {symbol} gagal: {e}")
+        pred[:] = 1
+        conf[:] = 0.0
+    return pred, conf
+
+
 class ScalpingStrategy(BaseStrategy):
     """Strategi scalping dengan dukungan indikator standar."""
 
-    def apply_indicators(self, df: pd.DataFrame) -> pd.DataFrame:
+    def indicator_spec(self) -> tuple[list[str], dict[str, dict]]:
         params = self.config
         ind_list = ["ema", "sma", "macd", "rsi", "bb", "atr"]
         ind_params = {
@@ -120,9 +154,29 @@ class ScalpingStrategy(BaseStrategy):
             },
             "atr": {"window": params.get("atr_period", 14)},
         }
+        return ind_list, ind_params
+
+    def apply_indicators(self, df: pd.DataFrame) -> pd.DataFrame:
+        ind_list, ind_params = self.indicator_spec()
         return compute_indicators(df, ind_list, ind_params)
 
-    def generate_signals(self, df: pd.DataFrame, symbol: str = "") -> pd.DataFrame:
+    def create_indicator_stream(self) -> IndicatorStream:
+        ind_list, ind_params = self.indicator_spec()
+        return create_indicator_stream(ind_list, ind_params)
+
+    def generate_signals(
+        self,
+        df: pd.DataFrame,
+        symbol: str = "",
+        timeframe: str | None = None,
+        ml_precomputed: bool = False,
+    ) -> pd.DataFrame:
+        """Skor sinyal bar terakhir.
+
+        ``ml_precomputed`` menandai ``ml_signal``/``ml_confidence`` bar
+        terakhir sudah diisi pemanggil (mis. batch ML lintas simbol) sehingga
+        prediksi tidak diulang.
+        """
         cfg = self.config
         rsi_th = cfg.get("rsi_threshold", 40)
         long_lower = rsi_th
@@ -140,7 +194,8 @@ class ScalpingStrategy(BaseStrategy):
             df["ml_signal"] = 1
         if "ml_confidence" not in df.columns:
             df["ml_confidence"] = 0.0
-        df = generate_ml_signal(df, symbol)
+        if not ml_precomputed:
+            df = generate_ml_signal(df, symbol, timeframe)
         if "skip_reason" not in df.columns:
             df["skip_reason"] = ""
         if "skip_reasons" not in df.columns:
@@ -197,7 +252,11 @@ class ScalpingStrategy(BaseStrategy):
         long_raw_last = bool(long_raw.iloc[-1])
         short_raw_last = bool(short_raw.iloc[-1])
 
-        long_ok, short_ok = confirm_by_higher_tf(df, cfg)
+        if {"htf_long_ok", "htf_short_ok"}.issubset(df.columns):
+            long_ok = bool(df["htf_long_ok"].iloc[-1])
+            short_ok = bool(df["htf_short_ok"].iloc[-1])
+        else:
+            long_ok, short_ok = confirm_by_higher_tf(df, cfg)
         df["swing_long"] = long_raw & long_ok
         df["swing_short"] = short_raw & short_ok
         if cfg.get("only_trend_15m", True):
@@ -237,34 +296,162 @@ class ScalpingStrategy(BaseStrategy):
         df.at[df.index[-1], "components_detail"] = components_detail
         return df
 
+    def generate_signals_vectorized(
+        self, df: pd.DataFrame, symbol: str = "", timeframe: str | None = None
+    ) -> pd.DataFrame:
+        """Hasilkan sinyal untuk seluruh bar dalam satu kali jalan.
 
-def confirm_by_higher_tf(df, config=None):
-    """Konfirmasi sinyal memakai timeframe lebih besar (15m).
+        Nilai tiap bar identik dengan baris terakhir hasil
+        :meth:`generate_signals` pada ``df.iloc[: i + 1]`` sehingga tidak ada
+        lookahead. Kolom ``htf_long_ok``/``htf_short_ok`` dihitung sekali
+        lewat :func:`higher_tf_confirmation` bila belum ada.
+        """
+        cfg = self.config
+        rsi_th = cfg.get("rsi_threshold", 40)
+        long_lower = rsi_th
+        long_upper = min(rsi_th + 30, 100)
+        short_lower = max(rsi_th - 10, 0)
+        short_upper = min(rsi_th + 20, 100)
 
-    Jika indeks bukan datetime atau interval bukan 5 menit,
-    fungsi mengembalikan konfirmasi True agar tidak menghambat proses.
+        ml_conf_th = cfg.get("ml_conf_threshold", 0.7)
+        use_hybrid = cfg.get("hybrid_fallback", True)
+        ml_weight = cfg.get("ml_weight", 1.0)
+        use_crossover = cfg.get("use_crossover_filter", True)
+        score_threshold = cfg.get("score_threshold", 2.0)
+        only_trend = cfg.get("only_trend_15m", True)
+
+        df["ml_signal"], df["ml_confidence"] = generate_ml_signal_series(df, symbol, timeframe)
+
+        cross_up = (df["ema"] > df["sma"]) & (df["ema"].shift(1) <= df["sma"].shift(1))
+        cross_down = (df["ema"] < df["sma"]) & (df["ema"].shift(1) >= df["sma"].shift(1))
+
+        macd_long = df["macd"] > df["macd_signal"]
+        macd_short = df["macd"] < df["macd_signal"]
+        rsi_long = (df["rsi"] > long_lower) & (df["rsi"] < long_upper)
+        rsi_short = (df["rsi"] > short_lower) & (df["rsi"] < short_upper)
+
+        ml_low = (df["ml_confidence"] < ml_conf_th) if use_hybrid else pd.Series(False, index=df.index)
+        cond_long_ml = ((df["ml_signal"] == 1) & ~ml_low).astype(float)
+        cond_short_ml = ((df["ml_signal"] == 0) & ~ml_low).astype(float)
+
+        trend_long = cross_up.astype(float) if use_crossover else (df["ema"] > df["sma"]).astype(float)
+        trend_short = cross_down.astype(float) if use_crossover else (df["ema"] < df["sma"]).astype(float)
+
+        score_long = (
+            trend_long + 0.5 * macd_long.astype(float) + 0.5 * rsi_long.astype(float) + ml_weight * cond_long_ml
+        )
+        score_short = (
+            trend_short + 0.5 * macd_short.astype(float) + 0.5 * rsi_short.astype(float) + ml_weight * cond_short_ml
+        )
+        df["score_long"] = score_long
+        df["score_short"] = score_short
+
+        low_vol = df["bb_width"] < cfg.get("min_bb_width", 0)
+        long_raw = (score_long >= score_threshold) & ~low_vol
+        short_raw = (score_short >= score_threshold) & ~low_vol
+        no_raw = ~long_raw & ~short_raw
+
+        if not {"htf_long_ok", "htf_short_ok"}.issubset(df.columns):
+            df = df.join(higher_tf_confirmation(df, cfg))
+        long_ok = df["htf_long_ok"].astype(bool)
+        short_ok = df["htf_short_ok"].astype(bool)
+        mismatch = (long_raw & ~long_ok) | (short_raw & ~short_ok)
+
+        df["swing_long"] = long_raw & long_ok
+        df["swing_short"] = short_raw & short_ok
+        if only_trend:
+            df["long_signal"] = df["swing_long"]
+            df["short_signal"] = df["swing_short"]
+        else:
+            df["long_signal"] = long_raw
+            df["short_signal"] = short_raw
+        df["signal_mode"] = np.where(df["swing_long"] | df["swing_short"], "swing", "scalp")
+        # Urutan kondisi mengikuti urutan pengisian skip_reasons di
+        # generate_signals; tiap bar paling banyak mendapat satu alasan.
+        no_signal = ~df["long_signal"] & ~df["short_signal"]
+        ma_flat = ~(df["ema"] > df["sma"]) & ~(df["ema"] < df["sma"])
+        reason = np.select(
+            [
+                low_vol,
+                no_raw & ml_low,
+                no_raw,
+                mismatch & only_trend,
+                no_signal & only_trend & (long_raw | short_raw) & (~long_ok | ~short_ok),
+                no_signal & ma_flat,
+                no_signal,
+            ],
+            [
+                "Volatilitas rendah",
+                "Confidence ML rendah",
+                "Menunggu konfirmasi indikator",
+                "Tidak searah trend 15m",
+                "Tidak searah trend 15m",
+                "MA not aligned",
+                "Score below threshold",
+            ],
+            default="",
+        )
+        df["skip_reason"] = reason
+        df["skip_reasons"] = [[r] if r else [] for r in reason]
+        df["components_detail"] = [
+            {
+                "trend": float(t),
+                "macd": float(m),
+                "rsi": float(r),
+                "ml": float(ml),
+                "bb_width": float(bb),
+                "ml_conf": float(c),
+            }
+            for t, m, r, ml, bb, c in zip(
+                (trend_long - trend_short).to_numpy(),
+                df["macd"].to_numpy(),
+                df["rsi"].to_numpy(),
+                df["ml_signal"].to_numpy(),
+                df["bb_width"].to_numpy(),
+                df["ml_confidence"].to_numpy(),
+            )
+        ]
+        return df
+
+
+def higher_tf_confirmation(
+    df: pd.DataFrame, config=None, htf: pd.DataFrame | None = None
+) -> pd.DataFrame:
+    """Konfirmasi timeframe lebih besar (15m) untuk seluruh bar sekaligus.
+
+    Bar 15m diambil dari ``htf`` (mis. store timeframe turunan) atau, bila
+    tidak diberikan, dibentuk sekali dari ``df``. Hasilnya dipetakan kembali
+    ke indeks asli hanya memakai bar 15m yang sudah tutup saat bar tersebut
+    tutup, sehingga tidak ada lookahead. Bar yang bukan data 5m (jarak ke
+    bar sebelumnya lebih dari 10 menit) atau belum memiliki cukup bar 15m
+    selalu dianggap lolos konfirmasi.
+
+    Returns
+    -------
+    pd.DataFrame
+        Kolom ``htf_long_ok`` dan ``htf_short_ok`` dengan indeks sama
+        seperti ``df``.
     """
     if config is None:
         config = {}
+    result = pd.DataFrame(
+        {"htf_long_ok": True, "htf_short_ok": True}, index=df.index
+    )
     if not isinstance(df.index, pd.DatetimeIndex) or len(df) < 3:
-        return True, True
+        return result
 
-    try:
-        delta = (df.index[-1] - df.index[-2]).total_seconds() / 60
-    except Exception:
-        return True, True
-    if delta > 10:  # bukan data 5m
-        return True, True
-
-    ohlc = {
-        'open': 'first',
-        'high': 'max',
-        'low': 'min',
-        'close': 'last',
-    }
-    df15 = df.resample('15min').agg(ohlc).dropna()
+    delta = df.index.to_series().diff()
+    is_5m = (delta <= pd.Timedelta(minutes=10)).to_numpy(copy=True)
+    is_5m[:2] = False
+    if not is_5m.any():
+        return result
+
+    if htf is not None:
+        df15 = htf.loc[: df.index[-1]]
+    else:
+        df15 = resample_closed(df[['open', 'high', 'low', 'close']], "15m")
     if df15.empty:
-        return True, True
+        return result
 
     min_window = max(
         config.get('ema_period', 20),
@@ -273,31 +460,49 @@ def confirm_by_higher_tf(df, config=None):
         config.get('macd_slow', 26),
         20,
     )
-    if len(df15) < min_window:
-        logging.warning(
-            "Data terlalu pendek untuk konfirmasi indikator di TF lebih besar. Tambah range data!"
-        )
-        return True, True
-
     try:
         df15 = apply_indicators(df15, config)
     except Exception as e:
         logging.warning(f"apply_indicators gagal (resample 15m): {e}")
-        return True, True
+        return result
     rsi_th = config.get('rsi_threshold', 40)
-    long_ok = (
-        (df15['ema'] > df15['sma'])
-        & (df15['macd'] > df15['macd_signal'])
-        & (df15['rsi'] > rsi_th)
-    ).iloc[-1]
-    short_ok = (
-        (df15['ema'] < df15['sma'])
-        & (df15['macd'] < df15['macd_signal'])
-        & (df15['rsi'] < rsi_th)
-    ).iloc[-1]
-    return bool(long_ok), bool(short_ok)
+    htf = pd.DataFrame(
+        {
+            "htf_long_ok": (df15['ema'] > df15['sma'])
+            & (df15['macd'] > df15['macd_signal'])
+            & (df15['rsi'] > rsi_th),
+            "htf_short_ok": (df15['ema'] < df15['sma'])
+            & (df15['macd'] < df15['macd_signal'])
+            & (df15['rsi'] < rsi_th),
+            "htf_bars": np.arange(1, len(df15) + 1),
+        }
+    )
+    # Bar 15m baru boleh dipakai setelah waktu tutupnya tercapai oleh
+    # waktu tutup bar dasar.
+    htf.index = htf.index + pd.Timedelta(minutes=15)
+    close_time = df.index + delta.fillna(pd.Timedelta(0)).to_numpy()
+    aligned = htf.reindex(close_time, method="ffill")
+
+    enough = (aligned["htf_bars"] >= min_window).to_numpy() & is_5m
+    if is_5m[-1] and not enough[-1]:
+        logging.warning(
+            "Data terlalu pendek untuk konfirmasi indikator di TF lebih besar. Tambah range data!"
+        )
+    for col in ("htf_long_ok", "htf_short_ok"):
+        flags = aligned[col].fillna(False).astype(bool).to_numpy()
+        result[col] = np.where(enough, flags, True)
+    return result
 
 
+def confirm_by_higher_tf(df, config=None):
+    """Konfirmasi sinyal bar terakhir memakai timeframe lebih besar (15m).
+
+    Jika indeks bukan datetime atau interval bukan 5 menit,
+    fungsi mengembalikan konfirmasi True agar tidak menghambat proses.
+    """
+    last = higher_tf_confirmation(df, config).iloc[-1]
+    return bool(last["htf_long_ok"]), bool(last["htf_short_ok"])
+
 
 def generate_signals_pythontrading_style(df, params: dict | None = None):
     if params is None:
@@ -331,12 +536,16 @@ def apply_indicators(df: pd.DataFrame, config: dict | None = None) -> pd.DataFra
 
 
 def generate_signals(
-    df: pd.DataFrame, score_threshold: float = 2.0, symbol: str = "", config: dict | None = None
+    df: pd.DataFrame,
+    score_threshold: float = 2.0,
+    symbol: str = "",
+    config: dict | None = None,
+    timeframe: str | None = None,
 ) -> pd.DataFrame:
     cfg = config.copy() if config else {}
     cfg.setdefault("score_threshold", score_threshold)
     strat = ScalpingStrategy(cfg)
-    return strat.generate_signals(df, symbol)
+    return strat.generate_signals(df, symbol, timeframe)
 
 
 def generate_signals_legacy(
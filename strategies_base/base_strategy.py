@@ -1,6 +1,6 @@
 """Kelas dasar untuk semua strategi trading."""
 from abc import ABC, abstractmethod
-from typing import Dict, Any
+from typing import Any, Dict, List, Tuple
 import pandas as pd
 
 
@@ -13,15 +13,37 @@ class BaseStrategy(ABC):
     def load_config(self, config: Dict[str, Any]) -> None:
         self.config.update(config)
 
+    def indicator_spec(self) -> Tuple[List[str], Dict[str, Dict[str, Any]]]:
+        """Nama indikator dan parameternya untuk konfigurasi saat ini."""
+        return [], {}
+
     def apply_indicators(self, df: pd.DataFrame) -> pd.DataFrame:
         """Terapkan indikator ke DataFrame. Override jika perlu."""
         return df
 
+    def create_indicator_stream(self) -> Any:
+        """State indikator inkremental untuk mode live.
+
+        Kembalikan ``None`` bila strategi belum mendukungnya agar pemanggil
+        menghitung ulang indikator dari data REST.
+        """
+        return None
+
     @abstractmethod
     def generate_signals(self, df: pd.DataFrame) -> pd.DataFrame:
         """Hasilkan sinyal trading dari DataFrame."""
         raise NotImplementedError
 
+    def generate_signals_vectorized(
+        self, df: pd.DataFrame, symbol: str = "", timeframe: str | None = None
+    ) -> pd.DataFrame | None:
+        """Hasilkan sinyal seluruh bar sekaligus tanpa lookahead.
+
+        Kembalikan ``None`` bila strategi belum mendukung mode ini agar
+        pemanggil kembali ke mode bar-per-bar.
+        """
+        return None
+
     def post_process(self, df: pd.DataFrame) -> pd.DataFrame:
         """Langkah opsional setelah sinyal dihasilkan."""
         return df
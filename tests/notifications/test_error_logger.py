@@ -2,14 +2,30 @@ import importlib
 import os
 from unittest.mock import patch, mock_open
 
+import pytest
+
+import notifications.notifier as notifier
+
+
+@pytest.fixture(autouse=True)
+def reset_notifier():
+    yield
+    notifier.flush_notifications(timeout=5)
+    with patch.dict(os.environ):
+        os.environ.pop("TELEGRAM_TOKEN", None)
+        os.environ.pop("TELEGRAM_CHAT_ID", None)
+        importlib.reload(notifier)
+
+
 def test_laporkan_error():
     with patch.dict(os.environ, {"TELEGRAM_TOKEN": "token", "TELEGRAM_CHAT_ID": "chat"}):
-        import notifications.notifier as notifier
         importlib.reload(notifier)
         m = mock_open()
         with patch("notifications.notifier.open", m), \
-             patch("notifications.notifier.requests.post") as mock_post:
+             patch.object(notifier._dispatcher, "session") as mock_session:
+            mock_post = mock_session.post
             notifier.laporkan_error("kesalahan fatal")
+            assert notifier.flush_notifications()
             m.assert_called_once_with(os.path.join("logs", "error.log"), "a")
             handle = m()
             assert "kesalahan fatal" in handle.write.call_args[0][0]
@@ -12,7 +12,6 @@ def test_ml_prediction(tmp_path, monkeypatch):
         pickle.dump(DummyModel(), f)
 
     monkeypatch.setattr(strat, 'MODEL_PATH', str(model_path))
-    strat._ml_models = {}
     strat.load_ml_model("")
 
     length = 20
@@ -1,4 +1,7 @@
-from backtest.engine import run_backtest
+import shutil
+from pathlib import Path
+
+from backtest.engine import backtest_symbols, run_backtest
 from backtest.data_loader import load_csv
 
 
@@ -10,5 +13,39 @@ def test_run_backtest():
     print(f"Backtest {len(trades)} trades, modal akhir: {final_capital}")
 
 
+def test_run_backtest_vectorized_parity():
+    df = load_csv("data/historical_data/1h/BTCUSDT_1h.csv").head(200)
+    cfg = {"score_threshold": 1.0, "hybrid_fallback": False, "use_crossover_filter": False}
+    t_vec, eq_vec, cap_vec = run_backtest(df.copy(), symbol="BTCUSDT", config=dict(cfg))
+    t_bar, eq_bar, cap_bar = run_backtest(
+        df.copy(), symbol="BTCUSDT", config=dict(cfg), vectorized=False
+    )
+    assert [t.to_dict() for t in t_vec] == [t.to_dict() for t in t_bar]
+    assert eq_vec.equals(eq_bar)
+    assert cap_vec == cap_bar
+
+
+def test_backtest_symbols_workers_match_serial(tmp_path, monkeypatch):
+    src = Path("data/historical_data/1h/BTCUSDT_1h.csv").resolve()
+    dst = tmp_path / "data" / "historical_data" / "1h"
+    dst.mkdir(parents=True)
+    for sym in ["BTCUSDT", "ETHUSDT"]:
+        shutil.copy(src, dst / f"{sym}_1h.csv")
+    monkeypatch.chdir(tmp_path)
+
+    serial = backtest_symbols(["ETHUSDT", "BTCUSDT"], "1h", export_path="out/serial.json")
+    streamed = []
+    paralel = backtest_symbols(
+        ["ETHUSDT", "BTCUSDT"],
+        "1h",
+        export_path="out/paralel.json",
+        workers=2,
+        on_result=lambda sym, met: streamed.append(sym),
+    )
+    assert paralel == serial
+    assert sorted(streamed) == ["BTCUSDT", "ETHUSDT"]
+    assert (tmp_path / "out/paralel.json").read_text() == (tmp_path / "out/serial.json").read_text()
+
+
 if __name__ == "__main__":
     test_run_backtest()
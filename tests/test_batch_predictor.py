@@ -0,0 +1,55 @@
+import asyncio
+
+import pandas as pd
+
+from ml import predictor
+from ml.batch_predictor import MLBatcher
+
+
+class CountingModel:
+    def __init__(self):
+        self.calls = 0
+
+    def predict_proba(self, X):
+        self.calls += 1
+        return [[0.3, 0.7] if row.rsi > 50 else [0.8, 0.2] for row in X.itertuples()]
+
+
+def _frame(rsi):
+    cols = ["ema", "sma", "macd", "rsi", "atr", "bb_width", "volume"]
+    row = {c: 1.0 for c in cols}
+    row["rsi"] = rsi
+    return pd.DataFrame([row])
+
+
+def test_batcher_groups_symbols_per_model(monkeypatch):
+    shared = CountingModel()
+    own = CountingModel()
+    models = {"BTCUSDT": shared, "ETHUSDT": shared, "SOLUSDT": own}
+    monkeypatch.setattr(predictor, "get_model", lambda s, tf=None: models.get(s))
+
+    async def runner():
+        batcher = MLBatcher(window=1.0, expected=4)
+        return await asyncio.gather(
+            batcher.predict(_frame(70), "BTCUSDT", "5m"),
+            batcher.predict(_frame(30), "ETHUSDT", "5m"),
+            batcher.predict(_frame(70), "SOLUSDT", "5m"),
+            batcher.predict(_frame(70), "XRPUSDT", "5m"),
+        )
+
+    res = asyncio.run(runner())
+    assert res == [(1, 0.7), (0, 0.8), (1, 0.7), (1, 0.0)]
+    assert shared.calls == 1
+    assert own.calls == 1
+
+
+def test_batcher_flushes_after_window(monkeypatch):
+    model = CountingModel()
+    monkeypatch.setattr(predictor, "get_model", lambda s, tf=None: model)
+
+    async def runner():
+        batcher = MLBatcher(window=0.01, expected=5)
+        return await batcher.predict(_frame(30), "BTCUSDT", "5m")
+
+    assert asyncio.run(runner()) == (0, 0.8)
+    assert model.calls == 1
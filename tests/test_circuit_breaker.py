@@ -9,10 +9,49 @@ def test_circuit_breaker_trigger(monkeypatch):
         'entry_time': [datetime.now(timezone.utc).isoformat()],
         'pnl': [-60.0],
     })
-    monkeypatch.setattr('risk_management.circuit_breaker.get_all_trades', lambda: df)
+    monkeypatch.setattr('risk_management.circuit_breaker.get_trades_filtered', lambda **kw: df)
     monkeypatch.setattr('risk_management.circuit_breaker.kirim_notifikasi_telegram', lambda msg: None)
     bot_flags.set_paused(False)
     cb = CircuitBreaker(max_drawdown=50, max_losses=2)
     triggered = cb.check()
     assert triggered is True
     assert bot_flags.PAUSED is True
+
+
+def test_circuit_breaker_incremental(monkeypatch, tmp_path):
+    from datetime import timedelta
+    from types import SimpleNamespace
+    from risk_management import circuit_breaker as cbm
+    from risk_management import resume_state
+
+    monkeypatch.setattr(resume_state, "RESUME_FILE", str(tmp_path / "risk_state.json"))
+    now = datetime.now(timezone.utc)
+    seed = pd.DataFrame({
+        'entry_time': [(now - timedelta(seconds=s)).isoformat() for s in (1, 2, 3)],
+        'pnl': [-5.0, -5.0, 20.0],  # urutan DESC seperti dari database
+    })
+    calls = []
+    monkeypatch.setattr(cbm, 'get_trades_filtered', lambda **kw: calls.append(kw) or seed)
+    saves = []
+    monkeypatch.setattr(cbm, 'save_resume_state', saves.append)
+    monkeypatch.setattr(cbm, 'kirim_notifikasi_telegram', lambda msg: None)
+    bot_flags.set_paused(False)
+
+    cb = cbm.CircuitBreaker(max_drawdown=50, max_losses=3)
+    for _ in range(100):
+        assert cb.check() is False
+    assert len(calls) == 1  # tidak membaca database per tick
+    assert (cb.daily_drawdown, cb.consecutive_losses) == (0.0, 2)
+    assert len(saves) == 1  # hanya ditulis saat nilai berubah
+
+    cb.record_trade(SimpleNamespace(entry_time=(now - timedelta(days=2)).isoformat(), pnl=-100.0))
+    cb.record_trade(SimpleNamespace(entry_time=now.isoformat(), pnl=-15.0))
+    assert cb.check() is True
+    assert (cb.daily_drawdown, cb.consecutive_losses) == (5.0, 3)
+    assert len(saves) == 2
+
+    # Pergantian hari UTC mereset agregat
+    cb._daily.day = cb._daily.day - timedelta(days=1)
+    cb.check()
+    assert (cb.daily_drawdown, cb.consecutive_losses) == (0.0, 0)
+    bot_flags.set_paused(False)
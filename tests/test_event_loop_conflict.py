@@ -20,6 +20,7 @@ async def runner():
     bot_flags.IS_READY = True
     monkeypatch = __import__('types').SimpleNamespace(setattr=lambda *a, **k: None)
     wl.AsyncClient.create = lambda *a, **k: SimpleNamespace(close_connection=lambda: None)
+    wl.MULTIPLEX = False
     wl.BinanceSocketManager = lambda client: DummyBSM()
     client = SimpleNamespace(API_KEY="a", API_SECRET="b", testnet=True)
     wl.start_price_stream(client, ["BTCUSDT"])
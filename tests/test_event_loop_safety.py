@@ -20,6 +20,7 @@ class DummyBSM(SimpleNamespace):
 async def runner():
     bot_flags.IS_READY = True
     wl.AsyncClient.create = lambda *a, **k: SimpleNamespace(close_connection=lambda: None)
+    wl.MULTIPLEX = False
     wl.BinanceSocketManager = lambda client: DummyBSM()
     client = SimpleNamespace(API_KEY="a", API_SECRET="b", testnet=True)
     wl.start_price_stream(client, ["BTCUSDT"])
@@ -45,4 +45,71 @@ def test_monitor_exit_closes_position(monkeypatch):
     assert load_state() == []
     mock_close.assert_called_once()
     mock_log.assert_called_once()
-    mock_notif.assert_called_once()
\ No newline at end of file
+    mock_notif.assert_called_once()
+
+def _isolated_state(tmp_path, monkeypatch):
+    from utils import state_manager as sm
+
+    monkeypatch.setattr(sm, "STATE_DIR", str(tmp_path))
+    monkeypatch.setattr(sm, "STATE_FILE", str(tmp_path / "active_trades.json"))
+    monkeypatch.setattr(sm, "BACKUP_FILE", str(tmp_path / "active_trades.bak.json"))
+
+
+def test_exit_engine_event_driven(tmp_path, monkeypatch):
+    from execution.price_store import PriceStore
+
+    _isolated_state(tmp_path, monkeypatch)
+    btc = Trade(symbol="BTCUSDT", side="long", entry_time="t0", entry_price=100.0, size=0.1,
+                sl=95.0, tp=110.0, trailing_sl=95.0, order_id="1", trigger_threshold=1.0,
+                trailing_offset=0.5)
+    save_state([btc.to_dict()])
+
+    mock_close = MagicMock(return_value={})
+    monkeypatch.setattr(exit_monitor, "safe_close_order_market", mock_close)
+    monkeypatch.setattr(exit_monitor, "log_trade", MagicMock())
+    loads = []
+    orig_load = exit_monitor.load_state
+    monkeypatch.setattr(exit_monitor, "load_state", lambda: loads.append(1) or orig_load())
+    evaluated = []
+    orig_eval = exit_monitor._evaluate_exit
+    monkeypatch.setattr(exit_monitor, "_evaluate_exit", lambda t, p: evaluated.append(t["symbol"]) or orig_eval(t, p))
+
+    prices = PriceStore()
+    engine = exit_monitor.ExitEngine(MagicMock(), {}, notif_exit=False, persist_interval=0.01).start(prices)
+    for p in (101.0, 103.0, 102.6):
+        prices.update("BTCUSDT", p)
+    prices.update("ETHUSDT", 10.0)
+    assert evaluated == ["BTCUSDT"] * 3
+    assert engine.positions()[0]["trailing_sl"] > 95.0
+    assert len(loads) == 1  # tidak membaca file per tick
+
+    # Posisi baru dari modul lain langsung ikut dievaluasi
+    eth = Trade(symbol="ETHUSDT", side="short", entry_time="t1", entry_price=10.0, size=1,
+                sl=11.0, tp=9.0, trailing_sl=11.0, order_id="2")
+    save_state(load_state() + [eth.to_dict()])
+    prices.update("ETHUSDT", 8.9)
+    prices.update("BTCUSDT", 101.0)  # kena trailing SL
+    engine.stop(prices)
+
+    assert mock_close.call_count == 2
+    assert load_state() == []
+    assert engine.positions() == []
+
+
+def test_exit_engine_persists_trailing_asynchronously(tmp_path, monkeypatch):
+    import time
+    from execution.price_store import PriceStore
+
+    _isolated_state(tmp_path, monkeypatch)
+    trade = Trade(symbol="BTCUSDT", side="long", entry_time="t0", entry_price=100.0, size=0.1,
+                  sl=95.0, tp=120.0, trailing_sl=95.0, order_id="1")
+    save_state([trade.to_dict()])
+    prices = PriceStore()
+    engine = exit_monitor.ExitEngine(MagicMock(), {}, notif_exit=False, persist_interval=0.01).start(prices)
+    prices.update("BTCUSDT", 105.0)
+    for _ in range(100):
+        if load_state()[0]["trailing_sl"] > 95.0:
+            break
+        time.sleep(0.01)
+    assert load_state()[0]["trailing_sl"] == engine.positions()[0]["trailing_sl"] > 95.0
+    engine.stop(prices)
@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+
+from indicators import compute_indicators, indicator_cache, IndicatorCache, data_fingerprint
+
+
+def _ohlcv(n=300, seed=1):
+    rng = np.random.default_rng(seed)
+    close = 100 + rng.normal(0, 1, n).cumsum()
+    idx = pd.date_range("2025-01-01", periods=n, freq="5min")
+    return pd.DataFrame(
+        {
+            "open": close,
+            "high": close + 0.5,
+            "low": close - 0.5,
+            "close": close,
+            "volume": rng.uniform(1, 10, n),
+        },
+        index=idx,
+    )
+
+
+def test_compute_indicators_reuses_cached_columns():
+    indicator_cache.clear()
+    base = _ohlcv()
+    params = {"ema": {"window": 10}, "rsi": {"window": 14}, "bb": {"window": 20}}
+
+    first = compute_indicators(base.copy(), ["ema", "rsi", "bb"], params)
+    assert indicator_cache.misses == 3 and indicator_cache.hits == 0
+
+    second = compute_indicators(base.copy(), ["ema", "rsi", "bb"], {**params, "ema": {"window": 12}})
+    assert indicator_cache.hits == 2 and indicator_cache.misses == 4
+    pd.testing.assert_series_equal(first["rsi"], second["rsi"])
+
+    uncached = compute_indicators(base.copy(), ["ema"], {"ema": {"window": 12}}, use_cache=False)
+    pd.testing.assert_series_equal(second["ema"], uncached["ema"])
+
+
+def test_fingerprint_ignores_indicator_columns_but_tracks_prices():
+    df = _ohlcv()
+    fp = data_fingerprint(df)
+    df["ema"] = 1.0
+    assert data_fingerprint(df) == fp
+    df.iloc[-1, df.columns.get_loc("close")] += 1
+    assert data_fingerprint(df) != fp
+
+
+def test_cache_evicts_least_recently_used():
+    s = pd.Series(np.zeros(100), name="x")
+    size = int(s.memory_usage(index=True))
+    cache = IndicatorCache(max_bytes=size * 2)
+    cache.put(("a",), s)
+    cache.put(("b",), s)
+    assert cache.get(("a",)) is not None
+    cache.put(("c",), s)
+    assert cache.get(("b",)) is None
+    assert cache.get(("a",)) is not None
+    assert len(cache) == 2 and cache.nbytes <= cache.max_bytes
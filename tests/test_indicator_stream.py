@@ -0,0 +1,113 @@
+import numpy as np
+import pandas as pd
+
+from indicators import compute_indicators, create_indicator_stream
+from strategies.scalping_strategy import ScalpingStrategy
+
+
+def _ohlcv(n=300, seed=3):
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1, n))
+    return pd.DataFrame({
+        "open": close + rng.normal(0, 0.2, n),
+        "high": close + rng.uniform(0.1, 1.0, n),
+        "low": close - rng.uniform(0.1, 1.0, n),
+        "close": close,
+        "volume": rng.uniform(10, 20, n),
+    }, index=pd.date_range("2025-01-01", periods=n, freq="5min"))
+
+
+def test_stream_matches_batch_compute():
+    names = ["ema", "sma", "macd", "rsi", "bb", "atr"]
+    params = {
+        "ema": {"window": 9},
+        "sma": {"window": 20},
+        "macd": {"fast": 5, "slow": 13, "signal": 4},
+        "rsi": {"window": 7},
+        "bb": {"window": 20, "dev": 2},
+        "atr": {"window": 14},
+    }
+    df = _ohlcv()
+    batch = compute_indicators(df.copy(), names, params)
+
+    stream = create_indicator_stream(names, params)
+    seeded = stream.seed(df.iloc[:200])
+    live = [stream.update(bar) for bar in df.iloc[200:].to_dict("records")]
+    streamed = pd.concat([seeded, pd.DataFrame(live, index=df.index[200:])])
+
+    cols = ["ema", "sma", "macd", "macd_signal", "rsi", "bb_upper", "bb_lower", "bb_width", "atr"]
+    for col in cols:
+        np.testing.assert_allclose(streamed[col], batch[col], rtol=1e-9, atol=1e-9, err_msg=col)
+
+
+def test_strategy_indicator_stream_uses_config():
+    cfg = {"ema_period": 5, "sma_period": 8, "rsi_period": 6}
+    strat = ScalpingStrategy(cfg)
+    df = _ohlcv(120)
+    seeded = strat.create_indicator_stream().seed(df)
+    batch = strat.apply_indicators(df.copy())
+    np.testing.assert_allclose(seeded["ema"], batch["ema"], rtol=1e-9)
+    np.testing.assert_allclose(seeded["rsi"], batch["rsi"], rtol=1e-9)
+
+
+def test_ws_stream_frame_seeds_once(monkeypatch):
+    from execution import ws_signal_listener as wsl
+
+    df = _ohlcv(101)
+    df.index.name = "timestamp"
+    calls = []
+
+    def fake_fetch(symbol, client, interval="5m", limit=100):
+        calls.append(limit)
+        return df.iloc[:100].copy()
+
+    monkeypatch.setattr(wsl, "fetch_latest_data", fake_fetch)
+    monkeypatch.setattr(wsl, "_indicator_streams", {})
+    monkeypatch.setattr(wsl, "_buffers", {})
+
+    def kline(ts, row):
+        return {"t": int(ts.value // 10**6), "o": row["open"], "h": row["high"],
+                "l": row["low"], "c": row["close"], "v": row["volume"], "x": True}
+
+    params = {"ema_period": 5, "sma_period": 8}
+    first = wsl._stream_frame("BTCUSDT", kline(df.index[99], df.iloc[99]), params, "5m")
+    second = wsl._stream_frame("BTCUSDT", kline(df.index[100], df.iloc[100]), params, "5m")
+
+    assert calls == [100]
+    assert len(first) == 100 and len(second) == 100
+    assert second.index[-1] == df.index[100]
+    expected = ScalpingStrategy(params).apply_indicators(df.copy())
+    np.testing.assert_allclose(second["ema"].iloc[-1], expected["ema"].iloc[-1], rtol=1e-9)
+
+
+def test_ws_stream_frame_backfills_gap(monkeypatch):
+    from execution import ws_signal_listener as wsl
+
+    df = _ohlcv(120)
+    df.index.name = "timestamp"
+    calls = []
+
+    def fake_fetch(symbol, client, interval="5m", limit=100):
+        calls.append(limit)
+        end = 100 if len(calls) == 1 else 111
+        return df.iloc[end - limit:end].copy()
+
+    monkeypatch.setattr(wsl, "fetch_latest_data", fake_fetch)
+    monkeypatch.setattr(wsl, "_indicator_streams", {})
+    monkeypatch.setattr(wsl, "_buffers", {})
+
+    def kline(i):
+        row = df.iloc[i]
+        return {"t": int(df.index[i].value // 10**6), "o": row["open"], "h": row["high"],
+                "l": row["low"], "c": row["close"], "v": row["volume"], "x": True}
+
+    params = {"ema_period": 5, "sma_period": 8}
+    wsl._stream_frame("BTCUSDT", kline(99), params, "5m")
+    wsl._stream_frame("BTCUSDT", kline(100), params, "5m")
+    assert calls == [100]
+    # bar 101..109 terlewat, hanya celah itu yang diambil ulang
+    frame = wsl._stream_frame("BTCUSDT", kline(110), params, "5m")
+    assert calls == [100, 11]
+    assert list(frame.index) == list(df.index[11:111])
+    expected = ScalpingStrategy(params).apply_indicators(df.iloc[:111].copy())
+    np.testing.assert_allclose(frame["ema"], expected["ema"].iloc[11:], rtol=1e-9)
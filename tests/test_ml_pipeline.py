@@ -5,11 +5,12 @@ from pathlib import Path
 import pandas as pd
 import importlib
 from types import SimpleNamespace
-from unittest.mock import patch, mock_open
+from unittest.mock import patch
 
 import utils.ml_logger as ml_logger
 import ml.training as training
 import ml.historical_trainer as historical_trainer
+import ml.model_registry as model_registry
 import strategies.scalping_strategy as ss
 import notifications.command_handler as ch
 import main
@@ -213,31 +214,32 @@ def test_generate_ml_signal(monkeypatch):
     class Dummy:
         def predict(self, X):
             return [0]
-    monkeypatch.setattr(ss, "load_ml_model", lambda s: Dummy())
+    monkeypatch.setattr(ss, "load_ml_model", lambda s, timeframe=None: Dummy())
     out = ss.generate_ml_signal(df.copy(), "BTCUSDT")
     assert out["ml_signal"].iloc[-1] == 0
     assert out["ml_confidence"].iloc[-1] == 0.5
-    monkeypatch.setattr(ss, "load_ml_model", lambda s: None)
+    monkeypatch.setattr(ss, "load_ml_model", lambda s, timeframe=None: None)
     out = ss.generate_ml_signal(df.copy(), "BTCUSDT")
     assert out["ml_signal"].iloc[-1] == 1
     assert out["ml_confidence"].iloc[-1] == 0.0
 
 
 def test_load_ml_model_cache(tmp_path, monkeypatch):
-    model = {"x": 1}
     model_path = tmp_path / "BTCUSDT_scalping_5m.pkl"
     with open(model_path, "wb") as f:
-        pickle.dump(model, f)
-    ss._ml_models.clear()
-    monkeypatch.setattr(ss, "_get_model_path", lambda s, tf=None: str(model_path))
-    monkeypatch.setattr(ss.os.path, "exists", lambda p: p == str(model_path))
-    m = ss.load_ml_model("BTCUSDT")
-    assert m == model
-    open_mock = mock_open(read_data=b"")
-    monkeypatch.setattr("builtins.open", open_mock)
-    m2 = ss.load_ml_model("BTCUSDT")
-    open_mock.assert_not_called()
-    assert m2 is m
+        pickle.dump({"x": 1}, f)
+    os.utime(model_path, ns=(1_000_000_000, 1_000_000_000))
+    monkeypatch.setattr(model_registry, "MODEL_DIR", str(tmp_path))
+    model_registry.clear_models()
+    m = ss.load_ml_model("BTCUSDT", timeframe="5m")
+    assert m == {"x": 1}
+    assert ss.load_ml_model("BTCUSDT", timeframe="5m") is m
+    assert ss.load_ml_model("BTCUSDT", timeframe="15m") is None
+
+    with open(model_path, "wb") as f:
+        pickle.dump({"x": 2}, f)
+    os.utime(model_path, ns=(2_000_000_000, 2_000_000_000))
+    assert ss.load_ml_model("BTCUSDT", timeframe="5m") == {"x": 2}
 
 
 def reload_ch():
@@ -0,0 +1,76 @@
+import os
+import pickle
+
+import pandas as pd
+
+from ml import model_registry
+from ml.predictor import predict_ml
+
+
+class ConstModel:
+    def __init__(self, label):
+        self.label = label
+
+    def predict_proba(self, X):
+        return [[0.2, 0.8] if self.label else [0.9, 0.1] for _ in range(len(X))]
+
+
+def _write(path, model, mtime):
+    with open(path, "wb") as f:
+        pickle.dump(model, f)
+    os.utime(path, ns=(mtime, mtime))
+
+
+def _features():
+    return pd.DataFrame({c: [1.0] for c in ["ema", "sma", "macd", "rsi", "atr", "bb_width", "volume"]})
+
+
+def test_registry_caches_and_hot_reloads(tmp_path, monkeypatch):
+    monkeypatch.setattr(model_registry, "MODEL_DIR", str(tmp_path))
+    model_registry.clear_models()
+    path = tmp_path / "BTCUSDT_scalping_5m.pkl"
+    _write(path, ConstModel(1), 1_000_000_000)
+
+    loads = []
+    real_load = pickle.load
+    monkeypatch.setattr(model_registry.pickle, "load", lambda f: loads.append(1) or real_load(f))
+
+    assert predict_ml(_features(), "BTCUSDT", "5m") == (1, 0.8)
+    assert predict_ml(_features(), "BTCUSDT", "5m") == (1, 0.8)
+    assert len(loads) == 1
+
+    _write(path, ConstModel(0), 2_000_000_000)
+    assert predict_ml(_features(), "BTCUSDT", "5m") == (0, 0.9)
+    assert len(loads) == 2
+
+
+def test_registry_keyed_by_timeframe(tmp_path, monkeypatch):
+    monkeypatch.setattr(model_registry, "MODEL_DIR", str(tmp_path))
+    model_registry.clear_models()
+    _write(tmp_path / "ETHUSDT_scalping_15m.pkl", ConstModel(0), 1_000_000_000)
+
+    assert predict_ml(_features(), "ETHUSDT", "5m") == (1, 0.0)
+    assert predict_ml(_features(), "ETHUSDT", "15m") == (0, 0.9)
+
+    os.remove(tmp_path / "ETHUSDT_scalping_15m.pkl")
+    assert model_registry.get_model("ETHUSDT", "15m") is None
+
+
+def test_registry_retries_broken_model_only_after_change(tmp_path, monkeypatch):
+    monkeypatch.setattr(model_registry, "MODEL_DIR", str(tmp_path))
+    model_registry.clear_models()
+    path = tmp_path / "BTCUSDT_scalping_5m.pkl"
+    path.write_bytes(b"bukan pickle")
+    os.utime(path, ns=(1_000_000_000, 1_000_000_000))
+
+    loads = []
+    real_load = pickle.load
+    monkeypatch.setattr(model_registry.pickle, "load", lambda f: loads.append(1) or real_load(f))
+
+    assert model_registry.get_model("BTCUSDT", "5m") is None
+    assert model_registry.get_model("BTCUSDT", "5m") is None
+    assert len(loads) == 1
+
+    _write(path, ConstModel(1), 2_000_000_000)
+    assert isinstance(model_registry.get_model("BTCUSDT", "5m"), ConstModel)
+    assert len(loads) == 2
@@ -2,15 +2,32 @@ import importlib
 import os
 from unittest.mock import patch
 
+import pytest
+
+import notifications.notifier as notifier
+
+
+@pytest.fixture(autouse=True)
+def reset_notifier():
+    yield
+    # Kosongkan dispatcher global lalu muat ulang modul tanpa token agar
+    # test lain tidak mengirim lewat konfigurasi test ini.
+    notifier.flush_notifications(timeout=5)
+    with patch.dict(os.environ):
+        os.environ.pop("TELEGRAM_TOKEN", None)
+        os.environ.pop("TELEGRAM_CHAT_ID", None)
+        importlib.reload(notifier)
+
 
 def test_notifier():
     with patch.dict(os.environ, {"TELEGRAM_TOKEN": "token", "TELEGRAM_CHAT_ID": "chat"}):
-        import notifications.notifier as notifier
         importlib.reload(notifier)
 
-        with patch("notifications.notifier.requests.post") as mock_post:
+        with patch.object(notifier._dispatcher, "session") as mock_session:
+            mock_post = mock_session.post
             msg = "📈 *UNIT TEST* Notifikasi bot RajaDollar!"
             notifier.kirim_notifikasi_telegram(msg)
+            assert notifier.flush_notifications()
 
             expected_url = "https://api.telegram.org/bottoken/sendMessage"
             expected_data = {
@@ -18,7 +35,60 @@ def test_notifier():
                 "text": msg,
                 "parse_mode": "Markdown",
             }
-            mock_post.assert_called_once_with(expected_url, data=expected_data)
+            mock_post.assert_called_once_with(
+                expected_url, data=expected_data, timeout=notifier.HTTP_TIMEOUT
+            )
+
+
+def test_dispatcher_coalesces_and_rate_limits(monkeypatch):
+    import threading
+    import time
+    from unittest.mock import MagicMock
+
+    gate = threading.Event()
+    sent = []
+
+    def slow_post(url, data, timeout):
+        sent.append((data["chat_id"], data["text"], time.monotonic()))
+        gate.wait(2)
+        return MagicMock(status_code=200, ok=True)
+
+    monkeypatch.setattr(notifier, "PER_CHAT_INTERVAL", 0.2)
+    disp = notifier.TelegramDispatcher(max_pending=3, session=MagicMock(post=slow_post))
+
+    start = time.monotonic()
+    disp.submit("u", "a", "pertama")  # sedang dikirim, tertahan gate
+    time.sleep(0.05)
+    for _ in range(3):
+        disp.submit("u", "a", "Menunggu sinyal")
+    disp.submit("u", "b", "lain")
+    disp.submit("u", "a", "x")
+    disp.submit("u", "a", "y")  # antrean penuh: pesan tertua dibuang
+    assert time.monotonic() - start < 0.5  # pemanggil tidak pernah menunggu HTTP
+    gate.set()
+    assert disp.flush(timeout=5)
+
+    assert [(c, t) for c, t, _ in sent] == [("a", "pertama"), ("b", "lain"), ("a", "x"), ("a", "y")]
+    assert disp.stats()["dropped"] == 1 and disp.stats()["coalesced"] == 2
+    times_a = [t for c, _, t in sent if c == "a"]
+    assert all(b - a >= 0.19 for a, b in zip(times_a, times_a[1:]))
+
+
+def test_dispatcher_respects_retry_after():
+    from unittest.mock import MagicMock
+
+    limited = MagicMock(status_code=429)
+    limited.json.return_value = {"parameters": {"retry_after": 0.1}}
+    ok = MagicMock(status_code=200, ok=True)
+    session = MagicMock()
+    session.post.side_effect = [limited, ok]
+    disp = notifier.TelegramDispatcher(session=session)
+    disp.submit("u", "a", "halo")
+    disp.submit("u", "a", "halo")
+    assert disp.flush(timeout=5)
+    assert session.post.call_count == 2
+    assert session.post.call_args[1]["data"]["text"] == "halo (x2)"
+    assert disp.stats()["sent"] == 1
 
 
 if __name__ == "__main__":
@@ -1,5 +1,9 @@
 import json
 
+import pandas as pd
+
+from backtest.data_loader import load_csv
+
 from backtest.optimizer import optimize_strategy
 from utils import strategy_config
 
@@ -47,5 +51,63 @@ def test_optimize_strategy_manual(monkeypatch, tmp_path):
     assert metrics == {}
 
 
+def test_optimize_strategy_process_pool():
+    params, metrics = optimize_strategy(
+        "BTCUSDT", "1h", "2025-07-01", "2025-07-02", n_iter=2, n_jobs=2, executor="process"
+    )
+    assert "ema_period" in params
+    assert "Rasio Sharpe" in metrics
+
+
+def test_optimize_strategy_search_modes():
+    for search in ("halving", "guided"):
+        params, metrics = optimize_strategy(
+            "BTCUSDT", "1h", "2025-07-01", "2025-07-02", n_iter=3, n_jobs=1, search=search
+        )
+        assert "ema_period" in params
+        assert "Rasio Sharpe" in metrics
+
+
+def test_shared_frame_roundtrip_matches_trial():
+    from backtest import optimizer as opt_mod
+    from backtest.shared_frame import SharedFrame, attach_frame
+
+    df = load_csv("data/historical_data/1h/BTCUSDT_1h.csv")
+    ctx = {"symbol": "BTCUSDT", "initial_capital": 1000, "tf": "1h", "start": None, "end": None}
+    with SharedFrame(df) as shared:
+        view, shm = attach_frame(shared.spec)
+        pd.testing.assert_frame_equal(view, df.astype("float64"), check_freq=False)
+        assert opt_mod._run_trial(view, dict(opt_mod.DEFAULT_BASE), ctx) == opt_mod._run_trial(
+            df, dict(opt_mod.DEFAULT_BASE), ctx
+        )
+        del view
+        shm.close()
+
+
+def test_process_worker_reuses_parent_indicator_columns():
+    from backtest import optimizer as opt_mod
+    from backtest.shared_frame import SharedFrame
+    from indicators import indicator_cache
+
+    df = load_csv("data/historical_data/1h/BTCUSDT_1h.csv")
+    ctx = {"symbol": "BTCUSDT", "initial_capital": 1000, "tf": "1h", "start": None, "end": None}
+    columns, entries = opt_mod._shared_indicators(df, opt_mod.build_local_grid(opt_mod.DEFAULT_BASE), ctx)
+    assert {name for name, *_ in entries} == {"bb", "atr"}
+
+    params = dict(opt_mod.DEFAULT_BASE)
+    expected = opt_mod._run_trial(df, params, ctx)
+    with SharedFrame(df) as shared, SharedFrame(columns) as shared_ind:
+        indicator_cache.clear()  # worker baru: cache kosong
+        opt_mod._init_worker(shared.spec, {**ctx, "indicators": (shared_ind.spec, entries)})
+        try:
+            assert opt_mod._worker_trial(params) == expected
+            assert (indicator_cache.hits, indicator_cache.misses) == (2, 4)
+        finally:
+            opt_mod._worker_df = None
+            indicator_cache.clear()
+            opt_mod._worker_shm.close()
+            opt_mod._worker_ind_shm.close()
+
+
 if __name__ == "__main__":
     test_optimize_strategy_runs()
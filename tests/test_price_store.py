@@ -0,0 +1,95 @@
+import threading
+import time
+from unittest.mock import MagicMock
+
+from execution.price_store import PriceStore
+
+
+def test_snapshot_fields_and_order():
+    store = PriceStore(capacity=2)
+    assert store.snapshot("BTCUSDT") is None
+    store.update("BTCUSDT", 100.0, bid=99.5, ask=100.5, event_time=1_000)
+    store.update("BTCUSDT", 101.0, event_time=2_000)
+    # Pesan dengan event time lebih lama diabaikan
+    assert not store.update("BTCUSDT", 50.0, event_time=1_500)
+
+    snap = store.snapshot("BTCUSDT")
+    assert (snap.price, snap.bid, snap.ask) == (101.0, 99.5, 100.5)
+    assert snap.event_time == 2_000 and snap.seq == 2
+
+    for i, sym in enumerate(["ETHUSDT", "BNBUSDT", "XRPUSDT"]):
+        store.update(sym, float(i))
+    assert store.price("XRPUSDT") == 2.0
+    assert store.price("BTCUSDT") == 101.0
+    assert store.symbols() == ["BTCUSDT", "ETHUSDT", "BNBUSDT", "XRPUSDT"]
+
+
+def test_staleness_queries():
+    store = PriceStore()
+    now = time.time()
+    store.update("BTCUSDT", 100.0, received=now - 30)
+    store.update("ETHUSDT", 10.0, received=now)
+
+    assert store.is_stale("BTCUSDT", 5, now=now)
+    assert not store.is_stale("ETHUSDT", 5, now=now)
+    assert store.is_stale("SOLUSDT", 5, now=now)
+    assert store.stale_symbols(5, now=now) == ["BTCUSDT"]
+    assert store.price("BTCUSDT", max_age=5) is None
+    assert store.price("BTCUSDT") == 100.0
+
+
+def test_readers_never_see_torn_writes():
+    store = PriceStore(capacity=1)
+    stop = threading.Event()
+    torn = []
+
+    def writer():
+        i = 0
+        while not stop.is_set():
+            i += 1
+            store.update("BTCUSDT", float(i), bid=float(i), ask=float(i))
+            store.update(f"S{i % 50}", float(i))  # paksa array tumbuh
+
+    def reader():
+        while not stop.is_set():
+            snap = store.snapshot("BTCUSDT")
+            if snap is not None and not (snap.price == snap.bid == snap.ask):
+                torn.append(snap)
+
+    threads = [threading.Thread(target=writer)] + [threading.Thread(target=reader) for _ in range(2)]
+    for t in threads:
+        t.start()
+    time.sleep(0.3)
+    stop.set()
+    for t in threads:
+        t.join()
+    assert torn == []
+    assert store.snapshot("BTCUSDT").seq > 0
+
+
+def test_exit_monitor_skips_stale_price(monkeypatch):
+    from execution import exit_monitor, ws_listener
+    from models.trade import Trade
+    from utils.state_manager import delete_state, load_state, save_state
+
+    delete_state()
+    trade = Trade(symbol="BTCUSDT", side="long", entry_time="2020-01-01T00:00:00", entry_price=100.0,
+                  size=0.1, sl=95.0, tp=104.0, trailing_sl=95.0, order_id="1")
+    save_state([trade.to_dict()])
+    ws_listener.clear_prices()
+    ws_listener.price_store.update("BTCUSDT", 105.0, received=time.time() - 60)
+
+    mock_close = MagicMock()
+    monkeypatch.setattr(exit_monitor, "safe_close_order_market", mock_close)
+    monkeypatch.setattr(exit_monitor, "log_trade", MagicMock())
+    monkeypatch.setattr(exit_monitor, "kirim_notifikasi_exit", MagicMock())
+
+    exit_monitor.check_and_close_positions(MagicMock(), {}, notif_exit=False)
+    mock_close.assert_not_called()
+    assert len(load_state()) == 1
+
+    ws_listener.update_price("BTCUSDT", 105.0)
+    exit_monitor.check_and_close_positions(MagicMock(), {}, notif_exit=False)
+    mock_close.assert_called_once()
+    assert load_state() == []
+    ws_listener.clear_prices()
@@ -126,7 +126,7 @@ def test_no_cross_macd_rsi_ml_enough(dummy_df, config, monkeypatch):
     df.loc[df.index[-1], 'rsi'] = 50
     df['ml_signal'] = 1
     df['ml_confidence'] = 0.9
-    monkeypatch.setattr(strat, 'generate_ml_signal', lambda d, symbol='': d)
+    monkeypatch.setattr(strat, 'generate_ml_signal', lambda d, symbol='', timeframe=None: d)
     cross_up = (df['ema'] > df['sma']) & (df['ema'].shift(1) <= df['sma'].shift(1))
     assert not cross_up.iloc[-1]
     df = generate_signals(df, config['score_threshold'], config=config)
@@ -145,8 +145,80 @@ def test_cross_macd_ml_low_conf(dummy_df, config, monkeypatch):
     df.loc[df.index[-1], 'rsi'] = 50
     df['ml_signal'] = 1
     df['ml_confidence'] = 0.5
-    monkeypatch.setattr(strat, 'generate_ml_signal', lambda d, symbol='': d)
+    monkeypatch.setattr(strat, 'generate_ml_signal', lambda d, symbol='', timeframe=None: d)
     df = generate_signals(df, config['score_threshold'], config=config)
     assert df['ml_confidence'].iloc[-1] < 0.7
     assert df['long_signal'].iloc[-1]
     assert df['score_long'].iloc[-1] == pytest.approx(2.0)
+
+
+class _ProbaModel:
+    def predict_proba(self, X):
+        p = ((X["rsi"].to_numpy() / 100.0) * 0.6 + 0.2).clip(0, 1)
+        return np.column_stack([1 - p, p])
+
+
+def _random_walk_5m(n=180, seed=7):
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 0.5, n))
+    idx = pd.date_range("2025-01-01", periods=n, freq="5min")
+    return pd.DataFrame({
+        'open': close + rng.normal(0, 0.1, n),
+        'high': close + 0.5,
+        'low': close - 0.5,
+        'close': close,
+        'volume': rng.uniform(100, 200, n),
+    }, index=idx)
+
+
+@pytest.mark.parametrize("cfg_extra", [
+    {},
+    {'hybrid_fallback': False, 'use_crossover_filter': False, 'score_threshold': 1.5},
+    {'only_trend_15m': False, 'min_bb_width': 0.01},
+])
+def test_vectorized_matches_bar_by_bar(monkeypatch, cfg_extra):
+    model = _ProbaModel()
+    monkeypatch.setattr(strat, "load_ml_model", lambda symbol, path=None, timeframe=None: model)
+    cfg = {
+        'ema_period': 5, 'sma_period': 8, 'rsi_period': 7,
+        'macd_fast': 3, 'macd_slow': 6, 'macd_signal': 2,
+        'ml_conf_threshold': 0.5, 'score_threshold': 2.0,
+    }
+    cfg.update(cfg_extra)
+    df = apply_indicators(_random_walk_5m(), cfg)
+
+    vec = strat.ScalpingStrategy(dict(cfg)).generate_signals_vectorized(df.copy(), "PARITY")
+
+    cols = ['long_signal', 'short_signal', 'score_long', 'score_short',
+            'ml_signal', 'ml_confidence', 'signal_mode', 'skip_reason']
+    for i in range(len(df)):
+        last = strat.ScalpingStrategy(dict(cfg)).generate_signals(
+            df.iloc[: i + 1].copy(), "PARITY"
+        ).iloc[-1]
+        for col in cols:
+            assert vec[col].iloc[i] == last[col], (i, col)
+        assert vec['skip_reasons'].iloc[i] == last['skip_reasons'], i
+        assert pd.Series(vec['components_detail'].iloc[i]).equals(
+            pd.Series(last['components_detail'])
+        ), i
+    assert vec['long_signal'].any() or vec['short_signal'].any()
+
+
+def test_higher_tf_confirmation_uses_closed_bars_only():
+    cfg = {'ema_period': 5, 'sma_period': 8, 'rsi_period': 7,
+           'macd_fast': 3, 'macd_slow': 6, 'macd_signal': 2}
+    df = _random_walk_5m(240)
+    conf = strat.higher_tf_confirmation(df, cfg)
+
+    ohlc = {'open': 'first', 'high': 'max', 'low': 'min', 'close': 'last'}
+    df15 = apply_indicators(df.resample('15min').agg(ohlc), cfg)
+    long15 = (df15['ema'] > df15['sma']) & (df15['macd'] > df15['macd_signal']) & (df15['rsi'] > 40)
+    for ts in long15.index[25:-1]:
+        # bar 5m terakhir di dalam bar 15m menutup bar tersebut
+        assert conf.loc[ts + pd.Timedelta(minutes=10), 'htf_long_ok'] == long15[ts]
+        assert conf.loc[ts + pd.Timedelta(minutes=15), 'htf_long_ok'] == long15[ts]
+
+    future = df.copy()
+    future.iloc[150:, future.columns.get_loc('close')] *= 1.5
+    conf_future = strat.higher_tf_confirmation(future, cfg)
+    assert conf.iloc[:150].equals(conf_future.iloc[:150])
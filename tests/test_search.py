@@ -0,0 +1,39 @@
+import random
+
+from backtest.search import GuidedSampler, halving_budgets, successive_halving
+
+
+def _metrik(p):
+    return {"Persentase Menang": 100 - abs(p["x"] - 7) * 5, "Profit Factor": 3.0, "Rasio Sharpe": 1.0}
+
+
+def test_halving_budgets_end_with_full_data():
+    assert halving_budgets(1000, eta=3, min_bars=100) == [111, 333, 1000]
+    assert halving_budgets(150, eta=3, min_bars=100) == [150]
+
+
+def test_successive_halving_promotes_top_fraction():
+    calls = []
+
+    def evaluate(batch, bars):
+        calls.append((bars, len(batch)))
+        return [(p, _metrik(p)) for p in batch]
+
+    candidates = [{"x": i} for i in range(18)]
+    hasil = successive_halving(candidates, evaluate, 1800, eta=3, min_bars=100)
+    assert calls == [(200, 18), (600, 6), (None, 2)]
+    xs = {p["x"] for p, _ in hasil}
+    assert len(xs) == 2 and 7 in xs
+
+
+def test_guided_sampler_moves_towards_best_region():
+    random.seed(0)
+    grid = {"x": list(range(50)), "flag": [True]}
+    sampler = GuidedSampler(grid, n_init=10, kappa=0.0)
+    tried: set[tuple] = set()
+    for _ in range(4):
+        batch = sampler.propose(5, tried)
+        sampler.observe((p, _metrik(p)) for p in batch)
+    assert len(tried) == 20
+    guided = sampler.propose(3, tried)
+    assert all(abs(p["x"] - 7) <= 10 for p in guided)
@@ -50,7 +50,7 @@ def test_on_signal_entry_trigger(monkeypatch):
     monkeypatch.setattr("execution.signal_entry.is_liquidation_risk", lambda *a, **kw: False)
     monkeypatch.setattr("execution.signal_entry.verify_price_before_order", lambda *a, **kw: True)
     monkeypatch.setattr("execution.signal_entry.update_open_positions", lambda *a, **kw: mock_positions)
-    monkeypatch.setattr("execution.signal_entry.get_trades_filtered", lambda *a, **kw: [])
+    monkeypatch.setattr("execution.signal_entry.count_trades", lambda *a, **kw: 0)
 
     # Exercise
     on_signal(
@@ -81,7 +81,7 @@ def test_on_signal_invalid_price(monkeypatch):
     monkeypatch.setattr("execution.signal_entry.catat_error", lambda msg: called.setdefault("msg", msg))
     mock_safe = MagicMock()
     monkeypatch.setattr("execution.signal_entry.safe_futures_create_order", mock_safe)
-    monkeypatch.setattr("execution.signal_entry.get_trades_filtered", lambda *a, **kw: [])
+    monkeypatch.setattr("execution.signal_entry.count_trades", lambda *a, **kw: 0)
 
     on_signal(
         symbol=symbol,
@@ -123,7 +123,7 @@ def test_swing_risk_doubling(monkeypatch):
     monkeypatch.setattr("execution.signal_entry.is_liquidation_risk", lambda *a, **kw: False)
     monkeypatch.setattr("execution.signal_entry.verify_price_before_order", lambda *a, **kw: True)
     monkeypatch.setattr("execution.signal_entry.update_open_positions", lambda *a, **kw: None)
-    monkeypatch.setattr("execution.signal_entry.get_trades_filtered", lambda *a, **kw: [])
+    monkeypatch.setattr("execution.signal_entry.count_trades", lambda *a, **kw: 0)
 
     def fake_calc(sym, price, stop, capital, risk_pct, leverage):
         called['risk_pct'] = risk_pct
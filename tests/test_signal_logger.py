@@ -0,0 +1,83 @@
+from database import signal_logger as sg
+
+
+def test_signals_written_in_batches(tmp_path, monkeypatch):
+    monkeypatch.setattr(sg, "DB_PATH", str(tmp_path / "signals.db"))
+    sg.init_db()
+    writer = sg.SignalWriter(maxsize=1000, flush_interval=60)
+    monkeypatch.setattr(sg, "_writer", writer)
+
+    for i in range(250):
+        sg.log_signal("BTCUSDT" if i % 2 else "ETHUSDT", "long", float(i), {"rsi": i})
+    assert sg.get_signals_recent(5).empty  # belum ditulis, pemanggil tidak menunggu SQLite
+
+    assert sg.flush_signals() == 250
+    stats = sg.signal_log_stats()
+    assert stats["batches"] == 1 and stats["written"] == 250 and stats["depth"] == 0
+    assert len(sg.get_signals_today()) == 250
+    recent = sg.get_signals_recent(3)
+    assert list(recent["score"]) == [249.0, 248.0, 247.0]
+
+
+def test_signals_today_includes_queued_rows(tmp_path, monkeypatch):
+    monkeypatch.setattr(sg, "DB_PATH", str(tmp_path / "signals.db"))
+    sg.init_db()
+    monkeypatch.setattr(sg, "_writer", sg.SignalWriter(maxsize=100, flush_interval=60))
+
+    for i in range(3):
+        sg.log_signal("BTCUSDT", "long", float(i))
+    assert len(sg.get_signals_today()) == 3
+
+
+def test_signal_queue_backpressure(tmp_path, monkeypatch):
+    monkeypatch.setattr(sg, "DB_PATH", str(tmp_path / "signals.db"))
+    sg.init_db()
+    writer = sg.SignalWriter(maxsize=3, flush_interval=0.01)
+    for i in range(5):
+        writer.put(("BTCUSDT", f"2024-01-01T00:00:0{i}", "none", 0.0, "{}", ""))
+    stats = writer.stats()
+    assert (stats["enqueued"], stats["dropped"], stats["max_depth"]) == (3, 2, 3)
+
+    writer.start()
+    writer.stop()
+    assert writer.stats()["written"] == 3
+
+
+def test_flush_from_caller_after_background_flush(tmp_path, monkeypatch):
+    import time
+
+    monkeypatch.setattr(sg, "DB_PATH", str(tmp_path / "signals.db"))
+    sg.init_db()
+    writer = sg.SignalWriter(flush_interval=0.01)
+    monkeypatch.setattr(sg, "_writer", writer.start())
+    sg.log_signal("BTCUSDT", "long", 1.0)
+    for _ in range(200):
+        if writer.stats()["batches"]:
+            break
+        time.sleep(0.01)
+    assert writer.stats()["batches"] == 1  # koneksi dibuat di thread writer
+
+    writer._stop.set()
+    writer._thread.join()
+    sg.log_signal("ETHUSDT", "short", 2.0)
+    assert sg.flush_signals() == 1
+    assert writer.stats()["failed"] == 0
+    assert len(sg.get_signals_today()) == 2
+    writer.stop()
+
+
+def test_signal_queries_use_indexes(tmp_path, monkeypatch):
+    import sqlite3
+
+    monkeypatch.setattr(sg, "DB_PATH", str(tmp_path / "signals.db"))
+    sg.init_db()
+    with sqlite3.connect(sg.DB_PATH) as conn:
+        plan = str(conn.execute(
+            "EXPLAIN QUERY PLAN SELECT * FROM signals WHERE time >= ? AND time < ? ORDER BY time DESC",
+            ("2024-01-01", "2024-01-02"),
+        ).fetchall())
+        assert "idx_signals_time" in plan
+        plan = str(conn.execute(
+            "EXPLAIN QUERY PLAN SELECT * FROM signals WHERE symbol = ? AND time >= ?", ("BTCUSDT", "2024")
+        ).fetchall())
+        assert "idx_signals_symbol_time" in plan
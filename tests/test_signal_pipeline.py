@@ -0,0 +1,137 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+
+from execution import ws_signal_listener as wsl
+from execution.signal_pipeline import SignalPipeline, Stage
+import strategies.scalping_strategy as strat
+
+
+def test_pipeline_stages_keep_order_and_metrics():
+    async def runner():
+        seen = []
+
+        def slow(item):
+            time.sleep(0.02)  # blocking di thread pool, bukan di loop
+            return item
+
+        async def sink(item):
+            seen.append(item)
+            return item
+
+        pipe = SignalPipeline(
+            [Stage("slow", slow, workers=3, key=lambda i: i[0]), Stage("sink", sink)]
+        ).start(asyncio.get_running_loop())
+        started = time.perf_counter()
+        for n in range(4):
+            for sym in "ab":
+                pipe.submit((sym, n))
+        assert time.perf_counter() - started < 0.01
+        ticks = 0
+        while len(seen) < 8:
+            ticks += 1  # loop tetap berputar selama tahap lambat bekerja
+            await asyncio.sleep(0.001)
+        await pipe.join()
+        pipe.stop()
+
+        assert [n for s, n in seen if s == "a"] == [0, 1, 2, 3]
+        assert [n for s, n in seen if s == "b"] == [0, 1, 2, 3]
+        assert ticks > 10
+        stats = pipe.stats()
+        assert stats["completed"] == 8
+        assert stats["stages"]["slow"]["processed"] == 8
+        assert stats["stages"]["slow"]["service_ms"] >= 15
+
+    asyncio.run(runner())
+
+
+def test_pipeline_drops_oldest_when_full():
+    async def runner():
+        seen = []
+        pipe = SignalPipeline([Stage("s", lambda i: seen.append(i) or i, maxsize=2)])
+        pipe.start(asyncio.get_running_loop())
+        for i in range(5):
+            pipe.submit(i)
+        await pipe.join()
+        pipe.stop()
+        assert seen == [3, 4]
+        assert pipe.stats()["stages"]["s"]["dropped"] == 3
+
+    asyncio.run(runner())
+
+
+def test_slow_order_path_does_not_block_event_loop(monkeypatch):
+    async def runner():
+        frame = pd.DataFrame({"close": [1.0, 2.0]})
+
+        async def fake_predict(df, symbol, timeframe=None):
+            return 1, 0.9
+
+        def fake_signals(df, params, symbol="", timeframe=None, ml_precomputed=False):
+            df = df.copy()
+            df["long_signal"], df["short_signal"] = symbol == "BTCUSDT", False
+            return df
+
+        monkeypatch.setattr(wsl, "client_global", SimpleNamespace())
+        monkeypatch.setattr(wsl, "_stream_frame", lambda *a: frame.copy())
+        monkeypatch.setattr(wsl, "_higher_tf_trend", lambda *a: (True, True))
+        monkeypatch.setattr(wsl, "_ml_batcher", SimpleNamespace(predict=fake_predict, executor=None))
+        monkeypatch.setattr(wsl, "generate_signals_pythontrading_style", fake_signals)
+        monkeypatch.setattr(wsl, "log_signal", lambda *a, **k: None)
+        monkeypatch.setattr(wsl, "kirim_notifikasi_telegram", lambda msg: None)
+        calls = []
+
+        def slow_order(symbol, row):
+            time.sleep(0.3)  # order REST lambat
+            calls.append((symbol, bool(row["long_signal"])))
+
+        monkeypatch.setitem(wsl.signal_callbacks, "BTCUSDT", slow_order)
+        monkeypatch.setitem(wsl.signal_callbacks, "ETHUSDT", lambda s, row: calls.append((s, bool(row["long_signal"]))))
+
+        wsl._start_pipeline(asyncio.get_running_loop(), 2)
+        try:
+            started = time.perf_counter()
+            wsl._submit_kline("BTCUSDT", {"t": 0, "x": True}, {}, "5m")
+            wsl._submit_kline("ETHUSDT", {"t": 0, "x": True}, {}, "5m")
+            await asyncio.sleep(0.05)
+            lag = time.perf_counter() - started
+            assert lag < 0.2  # loop tidak tertahan order BTC
+            await wsl._pipeline.join()
+            stats = wsl.get_pipeline_stats()
+        finally:
+            wsl._stop_pipeline()
+
+        assert sorted(calls) == [("BTCUSDT", True), ("ETHUSDT", False)]
+        assert set(stats["stages"]) == {"features", "inference", "signal", "dispatch"}
+        assert stats["completed"] == 2
+        assert stats["stages"]["dispatch"]["max_service_ms"] >= 250
+
+    asyncio.run(runner())
+
+
+def test_evaluate_signal_keeps_batched_ml_prediction(monkeypatch):
+    rng = np.random.default_rng(3)
+    close = 100 + np.cumsum(rng.normal(0, 0.5, 60))
+    raw = pd.DataFrame(
+        {"open": close, "high": close + 0.5, "low": close - 0.5, "close": close, "volume": 100.0},
+        index=pd.date_range("2025-01-01", periods=60, freq="5min"),
+    )
+    df = strat.apply_indicators(raw, {})
+    df["ml_signal"], df["ml_confidence"] = 1, 0.0
+    df.loc[df.index[-1], "ml_signal"] = 0
+    df.loc[df.index[-1], "ml_confidence"] = 0.95
+
+    def no_single_prediction(*a, **k):
+        raise AssertionError("prediksi ML per simbol tidak boleh diulang")
+
+    monkeypatch.setattr(strat, "load_ml_model", no_single_prediction)
+    monkeypatch.setattr(wsl, "log_signal", lambda *a, **k: None)
+    job = {"symbol": "BTCUSDT", "params": {}, "timeframe": "5m", "df": df, "trend": (True, True)}
+
+    last = wsl._evaluate_signal(job)["last"]
+    assert last["ml_signal"] == 0
+    assert last["ml_confidence"] == 0.95
+    assert last["components_detail"]["ml_conf"] == 0.95
@@ -36,3 +36,24 @@ def test_export_trades_csv(tmp_path):
     assert os.path.exists(path)
     df = pd.read_csv(path)
     assert not df.empty
+
+
+def test_range_queries_use_index(tmp_path):
+    setup_db(tmp_path)
+    for day, sym in [("2023-01-02", "BTC"), ("2023-01-02", "ETH"), ("2023-01-03", "BTC")]:
+        sl.log_trade(Trade(symbol=sym, side="short", entry_time=f"{day}T12:00:00.250+00:00",
+                           entry_price=1.0, size=1.0, sl=0.0, tp=0.0, pnl=-1.0))
+
+    df = sl.get_trades_filtered(start="2023-01-02", end="2023-01-02T23:59:59", columns=("symbol", "pnl"))
+    assert list(df.columns) == ["symbol", "pnl"]
+    assert sorted(df["symbol"]) == ["BTC", "ETH"]
+    assert sl.count_trades("btc", "2023-01-01", "2023-01-02T12:00:00") == 2
+    assert sl.count_trades() == 4
+
+    conn = sl._conn()
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    plan = conn.execute(
+        "EXPLAIN QUERY PLAN SELECT COUNT(*) FROM trades WHERE symbol = ? AND entry_time >= ?",
+        ("BTC", "2023-01-02"),
+    ).fetchall()
+    assert "idx_trades_symbol_entry" in str(plan)
@@ -0,0 +1,154 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import websockets
+
+import utils.bot_flags as bot_flags
+from execution import stream_mux
+from execution import ws_listener as wl
+from execution import ws_signal_listener as wsl
+
+
+class StubStream:
+    """Server combined-stream lokal: catat koneksi dan kirim pesan skrip."""
+
+    def __init__(self, scripts):
+        self.scripts = list(scripts)  # daftar pesan per koneksi
+        self.paths = []
+        self.requests = []
+
+    async def handler(self, ws):
+        self.paths.append(ws.request.path)
+        script = self.scripts.pop(0) if self.scripts else []
+        for item in script:
+            if item == "close":
+                await ws.close()
+                return
+            await ws.send(json.dumps(item))
+        async for raw in ws:
+            self.requests.append(json.loads(raw))
+
+    async def __aenter__(self):
+        self.server = await websockets.serve(self.handler, "127.0.0.1", 0)
+        port = self.server.sockets[0].getsockname()[1]
+        self.url = f"ws://127.0.0.1:{port}/stream"
+        return self
+
+    async def __aexit__(self, *exc):
+        self.server.close()
+        await self.server.wait_closed()
+
+
+def _ticker(sym, price):
+    return {"stream": f"{sym.lower()}@ticker", "data": {"e": "24hrTicker", "s": sym, "c": str(price)}}
+
+
+def _kline(sym, t, close, closed=True):
+    return {
+        "stream": f"{sym.lower()}@kline_5m",
+        "data": {"s": sym, "k": {"t": t, "o": close, "h": close, "l": close, "c": close, "v": 1, "x": closed}},
+    }
+
+
+async def _wait(cond, timeout=2.0):
+    for _ in range(int(timeout / 0.01)):
+        if cond():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("kondisi tidak tercapai")
+
+
+def test_mux_routes_streams_over_one_connection():
+    async def runner():
+        script = [_ticker("BTCUSDT", 1), _kline("BTCUSDT", 0, 1), {"result": None, "id": 1},
+                  _ticker("ETHUSDT", 2), _kline("BTCUSDT", 300000, 2)]
+        async with StubStream([script]) as stub:
+            mux = stream_mux.StreamMux(stub.url)
+            prices, klines = {}, []
+
+            async def on_kline(data):
+                await asyncio.sleep(0.01)  # handler lambat tidak menahan ticker
+                klines.append(data["k"]["t"])
+
+            for sym in ("BTCUSDT", "ETHUSDT"):
+                mux.subscribe(stream_mux.ticker_stream(sym), lambda d: prices.__setitem__(d["s"], float(d["c"])))
+            mux.subscribe(stream_mux.kline_stream("BTCUSDT", "5m"), on_kline)
+            mux.start(asyncio.get_running_loop())
+            await _wait(lambda: len(klines) == 2)
+
+            assert prices == {"BTCUSDT": 1.0, "ETHUSDT": 2.0}
+            assert klines == [0, 300000]
+            assert len(stub.paths) == 1
+            assert stub.paths[0] == "/stream?streams=btcusdt@ticker/ethusdt@ticker/btcusdt@kline_5m"
+
+            # Langganan baru dikirim lewat koneksi yang sama
+            mux.subscribe(stream_mux.ticker_stream("BNBUSDT"), lambda d: None)
+            await _wait(lambda: stub.requests)
+            assert stub.requests[0]["method"] == "SUBSCRIBE"
+            assert stub.requests[0]["params"] == ["bnbusdt@ticker"]
+            mux.stop()
+
+    asyncio.run(runner())
+
+
+def test_mux_reconnects_and_resubscribes(monkeypatch):
+    monkeypatch.setattr(stream_mux, "RECONNECT_MAX", 0.01)
+
+    async def runner():
+        async with StubStream([[_ticker("BTCUSDT", 1), "close"], [_ticker("BTCUSDT", 2)]]) as stub:
+            mux = stream_mux.StreamMux(stub.url)
+            seen = []
+            mux.subscribe("btcusdt@ticker", lambda d: seen.append(float(d["c"])))
+            mux.start(asyncio.get_running_loop())
+            await _wait(lambda: seen == [1.0])
+            mux.subscribe("ethusdt@ticker", lambda d: None)  # saat terputus
+            await _wait(lambda: seen == [1.0, 2.0], timeout=5)
+            assert mux.reconnects == 1
+            assert stub.paths[-1].endswith("streams=btcusdt@ticker/ethusdt@ticker")
+            mux.stop()
+
+    asyncio.run(runner())
+
+
+def test_mux_shards_streams():
+    mux = stream_mux.StreamMux("ws://unused/stream", max_streams=2)
+    for sym in ("a", "b", "c"):
+        mux.subscribe(stream_mux.ticker_stream(sym), lambda d: None)
+    assert mux.connections == 2
+    mux.unsubscribe("c@ticker")
+    assert mux.connections == 1
+
+
+def test_price_and_signal_share_connection(monkeypatch):
+    async def runner():
+        bot_flags.IS_READY = True
+        script = [_ticker("BTCUSDT", 101.5), _kline("BTCUSDT", 0, 1, closed=False), _kline("BTCUSDT", 0, 1)]
+        async with StubStream([script]) as stub:
+            monkeypatch.setattr(stream_mux, "FUTURES_STREAM_URL", stub.url)
+            monkeypatch.setattr(stream_mux, "_shared", None)
+            monkeypatch.setattr(wl, "MULTIPLEX", True)
+            monkeypatch.setattr(wsl, "MULTIPLEX", True)
+            monkeypatch.setattr(wsl, "init_db", lambda: None)
+            processed = []
+
+            def fake_submit(symbol, kline, params, timeframe):
+                processed.append((symbol, kline["t"], timeframe))
+
+            monkeypatch.setattr(wsl, "_submit_kline", fake_submit)
+            client = SimpleNamespace(API_KEY="a", API_SECRET="b", testnet=False)
+            wl.clear_prices()
+            wl.start_price_stream(client, ["BTCUSDT"])
+            wsl.start_signal_stream(client, ["BTCUSDT"], {"BTCUSDT": {}}, "5m")
+            await _wait(lambda: processed)
+
+            assert wl.get_price("BTCUSDT") == 101.5
+            assert processed == [("BTCUSDT", 0, "5m")]
+            assert len(stub.paths) == 1
+            assert wl.is_price_stream_running() and wsl.is_signal_stream_running()
+            wl.stop_price_stream(None)
+            wsl.stop_signal_stream()
+            assert stream_mux._shared is None
+            assert not wsl.is_signal_stream_running()
+
+    asyncio.run(runner())
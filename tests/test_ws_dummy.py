@@ -27,6 +27,7 @@ def test_ws_dummy(monkeypatch):
     async def runner():
         bot_flags.IS_READY = True
         msgs = [{"s": "BTCUSDT", "k": {"x": True}}]
+        monkeypatch.setattr(wsl, "MULTIPLEX", False)
         monkeypatch.setattr(wsl, "BinanceSocketManager", lambda *a, **k: DummyBSM(msgs))
         async def dummy_create(*a, **k):
             async def close_connection():
@@ -18,6 +18,7 @@ class DummySocket:
 
 def test_ws_price_fail(monkeypatch):
     bot_flags.IS_READY = True
+    monkeypatch.setattr(wl, "MULTIPLEX", False)
     monkeypatch.setattr(wl.AsyncClient, "create", lambda *a, **k: (_ for _ in ()).throw(Exception("fail")))
     client = DummyClient(API_KEY="a", API_SECRET="b", testnet=True)
     res = wl.start_price_stream(client, ["BTCUSDT"])
@@ -25,6 +26,7 @@ def test_ws_price_fail(monkeypatch):
 
 def test_ws_signal_fail(monkeypatch):
     bot_flags.IS_READY = True
+    monkeypatch.setattr(sl, "MULTIPLEX", False)
     monkeypatch.setattr(sl.AsyncClient, "create", lambda *a, **k: (_ for _ in ()).throw(Exception("fail")))
     client = DummyClient(API_KEY="a", API_SECRET="b", testnet=True)
     sl.start_signal_stream(client, ["BTCUSDT"], {"BTCUSDT": {"score_threshold":0, "hybrid_fallback": False}})
@@ -28,6 +28,7 @@ def test_signal_stream_callback(monkeypatch):
         bot_flags.IS_READY = True
         messages = [{"s": "BTCUSDT", "k": {"x": True}}]
         dummy_bsm = DummyBSM(messages)
+        monkeypatch.setattr(wsl, "MULTIPLEX", False)
         monkeypatch.setattr(wsl, "BinanceSocketManager", lambda *a, **k: dummy_bsm)
         async def dummy_create(*a, **k):
             async def close_connection():
@@ -0,0 +1,87 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pandas as pd
+import pytest
+
+from utils import historical_data, ohlcv_store
+
+STEP = 3_600_000
+T0 = int(pd.Timestamp("2025-01-01").timestamp() * 1000)
+
+
+class FakeKlines:
+    """Server kline lokal yang mencatat jumlah bar yang dikirim."""
+
+    def __init__(self, n_bars=24 * 10):
+        self.klines = [
+            [T0 + i * STEP, str(100 + i), str(101 + i), str(99 + i), str(100.5 + i), "1.0", T0 + (i + 1) * STEP - 1, "0", 1, "0", "0", "0"]
+            for i in range(n_bars)
+        ]
+        self.served = 0
+        self.requests = 0
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                q = {k: v[0] for k, v in parse_qs(urlparse(self.path).query).items()}
+                start, end, limit = int(q["startTime"]), int(q["endTime"]), int(q["limit"])
+                rows = [k for k in fake.klines if start <= k[0] <= end][:limit]
+                fake.served += len(rows)
+                fake.requests += 1
+                body = json.dumps(rows).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}/api/v3/klines"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+
+@pytest.fixture
+def fake(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    srv = FakeKlines()
+    monkeypatch.setattr(historical_data, "BINANCE_URL", srv.url)
+    monkeypatch.setattr(historical_data, "LIMIT", 50)
+    yield srv
+    srv.server.shutdown()
+
+
+def test_sync_downloads_only_missing_ranges(fake):
+    df = historical_data.load_historical_data("BTCUSDT", "1h", "2025-01-02", "2025-01-04")
+    assert len(df) == 49
+    assert fake.served == 49
+
+    # Daily refresh: hanya ekor baru yang diunduh
+    fake.served = 0
+    df = historical_data.load_historical_data("BTCUSDT", "1h", "2025-01-02", "2025-01-05")
+    assert len(df) == 73 and fake.served == 24
+
+    # Kepala yang hilang
+    fake.served = 0
+    historical_data.load_historical_data("BTCUSDT", "1h", "2025-01-01", "2025-01-05")
+    assert fake.served == 24
+
+
+def test_sync_fills_internal_gap(fake):
+    historical_data.load_historical_data("BTCUSDT", "1h", "2025-01-01", "2025-01-03")
+    stored = ohlcv_store.load_ohlcv("BTCUSDT", "1h")
+    holed = stored.drop(stored.index[10:15])
+    ohlcv_store.save_ohlcv("BTCUSDT", "1h", holed)
+    assert historical_data.find_gaps(holed.index, "1h") == [(stored.index[10], stored.index[14])]
+
+    fake.served = 0
+    merged = historical_data.sync_historical_data(
+        "BTCUSDT", "1h", pd.Timestamp("2025-01-01"), pd.Timestamp("2025-01-03")
+    )
+    assert fake.served == 5
+    assert merged.index.equals(stored.index)
+    pd.testing.assert_frame_equal(merged, stored, check_index_type=False)
@@ -0,0 +1,115 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from utils.kline_downloader import WeightLimiter, download_many, page_ranges
+
+STEP = 60_000
+
+
+class StubServer:
+    """Stub /api/v3/klines: bar per menit, header bobot, dan 429 sekali."""
+
+    def __init__(self, used_weight=10, fail_first=False):
+        self.used_weight = used_weight
+        self.fail_first = fail_first
+        self.requests = []
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                q = {k: v[0] for k, v in parse_qs(urlparse(self.path).query).items()}
+                with stub.lock:
+                    stub.requests.append(q)
+                    first = len(stub.requests) == 1
+                    stub.active += 1
+                    stub.max_active = max(stub.max_active, stub.active)
+                time.sleep(0.02)
+                with stub.lock:
+                    stub.active -= 1
+                if stub.fail_first and first:
+                    self.send_response(429)
+                    self.send_header("Retry-After", "0")
+                    self.end_headers()
+                    return
+                start, end, limit = int(q["startTime"]), int(q["endTime"]), int(q["limit"])
+                rows = [
+                    [t, "1", "2", "0.5", "1.5", "10", t + STEP - 1, "0", 1, "0", "0", "0"]
+                    for t in range(start - start % STEP, end + 1, STEP)
+                    if t >= start
+                ][:limit]
+                body = json.dumps(rows).encode()
+                self.send_response(200)
+                self.send_header("X-MBX-USED-WEIGHT-1M", str(stub.used_weight))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}/api/v3/klines"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+
+@pytest.fixture
+def stub():
+    srv = StubServer()
+    yield srv
+    srv.server.shutdown()
+
+
+def test_page_ranges_cover_range_without_overlap():
+    pages = page_ranges(0, 25 * STEP, STEP, limit=10)
+    assert pages == [(0, 10 * STEP - 1), (10 * STEP, 20 * STEP - 1), (20 * STEP, 25 * STEP)]
+
+
+def test_download_many_fetches_pages_concurrently(stub):
+    jobs = [("BTCUSDT", "1m", 0, 99 * STEP), ("ETHUSDT", "1m", 0, 49 * STEP)]
+    frames = download_many(jobs, url=stub.url, limit=10, limiter=WeightLimiter())
+    assert [len(f) for f in frames] == [100, 50]
+    assert frames[0].index.is_monotonic_increasing and not frames[0].index.duplicated().any()
+    assert len(stub.requests) == 15
+    assert {r["symbol"] for r in stub.requests} == {"BTCUSDT", "ETHUSDT"}
+    assert stub.max_active > 1
+
+
+def test_retry_after_429(stub):
+    stub.fail_first = True
+    frame = download_many([("BTCUSDT", "1m", 0, 9 * STEP)], url=stub.url, limit=10, limiter=WeightLimiter())[0]
+    assert len(frame) == 10
+    assert len(stub.requests) == 2
+
+
+def test_limiter_follows_used_weight_header(stub):
+    stub.used_weight = 4700
+    limiter = WeightLimiter(limit=6000, safety=0.8)
+    download_many([("BTCUSDT", "1m", 0, 9 * STEP)], url=stub.url, limit=10, limiter=limiter)
+    # kapasitas 4800, server melapor 4700 terpakai -> sisa sekitar 100 token
+    assert limiter.tokens <= 101
+
+
+def test_limiter_waits_when_bucket_empty():
+    limiter = WeightLimiter(limit=100, window=1.0, safety=1.0)
+    limiter.update(100)
+    t0 = time.monotonic()
+    asyncio.run(limiter.acquire(10))
+    assert time.monotonic() - t0 >= 0.08
+
+
+def test_strict_mode_raises_and_lenient_mode_skips():
+    srv = StubServer()
+    srv.server.shutdown()
+    srv.server.server_close()
+    jobs = [("BTCUSDT", "1m", 0, 9 * STEP)]
+    with pytest.raises(Exception):
+        download_many(jobs, strict=True, url=srv.url, limiter=WeightLimiter())
+    assert download_many(jobs, url=srv.url, limiter=WeightLimiter())[0].empty
@@ -0,0 +1,36 @@
+import numpy as np
+
+from utils.ohlcv_buffer import OHLCVRingBuffer, interval_to_ms
+
+
+def _bar(i):
+    return {"open": i, "high": i + 1, "low": i - 1, "close": i + 0.5, "volume": 10 * i}
+
+
+def test_interval_to_ms():
+    assert interval_to_ms("1m") == 60_000
+    assert interval_to_ms("5m") == 300_000
+    assert interval_to_ms("4h") == 14_400_000
+
+
+def test_ring_buffer_wraps_and_keeps_order():
+    step = interval_to_ms("5m")
+    buf = OHLCVRingBuffer(5, step)
+    for i in range(8):
+        assert buf.append(i * step, _bar(i))
+    assert len(buf) == 5
+    df = buf.to_frame()
+    assert list(df["open"]) == [3, 4, 5, 6, 7]
+    assert df.index.is_monotonic_increasing
+    assert buf.last_time == 7 * step
+
+
+def test_ring_buffer_ignores_duplicates_and_reports_gaps():
+    step = interval_to_ms("1m")
+    buf = OHLCVRingBuffer(10, step)
+    buf.append(0, _bar(0))
+    assert not buf.append(0, _bar(1))
+    assert buf.missing_bars(step) == 0
+    assert buf.missing_bars(4 * step) == 3
+    buf.append(step, {"close": 1.0})
+    assert np.isnan(buf.to_frame()["open"].iloc[-1])
@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+
+from utils import historical_data, ohlcv_mmap, ohlcv_store
+
+
+def _store(root, symbol="BTCUSDT", tf="1m", n=500):
+    idx = pd.date_range("2025-01-01", periods=n, freq="1min", name="timestamp")
+    close = 100 + np.arange(n, dtype=float)
+    df = pd.DataFrame(
+        {"open": close, "high": close + 1, "low": close - 1, "close": close, "volume": np.ones(n)},
+        index=idx,
+    )
+    ohlcv_store.save_ohlcv(symbol, tf, df, root=root)
+    return df
+
+
+def test_open_mmap_is_zero_copy_and_range_sliced(tmp_path):
+    df = _store(tmp_path)
+    view = ohlcv_mmap.open_mmap("BTCUSDT", "1m", df.index[10], df.index[19], root=tmp_path)
+    assert len(view) == 10 and view.index[0] == df.index[10] and view.index[-1] == df.index[19]
+    np.testing.assert_array_equal(view["close"].to_numpy(), df["close"].iloc[10:20].to_numpy())
+
+    arr = view["close"].to_numpy()
+    assert not arr.flags.writeable
+    while arr is not None and not isinstance(arr, np.memmap):
+        arr = arr.base
+    assert isinstance(arr, np.memmap)
+
+
+def test_mmap_rebuilt_when_store_changes(tmp_path):
+    _store(tmp_path, n=50)
+    assert len(ohlcv_mmap.open_mmap("BTCUSDT", "1m", root=tmp_path)) == 50
+    values_path, _ = ohlcv_mmap.mmap_paths("BTCUSDT", "1m", tmp_path)
+    import os
+
+    os.utime(values_path, (0, 0))
+    df = _store(tmp_path, n=80)
+    view = ohlcv_mmap.open_mmap("BTCUSDT", "1m", root=tmp_path)
+    assert len(view) == 80 and view.index[-1] == df.index[-1]
+
+
+def test_load_historical_view(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    df = _store("data/historical_data", symbol="ETHUSDT")
+    view = historical_data.load_historical_view("ETHUSDT", "1m", "2025-01-01 01:00", "2025-01-01 02:00")
+    expected = df.loc["2025-01-01 01:00":"2025-01-01 02:00"]
+    np.testing.assert_array_equal(view.to_numpy(), expected.to_numpy())
+    assert historical_data.load_historical_view("XRPUSDT", "1m").empty
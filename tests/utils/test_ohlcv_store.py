@@ -0,0 +1,59 @@
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from utils import historical_data, ohlcv_store
+
+
+def _write_csv(root, symbol="BTCUSDT", tf="1m", n=2000):
+    idx = pd.date_range("2025-01-01", periods=n, freq="1min", name="timestamp")
+    close = 100 + np.arange(n) * 0.01
+    df = pd.DataFrame(
+        {"open": close, "high": close + 1, "low": close - 1, "close": close, "volume": np.ones(n)},
+        index=idx,
+    )
+    path = ohlcv_store.csv_path(symbol, tf, root)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    df.to_csv(path)
+    return df, path
+
+
+def test_csv_migrated_once_and_range_read(tmp_path):
+    df, csv = _write_csv(tmp_path)
+    start, end = df.index[100], df.index[199]
+
+    part = ohlcv_store.load_ohlcv("BTCUSDT", "1m", start, end, root=tmp_path)
+    parquet = ohlcv_store.store_path("BTCUSDT", "1m", tmp_path)
+    assert parquet.exists()
+    assert len(part) == 100 and part.index[0] == start and part.index[-1] == end
+    np.testing.assert_allclose(part["close"].to_numpy(), df["close"].iloc[100:200].to_numpy())
+
+    mtime = parquet.stat().st_mtime_ns
+    ohlcv_store.load_ohlcv("BTCUSDT", "1m", root=tmp_path)
+    assert parquet.stat().st_mtime_ns == mtime
+    assert ohlcv_store.ohlcv_bounds("BTCUSDT", "1m", root=tmp_path) == (df.index[0], df.index[-1])
+
+    # CSV yang diperbarui manual dimigrasikan ulang
+    time.sleep(0.01)
+    df2, _ = _write_csv(tmp_path, n=10)
+    os.utime(csv)
+    assert len(ohlcv_store.load_ohlcv("BTCUSDT", "1m", root=tmp_path)) == 10
+
+
+def test_load_historical_data_reads_store(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    df, _ = _write_csv("data/historical_data", symbol="ETHUSDT", tf="1m")
+    monkeypatch.setattr(historical_data, "_download_binance", lambda *a, **k: (_ for _ in ()).throw(AssertionError))
+
+    out = historical_data.load_historical_data("ETHUSDT", "1m", "2025-01-01 01:00", "2025-01-01 02:00")
+    expected = df.loc["2025-01-01 01:00":"2025-01-01 02:00"]
+    assert list(out.columns) == ["open", "high", "low", "close", "volume"]
+    np.testing.assert_allclose(out.to_numpy(), expected.to_numpy())
+    assert (out.index == expected.index).all()
+
+    # 5m dibentuk dari data 1m lalu disimpan ke store
+    out5 = historical_data.load_historical_data("ETHUSDT", "5m", "2025-01-01 01:00", "2025-01-01 02:00")
+    assert len(out5) == 13
+    assert ohlcv_store.store_path("ETHUSDT", "5m").exists()
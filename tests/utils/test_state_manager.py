@@ -123,4 +123,92 @@ def test_save_error_handling(tmp_path, monkeypatch, capsys):
         sm.save_state([{"symbol": "DOT"}])
     
     # Cleanup
-    os.chmod(tmp_path, 0o755)
\ No newline at end of file
+    os.chmod(tmp_path, 0o755)
+
+
+def test_journal_appends_deltas_and_replays(tmp_path, monkeypatch):
+    """Perubahan kecil ditulis sebagai delta journal, bukan snapshot penuh"""
+    monkeypatch.setattr(sm, "STATE_DIR", str(tmp_path))
+    monkeypatch.setattr(sm, "STATE_FILE", str(tmp_path / "active_trades.json"))
+    monkeypatch.setattr(sm, "BACKUP_FILE", str(tmp_path / "active_trades.bak.json"))
+
+    trades = [{"symbol": s, "side": "long", "order_id": str(i), "trailing_sl": 1.0}
+              for i, s in enumerate(["BTC", "ETH", "SOL"])]
+    sm.save_state(trades)
+    snapshot = open(sm.STATE_FILE).read()
+
+    trades[0]["trailing_sl"] = 2.0
+    trades[2]["trailing_sl"] = 3.0
+    sm.save_state(trades)
+    sm.save_state(trades[1:] + [{"symbol": "ADA", "side": "short", "order_id": "9"}])
+
+    assert open(sm.STATE_FILE).read() == snapshot
+    records = [json.loads(line) for line in open(sm.journal_file())]
+    assert [r["op"] for r in records] == ["update", "update", "open", "close"]
+    assert {k: v for k, v in records[0].items() if k != "seq"} == {
+        "op": "update", "key": "order:0", "fields": {"trailing_sl": 2.0}
+    }
+
+    expected = [trades[1], trades[2], {"symbol": "ADA", "side": "short", "order_id": "9"}]
+    assert sm.load_state() == expected
+    # Replay dari disk (proses lain / restart) memberi hasil yang sama
+    monkeypatch.setattr(sm, "_cache", None)
+    assert sm.load_state() == expected
+
+    # Baris terakhir terpotong saat crash diabaikan
+    with open(sm.journal_file(), "a") as f:
+        f.write('{"op": "close", "ke')
+    assert sm.load_state() == expected
+
+
+def test_journal_compaction(tmp_path, monkeypatch):
+    """Journal dipadatkan ke snapshot setelah melewati batas record"""
+    monkeypatch.setattr(sm, "STATE_DIR", str(tmp_path))
+    monkeypatch.setattr(sm, "STATE_FILE", str(tmp_path / "active_trades.json"))
+    monkeypatch.setattr(sm, "BACKUP_FILE", str(tmp_path / "active_trades.bak.json"))
+    monkeypatch.setattr(sm, "JOURNAL_COMPACT_EVERY", 5)
+
+    trade = {"symbol": "BTC", "side": "long", "order_id": "1", "trailing_sl": 0}
+    sm.save_state([trade])
+    for i in range(1, 8):
+        trade["trailing_sl"] = i
+        sm.save_state([trade])
+
+    assert len(open(sm.journal_file()).read().splitlines()) == 1
+    assert json.load(open(sm.STATE_FILE))["trades"] == [dict(trade, trailing_sl=6)]
+    assert sm.load_state() == [trade]
+    sm.delete_state()
+    assert not os.path.exists(sm.journal_file())
+    assert sm.load_state() == []
+
+
+def test_compaction_crash_before_journal_reset(tmp_path, monkeypatch):
+    """Journal lama tidak diterapkan ulang di atas snapshot yang lebih baru"""
+    monkeypatch.setattr(sm, "STATE_DIR", str(tmp_path))
+    monkeypatch.setattr(sm, "STATE_FILE", str(tmp_path / "active_trades.json"))
+    monkeypatch.setattr(sm, "BACKUP_FILE", str(tmp_path / "active_trades.bak.json"))
+    monkeypatch.setattr(sm, "JOURNAL_COMPACT_EVERY", 4)
+
+    btc = {"symbol": "BTC", "side": "long", "order_id": "1", "trailing_sl": 1.0}
+    sm.save_state([])
+    sm.save_state([btc])
+    sm.save_state([dict(btc, trailing_sl=2.0)])
+
+    def crash():
+        raise RuntimeError("proses mati")
+
+    reset_journal = sm._reset_journal
+    monkeypatch.setattr(sm, "_reset_journal", crash)
+    eth = [{"symbol": "ETH", "side": "long", "order_id": str(i)} for i in range(2, 5)]
+    with pytest.raises(RuntimeError):
+        sm.save_state(eth)  # 6 record > batas: snapshot ditulis, journal gagal dikosongkan
+
+    assert open(sm.journal_file()).read()  # journal lama masih ada
+    monkeypatch.setattr(sm, "_cache", None)  # seperti proses baru
+    assert sm.load_state() == eth
+
+    # Save berikutnya tetap konsisten di atas journal lama
+    monkeypatch.setattr(sm, "_reset_journal", reset_journal)
+    sm.save_state(eth[1:])
+    monkeypatch.setattr(sm, "_cache", None)
+    assert sm.load_state() == eth[1:]
@@ -0,0 +1,187 @@
+import numpy as np
+import pandas as pd
+
+from utils import ohlcv_store, tf_cache
+
+
+def _bars(start="2025-01-01", n=600, freq="1min"):
+    idx = pd.date_range(start, periods=n, freq=freq, name="timestamp")
+    rng = np.random.default_rng(0)
+    close = 100 + rng.normal(0, 1, n).cumsum()
+    return pd.DataFrame(
+        {
+            "open": close + rng.normal(0, 0.1, n),
+            "high": close + 1,
+            "low": close - 1,
+            "close": close,
+            "volume": rng.uniform(1, 2, n),
+        },
+        index=idx,
+    )
+
+
+def _manual(df, rule):
+    agg = df.resample(rule).agg(tf_cache.AGG).dropna()
+    agg.index.name = "timestamp"
+    return agg
+
+
+def test_resample_closed_drops_open_bucket():
+    df = _bars(n=50)  # 00:00..00:49 -> bucket 00:45 belum tutup
+    out = tf_cache.resample_closed(df, "15m", "1m")
+    assert list(out.index) == list(pd.date_range("2025-01-01", periods=3, freq="15min"))
+    pd.testing.assert_frame_equal(out, _manual(df, "15min").iloc[:3], check_freq=False)
+    # Tanpa base_tf, jarak bar diperkirakan dari data
+    pd.testing.assert_frame_equal(tf_cache.resample_closed(df, "15m"), out)
+
+
+def test_update_derived_appends_only_new_closed_bars(tmp_path, monkeypatch):
+    full = _bars(n=600)
+    ohlcv_store.save_ohlcv("BTCUSDT", "1m", full.iloc[:300], tmp_path)
+
+    assert tf_cache.update_derived("BTCUSDT", "1h", root=tmp_path) == 5
+    assert tf_cache.update_derived("BTCUSDT", "1h", root=tmp_path) == 0
+
+    ohlcv_store.save_ohlcv("BTCUSDT", "1m", full, tmp_path)
+    reads = []
+    orig = tf_cache.load_ohlcv
+
+    def spy(symbol, tf, start=None, end=None, root=None):
+        reads.append((tf, start))
+        return orig(symbol, tf, start, end, root)
+
+    monkeypatch.setattr(tf_cache, "load_ohlcv", spy)
+    assert tf_cache.update_derived("BTCUSDT", "1h", root=tmp_path) == 5
+    assert ("1m", pd.Timestamp("2025-01-01 05:00")) in reads
+
+    stored = ohlcv_store.load_ohlcv("BTCUSDT", "1h", root=tmp_path)
+    expected = _manual(full, "1h")
+    np.testing.assert_allclose(stored.to_numpy(), expected.to_numpy())
+    assert list(stored.index) == list(expected.index)
+
+
+def test_load_timeframe_builds_from_base(tmp_path):
+    full = _bars(n=600, freq="5min")
+    ohlcv_store.save_ohlcv("ETHUSDT", "5m", full, tmp_path)
+    assert tf_cache.load_timeframe("ETHUSDT", "4h", base_tf="1m", root=tmp_path) is None
+
+    out = tf_cache.load_timeframe("ETHUSDT", "4h", base_tf="5m", root=tmp_path)
+    # Bucket 48:00-52:00 belum tutup
+    np.testing.assert_allclose(out.to_numpy(), _manual(full, "4h").iloc[:-1].to_numpy())
+
+
+def test_timeframe_cache_matches_batch_resample():
+    full = _bars(n=600)
+    cache = tf_cache.TimeframeCache("1m", ("5m", "15m", "1h"), maxlen=50)
+    cache.seed_base(full.iloc[:130])
+
+    closed_at = {}
+    for ts, row in zip(full.index[130:], full.iloc[130:].to_dict("records")):
+        for tf in cache.append(int(ts.value // 10**6), row):
+            closed_at.setdefault(tf, []).append(ts)
+
+    for tf, rule in (("5m", "5min"), ("15m", "15min"), ("1h", "1h")):
+        expected = _manual(full, rule).tail(50)
+        got = cache.frame(tf)
+        np.testing.assert_allclose(got.to_numpy(), expected.to_numpy())
+        assert list(got.index) == list(expected.index)
+    # Bar 1h tutup pada bar dasar terakhir bucket
+    assert closed_at["1h"][0] == pd.Timestamp("2025-01-01 02:59")
+    # Bar lama atau duplikat diabaikan
+    assert cache.append(int(full.index[-1].value // 10**6), full.iloc[-1].to_dict()) == []
+
+
+def test_ws_higher_tf_trend_uses_cache(monkeypatch):
+    from execution import ws_signal_listener as wsl
+
+    data = {"5m": _bars(n=2000, freq="5min")}
+    data["1h"] = _manual(data["5m"], "1h")
+    data["4h"] = _manual(data["5m"], "4h")
+    calls = []
+
+    def fake_fetch(symbol, client, interval="5m", limit=100):
+        calls.append(interval)
+        return data[interval][data[interval].index <= now].tail(limit)
+
+    monkeypatch.setattr(wsl, "fetch_latest_data", fake_fetch)
+    monkeypatch.setattr(wsl, "client_global", object())
+    monkeypatch.setattr(wsl, "_tf_caches", {})
+    monkeypatch.setattr(wsl, "apply_indicators", lambda df, params: df.assign(ema=df["close"], sma=df["close"].rolling(3).mean()))
+
+    def kline(ts):
+        row = data["5m"].loc[ts]
+        return {"t": int(ts.value // 10**6), "o": row["open"], "h": row["high"],
+                "l": row["low"], "c": row["close"], "v": row["volume"], "x": True}
+
+    for ts in data["5m"].index[1507:1607]:
+        now = ts
+        wsl._higher_tf_trend("BTCUSDT", {}, kline(ts), "5m")
+
+    assert calls == ["1h", "5m", "4h", "5m"]
+    cache = wsl._tf_caches["BTCUSDT"]
+    for tf in ("1h", "4h"):
+        expected = data[tf][data[tf].index + pd.Timedelta(tf) <= now + pd.Timedelta("5min")]
+        got = cache.frame(tf)
+        assert got.index[-1] == expected.index[-1]
+        np.testing.assert_allclose(got.tail(10).to_numpy(), expected.tail(10).to_numpy())
+
+
+def test_ws_higher_tf_trend_recomputes_only_on_close(monkeypatch):
+    from execution import ws_signal_listener as wsl
+
+    data = {"5m": _bars(n=2000, freq="5min")}
+    data["1h"] = _manual(data["5m"], "1h")
+    data["4h"] = _manual(data["5m"], "4h")
+    computed = []
+
+    def fake_fetch(symbol, client, interval="5m", limit=100):
+        return data[interval][data[interval].index <= now].tail(limit)
+
+    def fake_indicators(df, params):
+        computed.append(df.index[-1])
+        return df.assign(ema=df["close"], sma=df["close"].rolling(3).mean())
+
+    monkeypatch.setattr(wsl, "fetch_latest_data", fake_fetch)
+    monkeypatch.setattr(wsl, "client_global", object())
+    monkeypatch.setattr(wsl, "_tf_caches", {})
+    monkeypatch.setattr(wsl, "_htf_state", {})
+    monkeypatch.setattr(wsl, "apply_indicators", fake_indicators)
+
+    results = []
+    for ts in data["5m"].index[1507:1555]:  # 4 jam bar 5m
+        now = ts
+        row = data["5m"].loc[ts]
+        k = {"t": int(ts.value // 10**6), "o": row["open"], "h": row["high"],
+             "l": row["low"], "c": row["close"], "v": row["volume"], "x": True}
+        results.append(wsl._higher_tf_trend("BTCUSDT", {"ema_period": 5}, k, "5m"))
+
+    # 2 saat seed + 4 bar 1h + 1 bar 4h yang tutup selama 48 kline
+    assert len(computed) == 7
+    assert all(isinstance(r, tuple) for r in results)
+
+
+def test_ws_higher_tf_rest_fallback_uses_closed_bars(monkeypatch):
+    from types import SimpleNamespace
+    from execution import ws_signal_listener as wsl
+
+    data = {"1h": _bars(n=200, freq="1h")}
+    data["4h"] = _manual(data["1h"], "4h")
+    now = data["1h"].index[150] + pd.Timedelta(minutes=10)  # bar 1h ke-150 baru berjalan
+    seen = {}
+
+    def fake_fetch(symbol, client, interval="5m", limit=100):
+        return data[interval][data[interval].index <= now].tail(limit)
+
+    def fake_indicators(df, params):
+        seen[df.index[1] - df.index[0]] = df.index[-1]
+        return df.assign(ema=df["close"], sma=df["close"].rolling(3).mean())
+
+    monkeypatch.setattr(wsl, "fetch_latest_data", fake_fetch)
+    monkeypatch.setattr(wsl, "client_global", object())
+    monkeypatch.setattr(wsl, "_htf_state", {})
+    monkeypatch.setattr(wsl, "apply_indicators", fake_indicators)
+    monkeypatch.setattr(wsl, "time", SimpleNamespace(time=lambda: now.timestamp()))
+
+    wsl._higher_tf_trend("BTCUSDT", {}, None, "5m")  # tanpa kline: jalur REST
+    assert seen[pd.Timedelta("1h")] == data["1h"].index[149]
+    assert seen[pd.Timedelta("4h")] + pd.Timedelta("4h") <= now
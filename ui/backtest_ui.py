@@ -1,10 +1,7 @@
 import os
-import time
 import datetime as dt
-from concurrent.futures import ThreadPoolExecutor, as_completed
 
 import pandas as pd
-import requests
 import streamlit as st
 import plotly.graph_objects as go
 import json
@@ -16,6 +13,7 @@ from backtest.optimizer import optimize_strategy, optimal_params_in_memory
 from ml import training
 from ml.historical_trainer import label_and_save
 from utils.historical_data import MAX_DAYS
+from utils.kline_downloader import download_many
 from utils.strategy_config import (
     load_strategy_config,
     save_strategy_config,
@@ -250,50 +248,6 @@ if do_optimize:
                     st.error(f"Optimasi {simbol} gagal: {e}")
 
 
-def unduh_klines(simbol: str, mulai_ms: int, akhir_ms: int, timeframe: str) -> pd.DataFrame:
-    url = "https://api.binance.com/api/v3/klines"
-    batas = 1000
-    data = []
-    awal = mulai_ms
-    step = int(timeframe.rstrip("m")) * 60 * 1000
-    while awal < akhir_ms:
-        params = {
-            "symbol": simbol,
-            "interval": timeframe,
-            "startTime": awal,
-            "endTime": min(awal + batas * step, akhir_ms),
-            "limit": batas,
-        }
-        r = requests.get(url, params=params, timeout=10)
-        if r.status_code != 200:
-            raise RuntimeError(r.text)
-        klines = r.json()
-        if not klines:
-            break
-        data.extend(klines)
-        awal = klines[-1][0] + step
-        time.sleep(0.2)  # antisipasi limit
-    kolom = [
-        "timestamp",
-        "open",
-        "high",
-        "low",
-        "close",
-        "volume",
-        "close_time",
-        "quote_asset_volume",
-        "number_of_trades",
-        "taker_buy_base_asset_volume",
-        "taker_buy_quote_asset_volume",
-        "ignore",
-    ]
-    df = pd.DataFrame(data, columns=kolom)
-    df = df[["timestamp", "open", "high", "low", "close", "volume"]]
-    df["timestamp"] = pd.to_datetime(df["timestamp"], unit="ms")
-    df.set_index("timestamp", inplace=True)
-    return df.astype(float)
-
-
 if jalankan:
     if not simbol_terpilih:
         st.warning("Silakan pilih minimal satu simbol.")
@@ -308,23 +262,15 @@ if jalankan:
         progress = st.progress(0.0)
         hasil_data: dict[str, pd.DataFrame] = {}
 
-        def pekerja(simbol: str):
-            df = unduh_klines(simbol, mulai_ms, akhir_ms, tf)
-            path = f"data/training_data/{simbol}_{tf}.csv"
-            df.to_csv(path)
-            return simbol, df
-
-        futures = []
-        with ThreadPoolExecutor(max_workers=min(4, len(simbol_terpilih))) as ex:
-            for s in simbol_terpilih:
-                futures.append(ex.submit(pekerja, s))
-            for i, fut in enumerate(as_completed(futures), 1):
-                try:
-                    simbol, df = fut.result()
-                    hasil_data[simbol] = df
-                except Exception as e:
-                    st.error(f"Gagal mengunduh {s}: {e}")
-                progress.progress(i / len(simbol_terpilih))
+        # Semua simbol diunduh bersamaan lewat satu connection pool
+        jobs = [(s, tf, mulai_ms, akhir_ms) for s in simbol_terpilih]
+        for simbol, df in zip(simbol_terpilih, download_many(jobs)):
+            if df.empty:
+                st.error(f"Gagal mengunduh {simbol}")
+                continue
+            df.to_csv(f"data/training_data/{simbol}_{tf}.csv")
+            hasil_data[simbol] = df
+        progress.progress(1.0)
         progress.empty()
         for simbol, df in hasil_data.items():
             params = optimal_params_in_memory.get(simbol) or STRATEGY_PARAMS.get(simbol)
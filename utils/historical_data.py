@@ -1,84 +1,107 @@
 import os
 import logging
-import time
 import datetime as dt
 from pathlib import Path
 from typing import Dict
 
+import numpy as np
 import pandas as pd
-import requests
+
+from utils.ohlcv_store import load_ohlcv, ohlcv_bounds, save_ohlcv
+from utils.ohlcv_mmap import open_mmap
+from utils.ohlcv_buffer import interval_to_ms
+from utils.kline_downloader import download_many
+from utils.tf_cache import update_derived
 
 BINANCE_URL = "https://api.binance.com/api/v3/klines"
 LIMIT = 1000
 
-MAX_DAYS: Dict[str, int] = {"1m": 60, "5m": 90, "15m": 120, "1h": 180}
+MAX_DAYS: Dict[str, int] = {"1m": 60, "5m": 90, "15m": 120, "1h": 180, "4h": 365}
 
-TF_ORDER = ["1m", "5m", "15m", "1h"]
-TF_TO_PANDAS = {"1m": "1T", "5m": "5T", "15m": "15T", "1h": "1H"}
+TF_ORDER = ["1m", "5m", "15m", "1h", "4h"]
 
 
 def _download_binance(symbol: str, tf: str, start_dt: pd.Timestamp, end_dt: pd.Timestamp) -> pd.DataFrame:
     """Unduh data historis dari Binance sesuai rentang waktu."""
-    start_ts = int(start_dt.timestamp() * 1000)
-    end_ts = int(end_dt.timestamp() * 1000)
-    mult = 1
-    if tf.endswith("m"):
-        mult = int(tf.rstrip("m"))
-    elif tf.endswith("h"):
-        mult = int(tf.rstrip("h")) * 60
-
-    all_klines = []
-    current = start_ts
-    while current < end_ts:
-        params = {
-            "symbol": symbol.upper(),
-            "interval": tf,
-            "limit": LIMIT,
-            "startTime": current,
-            "endTime": end_ts,
-        }
-        try:
-            resp = requests.get(BINANCE_URL, params=params, timeout=10)
-            if resp.status_code != 200:
-                logging.error("Gagal request Binance: %s", resp.text)
-                break
-            data = resp.json()
-        except Exception as exc:  # pragma: no cover - jaringan
-            logging.error("Error koneksi ke Binance: %s", exc)
-            break
-        if not data:
-            break
-        all_klines.extend(data)
-        current = data[-1][0] + mult * 60_000
-        time.sleep(0.1)
-
-    if not all_klines:
-        return pd.DataFrame()
-
-    df = pd.DataFrame(
-        all_klines,
-        columns=[
-            "time",
-            "open",
-            "high",
-            "low",
-            "close",
-            "volume",
-            "close_time",
-            "quote_asset_volume",
-            "trades",
-            "taker_buy_base",
-            "taker_buy_quote",
-            "ignore",
-        ],
+    return _download_ranges([(symbol, tf, start_dt, end_dt)])[0]
+
+
+def _download_ranges(jobs: list[tuple[str, str, pd.Timestamp, pd.Timestamp]]) -> list[pd.DataFrame]:
+    """Unduh beberapa (simbol, tf, awal, akhir) bersamaan lewat pengunduh async."""
+    ms_jobs = [
+        (sym, tf, int(pd.Timestamp(lo).timestamp() * 1000), int(pd.Timestamp(hi).timestamp() * 1000))
+        for sym, tf, lo, hi in jobs
+    ]
+    return download_many(ms_jobs, url=BINANCE_URL, limit=LIMIT)
+
+
+def find_gaps(
+    index: pd.DatetimeIndex,
+    tf: str,
+    start: pd.Timestamp | None = None,
+    end: pd.Timestamp | None = None,
+) -> list[tuple[pd.Timestamp, pd.Timestamp]]:
+    """Rentang open time (inklusif) yang belum ada di ``index``.
+
+    Mencakup kekurangan di depan (sebelum bar pertama), lubang di tengah,
+    dan kekurangan di belakang, dibatasi ke ``[start, end]`` bila diberikan.
+    """
+    step = pd.Timedelta(milliseconds=interval_to_ms(tf))
+    if len(index) == 0:
+        return [(start, end)] if start is not None and end is not None and start <= end else []
+    index = pd.DatetimeIndex(index).sort_values()
+    gaps: list[tuple[pd.Timestamp, pd.Timestamp]] = []
+    if start is not None:
+        gaps.append((start, index[0] - step))
+    diffs = index[1:] - index[:-1]
+    for i in np.flatnonzero(diffs > step):
+        gaps.append((index[i] + step, index[i + 1] - step))
+    if end is not None:
+        gaps.append((index[-1] + step, end))
+    hasil = []
+    for lo, hi in gaps:
+        lo = max(lo, start) if start is not None else lo
+        hi = min(hi, end) if end is not None else hi
+        if lo <= hi:
+            hasil.append((lo, hi))
+    return hasil
+
+
+def sync_historical_data(
+    symbol: str,
+    tf: str,
+    start_dt: pd.Timestamp,
+    end_dt: pd.Timestamp,
+) -> pd.DataFrame:
+    """Lengkapi store secara inkremental dan kembalikan seluruh isinya.
+
+    Hanya rentang yang hilang (depan, lubang tengah, belakang) di dalam
+    ``[start_dt, end_dt]`` yang diunduh; data lama tidak diunduh ulang.
+    Candle yang belum tutup tidak diminta. Hasil gabungan ditulis atomik.
+    """
+    step = pd.Timedelta(milliseconds=interval_to_ms(tf))
+    last_closed = pd.Timestamp.now(tz="UTC").tz_localize(None).floor(step) - step
+    end_dt = min(pd.Timestamp(end_dt), last_closed)
+    existing = load_ohlcv(symbol, tf)
+    if existing is None:
+        existing = pd.DataFrame()
+
+    gaps = find_gaps(existing.index, tf, pd.Timestamp(start_dt), end_dt)
+    parts = [p for p in _download_ranges([(symbol, tf, lo, hi) for lo, hi in gaps]) if not p.empty]
+    if not parts:
+        return existing
+
+    merged = pd.concat([existing, *parts]) if not existing.empty else pd.concat(parts)
+    merged = merged[~merged.index.duplicated(keep="last")].sort_index()
+    save_ohlcv(symbol, tf, merged)
+    logging.info(
+        "[DATA] %s %s: %d bar baru dari %d rentang",
+        symbol,
+        tf,
+        sum(len(p) for p in parts),
+        len(gaps),
     )
-    df = df[["time", "open", "high", "low", "close", "volume"]]
-    df["timestamp"] = pd.to_datetime(df["time"], unit="ms")
-    df.drop(columns=["time"], inplace=True)
-    for col in ["open", "high", "low", "close", "volume"]:
-        df[col] = pd.to_numeric(df[col], errors="coerce")
-    df.set_index("timestamp", inplace=True)
-    return df
+    return merged
 
 
 def load_historical_data(symbol: str, tf: str, start_date: str, end_date: str) -> pd.DataFrame:
@@ -101,44 +124,56 @@ def load_historical_data(symbol: str, tf: str, start_date: str, end_date: str) -
             f"Permission error. Pastikan folder {folder} dapat ditulis user docker. Jalankan: sudo chown -R 1000:1000 data/historical_data"
         )
 
-    filepath = folder / f"{symbol}_{tf}.csv"
-    if filepath.exists():
-        try:
-            df = pd.read_csv(filepath, parse_dates=["timestamp"], index_col="timestamp")
-        except Exception:
-            df = pd.DataFrame()
-        else:
-            if not df.empty and df.index.min() <= start_dt and df.index.max() >= end_dt:
-                return df.loc[start_dt:end_dt]
-
+    try:
+        bounds = ohlcv_bounds(symbol, tf)
+    except Exception:
+        bounds = None
+    if bounds and bounds[0] <= start_dt and bounds[1] >= end_dt:
+        return load_ohlcv(symbol, tf, start_dt, end_dt)
+
+    # Bangun dari timeframe dasar terkecil yang tersedia; hanya bar yang
+    # baru tutup sejak pembaruan terakhir yang ditambahkan.
     idx = TF_ORDER.index(tf)
     for smaller in TF_ORDER[:idx]:
-        src = Path("data") / "historical_data" / smaller / f"{symbol}_{smaller}.csv"
-        if src.exists():
-            try:
-                df_small = pd.read_csv(src, parse_dates=["timestamp"], index_col="timestamp")
-            except Exception:
-                continue
-            df_resampled = (
-                df_small
-                .resample(TF_TO_PANDAS[tf])
-                .agg({
-                    "open": "first",
-                    "high": "max",
-                    "low": "min",
-                    "close": "last",
-                    "volume": "sum",
-                })
-                .dropna()
-            )
-            df_resampled.to_csv(filepath)
-            if df_resampled.index.min() <= start_dt and df_resampled.index.max() >= end_dt:
-                return df_resampled.loc[start_dt:end_dt]
-
-    df_dl = _download_binance(symbol, tf, start_dt, end_dt)
-    if df_dl.empty:
-        return df_dl
-    df_dl.to_csv(filepath)
-    return df_dl.loc[start_dt:end_dt]
-
-__all__ = ["load_historical_data", "MAX_DAYS"]
+        try:
+            added = update_derived(symbol, tf, base_tf=smaller)
+        except Exception as e:
+            logging.warning(f"Gagal membentuk {tf} dari {smaller} untuk {symbol}: {e}")
+            continue
+        if added is None:
+            continue
+        bounds = ohlcv_bounds(symbol, tf)
+        if bounds and bounds[0] <= start_dt and bounds[1] >= end_dt:
+            return load_ohlcv(symbol, tf, start_dt, end_dt)
+
+    df_sync = sync_historical_data(symbol, tf, start_dt, end_dt)
+    if df_sync.empty:
+        return df_sync
+    return df_sync.loc[start_dt:end_dt]
+
+def load_historical_view(
+    symbol: str,
+    tf: str,
+    start_date: str | None = None,
+    end_date: str | None = None,
+) -> pd.DataFrame:
+    """View OHLCV read-only tanpa salinan dari layout memory-mapped.
+
+    Proses lain yang membuka simbol yang sama berbagi page cache, sehingga
+    RAM tidak bertambah per proses. Bila data belum ada dan rentang
+    diberikan, data diisi dulu lewat :func:`load_historical_data`.
+    """
+    view = open_mmap(symbol, tf, start_date, end_date)
+    if view is None and start_date and end_date:
+        load_historical_data(symbol, tf, start_date, end_date)
+        view = open_mmap(symbol, tf, start_date, end_date)
+    return view if view is not None else pd.DataFrame()
+
+
+__all__ = [
+    "load_historical_data",
+    "load_historical_view",
+    "sync_historical_data",
+    "find_gaps",
+    "MAX_DAYS",
+]
@@ -0,0 +1,228 @@
+"""Pengunduh kline Binance asinkron bersama.
+
+Satu ``aiohttp.ClientSession`` (connection pool) dipakai untuk semua simbol;
+rentang waktu dipecah menjadi halaman ``LIMIT`` bar yang diambil bersamaan.
+Laju request dikendalikan token bucket berbobot yang diselaraskan dengan
+header ``X-MBX-USED-WEIGHT-1M`` dari Binance, bukan sleep tetap.
+"""
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, List, Sequence, Tuple
+
+import aiohttp
+import pandas as pd
+
+from utils.ohlcv_buffer import interval_to_ms
+
+BINANCE_URL = "https://api.binance.com/api/v3/klines"
+LIMIT = 1000
+WEIGHT_LIMIT = 6000  # bobot per menit untuk IP di endpoint spot
+KLINE_WEIGHT = 2
+MAX_CONCURRENCY = 8
+MAX_RETRY = 5
+
+KLINE_COLUMNS = [
+    "timestamp",
+    "open",
+    "high",
+    "low",
+    "close",
+    "volume",
+    "close_time",
+    "quote_asset_volume",
+    "number_of_trades",
+    "taker_buy_base_asset_volume",
+    "taker_buy_quote_asset_volume",
+    "ignore",
+]
+
+Job = Tuple[str, str, int, int]  # (simbol, timeframe, start_ms, end_ms) inklusif
+
+
+class WeightLimiter:
+    """Token bucket bobot request per jendela satu menit.
+
+    Token terisi merata ``limit * safety`` per ``window`` detik. Setiap
+    respons memperbarui sisa token dari ``X-MBX-USED-WEIGHT-1M`` sehingga
+    pemakaian proses lain pada IP yang sama ikut diperhitungkan.
+    """
+
+    def __init__(self, limit: int = WEIGHT_LIMIT, window: float = 60.0, safety: float = 0.8) -> None:
+        self.capacity = limit * safety
+        self.rate = self.capacity / window
+        self.tokens = self.capacity
+        self._stamp = time.monotonic()
+        self._blocked_until = 0.0
+        # Lock thread biasa: bagian kritis tidak pernah menunggu (await),
+        # sehingga limiter aman dipakai bersama lintas event loop/thread
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._stamp) * self.rate)
+        self._stamp = now
+
+    def _take(self, weight: int) -> float:
+        """Ambil token bila cukup; kembalikan lama tunggu (0 berarti berhasil)."""
+        with self._lock:
+            now = time.monotonic()
+            if now < self._blocked_until:
+                return self._blocked_until - now
+            self._refill()
+            if self.tokens >= weight:
+                self.tokens -= weight
+                return 0.0
+            return (weight - self.tokens) / self.rate
+
+    async def acquire(self, weight: int = KLINE_WEIGHT) -> None:
+        while True:
+            wait = self._take(weight)
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
+
+    def update(self, used_weight: int) -> None:
+        """Selaraskan token dengan bobot yang dilaporkan server."""
+        with self._lock:
+            self._refill()
+            self.tokens = min(self.tokens, self.capacity - used_weight)
+
+    def block(self, seconds: float) -> None:
+        """Tahan semua request (respons 429/418 dengan ``Retry-After``)."""
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+            self.tokens = 0.0
+
+
+# Dipakai bersama semua pengunduh di proses ini agar bobot IP tidak terlampaui
+shared_limiter = WeightLimiter()
+
+
+def klines_to_frame(rows: Iterable[list]) -> pd.DataFrame:
+    """Ubah baris kline mentah menjadi DataFrame OHLCV ber-index waktu."""
+    df = pd.DataFrame(list(rows), columns=KLINE_COLUMNS)
+    df = df[["timestamp", "open", "high", "low", "close", "volume"]]
+    df["timestamp"] = pd.to_datetime(df["timestamp"], unit="ms")
+    for col in ["open", "high", "low", "close", "volume"]:
+        df[col] = pd.to_numeric(df[col], errors="coerce")
+    df = df.drop_duplicates("timestamp").sort_values("timestamp")
+    return df.set_index("timestamp")
+
+
+def page_ranges(start_ms: int, end_ms: int, step_ms: int, limit: int = LIMIT) -> List[Tuple[int, int]]:
+    """Potong rentang inklusif menjadi halaman maksimal ``limit`` bar."""
+    span = step_ms * limit
+    return [(s, min(s + span - 1, end_ms)) for s in range(start_ms, end_ms + 1, span)]
+
+
+class KlineDownloader:
+    """Unduh banyak (simbol, rentang) sekaligus lewat satu connection pool."""
+
+    def __init__(
+        self,
+        url: str = BINANCE_URL,
+        limit: int = LIMIT,
+        concurrency: int = MAX_CONCURRENCY,
+        limiter: WeightLimiter | None = None,
+    ) -> None:
+        self.url = url
+        self.limit = limit
+        self.concurrency = concurrency
+        self.limiter = limiter or shared_limiter
+
+    async def _page(
+        self,
+        session: aiohttp.ClientSession,
+        sem: asyncio.Semaphore,
+        symbol: str,
+        tf: str,
+        start: int,
+        end: int,
+    ) -> list:
+        params = {
+            "symbol": symbol.upper(),
+            "interval": tf,
+            "limit": self.limit,
+            "startTime": start,
+            "endTime": end,
+        }
+        async with sem:
+            for attempt in range(MAX_RETRY):
+                await self.limiter.acquire(KLINE_WEIGHT)
+                async with session.get(self.url, params=params) as resp:
+                    used = resp.headers.get("X-MBX-USED-WEIGHT-1M") or resp.headers.get("X-MBX-USED-WEIGHT")
+                    if used and used.isdigit():
+                        self.limiter.update(int(used))
+                    if resp.status in (418, 429):
+                        wait = float(resp.headers.get("Retry-After", 2 ** attempt))
+                        logging.warning(f"[DATA] Rate limit Binance ({resp.status}), tunggu {wait:.0f}s")
+                        self.limiter.block(wait)
+                        continue
+                    if resp.status != 200:
+                        raise RuntimeError(await resp.text())
+                    return await resp.json(content_type=None)
+        raise RuntimeError(f"Rate limit Binance terus terjadi untuk {symbol}")
+
+    async def fetch_many(self, jobs: Sequence[Job], strict: bool = False) -> List[pd.DataFrame]:
+        """Unduh semua ``jobs`` bersamaan; hasil mengikuti urutan ``jobs``.
+
+        Halaman yang gagal dicatat dan dilewati, kecuali ``strict`` aktif
+        sehingga error pertama diteruskan ke pemanggil.
+        """
+        sem = asyncio.Semaphore(self.concurrency)
+        timeout = aiohttp.ClientTimeout(total=30)
+        connector = aiohttp.TCPConnector(limit=self.concurrency)
+        async with aiohttp.ClientSession(timeout=timeout, connector=connector) as session:
+            tasks = []
+            owners = []
+            for i, (symbol, tf, start, end) in enumerate(jobs):
+                for lo, hi in page_ranges(start, end, interval_to_ms(tf), self.limit):
+                    tasks.append(self._page(session, sem, symbol, tf, lo, hi))
+                    owners.append(i)
+            pages = await asyncio.gather(*tasks, return_exceptions=True)
+
+        rows: List[list] = [[] for _ in jobs]
+        for owner, page in zip(owners, pages):
+            if isinstance(page, BaseException):
+                if strict:
+                    raise page
+                logging.error(f"[DATA] Gagal mengunduh {jobs[owner][0]}: {page}")
+                continue
+            rows[owner].extend(page)
+        return [klines_to_frame(r) if r else pd.DataFrame() for r in rows]
+
+
+def _run(coro):
+    """Jalankan coroutine dari kode sinkron, juga bila loop sudah berjalan."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    with ThreadPoolExecutor(max_workers=1) as ex:
+        return ex.submit(asyncio.run, coro).result()
+
+
+def download_many(jobs: Sequence[Job], strict: bool = False, **kwargs) -> List[pd.DataFrame]:
+    """Versi sinkron :meth:`KlineDownloader.fetch_many`."""
+    if not jobs:
+        return []
+    return _run(KlineDownloader(**kwargs).fetch_many(jobs, strict=strict))
+
+
+def download_klines(symbol: str, tf: str, start_ms: int, end_ms: int, strict: bool = False, **kwargs) -> pd.DataFrame:
+    """Unduh satu simbol untuk rentang ``[start_ms, end_ms]``."""
+    return download_many([(symbol, tf, start_ms, end_ms)], strict=strict, **kwargs)[0]
+
+
+__all__ = [
+    "KlineDownloader",
+    "WeightLimiter",
+    "shared_limiter",
+    "download_klines",
+    "download_many",
+    "klines_to_frame",
+    "page_ranges",
+]
@@ -0,0 +1,80 @@
+"""Ring buffer OHLCV berbasis NumPy untuk data kline live."""
+from typing import Dict, Iterable, List
+
+import numpy as np
+import pandas as pd
+
+OHLCV_COLUMNS = ["open", "high", "low", "close", "volume"]
+
+
+def interval_to_ms(interval: str) -> int:
+    """Ubah interval Binance (``1m``, ``5m``, ``1h``, ``1d``) ke milidetik."""
+    unit = {"m": 60_000, "h": 3_600_000, "d": 86_400_000, "w": 604_800_000}
+    return int(interval[:-1]) * unit[interval[-1]]
+
+
+class OHLCVRingBuffer:
+    """Jendela bar tertutup berukuran tetap yang dialokasikan sekali.
+
+    Waktu disimpan sebagai open time (ms) dan tiap kolom sebagai float64.
+    ``append`` bernilai O(1); ``to_frame`` menyusun DataFrame kronologis.
+    """
+
+    def __init__(self, capacity: int, interval_ms: int, columns: Iterable[str] = OHLCV_COLUMNS) -> None:
+        self.capacity = capacity
+        self.interval_ms = interval_ms
+        self.columns: List[str] = list(columns)
+        self._col_idx = {c: i for i, c in enumerate(self.columns)}
+        self._times = np.zeros(capacity, dtype=np.int64)
+        self._values = np.full((capacity, len(self.columns)), np.nan, dtype=np.float64)
+        self._head = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def last_time(self) -> int | None:
+        if not self._size:
+            return None
+        return int(self._times[(self._head - 1) % self.capacity])
+
+    def missing_bars(self, open_time: int) -> int:
+        """Jumlah bar yang hilang antara bar terakhir dan ``open_time``."""
+        last = self.last_time
+        if last is None or open_time <= last:
+            return 0
+        return max(0, (open_time - last) // self.interval_ms - 1)
+
+    def append(self, open_time: int, row: Dict[str, float]) -> bool:
+        """Tambahkan bar baru; bar lama atau duplikat diabaikan."""
+        last = self.last_time
+        if last is not None and open_time <= last:
+            return False
+        slot = self._head
+        self._times[slot] = open_time
+        values = self._values[slot]
+        values.fill(np.nan)
+        for col, val in row.items():
+            idx = self._col_idx.get(col)
+            if idx is not None and val is not None:
+                values[idx] = val
+        self._head = (slot + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+        return True
+
+    def _order(self) -> np.ndarray:
+        start = (self._head - self._size) % self.capacity
+        return (start + np.arange(self._size)) % self.capacity
+
+    def to_frame(self) -> pd.DataFrame:
+        order = self._order()
+        index = pd.DatetimeIndex(pd.to_datetime(self._times[order], unit="ms"), name="timestamp")
+        return pd.DataFrame(self._values[order], index=index, columns=self.columns)
+
+    def clear(self) -> None:
+        self._head = 0
+        self._size = 0
+
+
+__all__ = ["OHLCVRingBuffer", "OHLCV_COLUMNS", "interval_to_ms"]
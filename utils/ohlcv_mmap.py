@@ -0,0 +1,90 @@
+"""Layout OHLCV memory-mapped per (simbol, timeframe).
+
+Tiap pasangan punya dua berkas ``.npy`` di samping store Parquet:
+
+- ``{SYM}_{tf}.values.npy``: float64 berbentuk ``(5, n)`` urutan
+  ``open, high, low, close, volume`` sehingga tiap kolom bersebelahan.
+- ``{SYM}_{tf}.index.npy``: int64 nanodetik open time, terurut naik.
+
+Berkas dibuka dengan ``mmap_mode="r"`` sehingga banyak proses berbagi page
+cache yang sama tanpa salinan; DataFrame yang dihasilkan bersifat read-only.
+"""
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from utils.ohlcv_store import load_ohlcv, store_path, csv_path
+
+OHLCV_COLUMNS = ["open", "high", "low", "close", "volume"]
+
+
+def mmap_paths(symbol: str, tf: str, root: Path | str | None = None) -> tuple[Path, Path]:
+    base = store_path(symbol, tf, root).with_suffix("")
+    return base.with_suffix(".values.npy"), base.with_suffix(".index.npy")
+
+
+def _save_atomic(path: Path, arr: np.ndarray) -> None:
+    tmp = path.with_suffix(".tmp")
+    with open(tmp, "wb") as f:
+        np.save(f, arr)
+    os.replace(tmp, path)
+
+
+def _source_mtime(symbol: str, tf: str, root: Path | str | None) -> float | None:
+    mtimes = [p.stat().st_mtime for p in (store_path(symbol, tf, root), csv_path(symbol, tf, root)) if p.exists()]
+    return max(mtimes) if mtimes else None
+
+
+def build_mmap(symbol: str, tf: str, root: Path | str | None = None, force: bool = False) -> bool:
+    """Bangun (ulang) berkas mmap dari store bila belum ada atau basi."""
+    values_path, index_path = mmap_paths(symbol, tf, root)
+    src_mtime = _source_mtime(symbol, tf, root)
+    if src_mtime is None:
+        return values_path.exists() and index_path.exists()
+    if (
+        not force
+        and values_path.exists()
+        and index_path.exists()
+        and min(values_path.stat().st_mtime, index_path.stat().st_mtime) >= src_mtime
+    ):
+        return True
+    df = load_ohlcv(symbol, tf, root=root)
+    if df is None:
+        return False
+    df = df.sort_index()
+    values = np.ascontiguousarray(df[OHLCV_COLUMNS].to_numpy(dtype=np.float64).T)
+    index = pd.DatetimeIndex(df.index).as_unit("ns").asi8.astype(np.int64)
+    _save_atomic(values_path, values)
+    _save_atomic(index_path, index)
+    return True
+
+
+def open_mmap(
+    symbol: str,
+    tf: str,
+    start: pd.Timestamp | str | None = None,
+    end: pd.Timestamp | str | None = None,
+    root: Path | str | None = None,
+) -> pd.DataFrame | None:
+    """Buka view read-only tanpa salinan untuk rentang ``[start, end]``."""
+    if not build_mmap(symbol, tf, root):
+        return None
+    values_path, index_path = mmap_paths(symbol, tf, root)
+    for _ in range(2):
+        values = np.load(values_path, mmap_mode="r")
+        index = np.load(index_path, mmap_mode="r")
+        if values.shape[1] == len(index):
+            break
+        # Penulis lain sedang mengganti berkas; bangun ulang sekali
+        build_mmap(symbol, tf, root, force=True)
+    else:
+        return None
+    lo = 0 if start is None else int(np.searchsorted(index, pd.Timestamp(start).as_unit("ns").value, "left"))
+    hi = len(index) if end is None else int(np.searchsorted(index, pd.Timestamp(end).as_unit("ns").value, "right"))
+    idx = pd.DatetimeIndex(index[lo:hi].view("datetime64[ns]"), name="timestamp")
+    return pd.DataFrame(values[:, lo:hi].T, index=idx, columns=OHLCV_COLUMNS, copy=False)
+
+
+__all__ = ["OHLCV_COLUMNS", "build_mmap", "open_mmap", "mmap_paths"]
@@ -0,0 +1,167 @@
+"""Penyimpanan OHLCV kolumnar (Parquet) untuk data historis.
+
+File ``data/historical_data/{tf}/{SYM}_{tf}.parquet`` menyimpan kolom
+``timestamp`` (timestamp int64) dan kolom numerik float64 dalam row group
+berurutan waktu, sehingga pembacaan rentang waktu hanya menyentuh row group
+yang relevan. CSV lama dimigrasikan otomatis saat pertama kali dibaca.
+Jika ``pyarrow`` tidak tersedia, modul ini kembali memakai CSV.
+"""
+import logging
+import os
+from pathlib import Path
+
+import pandas as pd
+
+try:  # pyarrow opsional
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except Exception:  # pragma: no cover
+    pa = pq = None
+
+DATA_ROOT = Path("data") / "historical_data"
+ROW_GROUP_SIZE = 50_000
+
+
+def csv_path(symbol: str, tf: str, root: Path | str | None = None) -> Path:
+    return Path(root or DATA_ROOT) / tf / f"{symbol}_{tf}.csv"
+
+
+def store_path(symbol: str, tf: str, root: Path | str | None = None) -> Path:
+    return Path(root or DATA_ROOT) / tf / f"{symbol}_{tf}.parquet"
+
+
+def _read_csv(path: Path) -> pd.DataFrame:
+    df = pd.read_csv(path)
+    df.columns = [c.lower() for c in df.columns]
+    df["timestamp"] = pd.to_datetime(df["timestamp"])
+    return df.sort_values("timestamp").set_index("timestamp")
+
+
+def write_frame(df: pd.DataFrame, path: Path | str) -> None:
+    """Tulis DataFrame ber-index ``timestamp`` ke Parquet secara atomik."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if pq is None:
+        df.to_csv(path.with_suffix(".csv"))
+        return
+    data = df.sort_index()
+    data.index.name = "timestamp"
+    table = pa.Table.from_pandas(data.reset_index(), preserve_index=False)
+    tmp = path.with_suffix(".parquet.tmp")
+    pq.write_table(table, tmp, row_group_size=ROW_GROUP_SIZE)
+    os.replace(tmp, path)
+
+
+def read_frame(
+    path: Path | str,
+    start: pd.Timestamp | str | None = None,
+    end: pd.Timestamp | str | None = None,
+) -> pd.DataFrame:
+    """Baca Parquet, opsional hanya baris ``start <= timestamp <= end``."""
+    filters = []
+    if start is not None:
+        filters.append(("timestamp", ">=", pd.Timestamp(start)))
+    if end is not None:
+        filters.append(("timestamp", "<=", pd.Timestamp(end)))
+    table = pq.read_table(path, filters=filters or None)
+    return table.to_pandas().set_index("timestamp")
+
+
+def frame_bounds(path: Path | str) -> tuple[pd.Timestamp, pd.Timestamp] | None:
+    """Waktu awal dan akhir dari metadata Parquet tanpa membaca data."""
+    meta = pq.ParquetFile(path).metadata
+    if meta.num_rows == 0:
+        return None
+    col = meta.schema.to_arrow_schema().get_field_index("timestamp")
+    lo = hi = None
+    for i in range(meta.num_row_groups):
+        stats = meta.row_group(i).column(col).statistics
+        if stats is None or not stats.has_min_max:
+            return None
+        lo = stats.min if lo is None else min(lo, stats.min)
+        hi = stats.max if hi is None else max(hi, stats.max)
+    return pd.Timestamp(lo), pd.Timestamp(hi)
+
+
+def migrate_csv(src: Path | str, dst: Path | str | None = None) -> Path | None:
+    """Konversi CSV ke Parquet bila Parquet belum ada atau lebih lama."""
+    src = Path(src)
+    dst = Path(dst) if dst else src.with_suffix(".parquet")
+    if pq is None or not src.exists():
+        return None
+    if dst.exists() and dst.stat().st_mtime >= src.stat().st_mtime:
+        return dst
+    try:
+        write_frame(_read_csv(src), dst)
+    except Exception as e:
+        logging.warning(f"Migrasi {src} ke Parquet gagal: {e}")
+        return None
+    logging.info(f"Data {src} dimigrasikan ke {dst}")
+    return dst
+
+
+def load_file(
+    path: Path | str,
+    start: pd.Timestamp | str | None = None,
+    end: pd.Timestamp | str | None = None,
+) -> pd.DataFrame:
+    """Muat berkas OHLCV (CSV atau Parquet) lewat store kolumnar."""
+    path = Path(path)
+    parquet = path if path.suffix == ".parquet" else migrate_csv(path)
+    if parquet is not None and parquet.exists():
+        return read_frame(parquet, start, end)
+    df = _read_csv(path)
+    if start is not None:
+        df = df[df.index >= pd.Timestamp(start)]
+    if end is not None:
+        df = df[df.index <= pd.Timestamp(end)]
+    return df
+
+
+def load_ohlcv(
+    symbol: str,
+    tf: str,
+    start: pd.Timestamp | str | None = None,
+    end: pd.Timestamp | str | None = None,
+    root: Path | str | None = None,
+) -> pd.DataFrame | None:
+    """Muat data simbol; ``None`` bila belum ada di disk."""
+    path = store_path(symbol, tf, root)
+    csv = csv_path(symbol, tf, root)
+    if not path.exists() and not csv.exists():
+        return None
+    return load_file(csv if csv.exists() else path, start, end)
+
+
+def ohlcv_bounds(symbol: str, tf: str, root: Path | str | None = None) -> tuple[pd.Timestamp, pd.Timestamp] | None:
+    """Rentang waktu data simbol di disk tanpa memuat seluruh isi."""
+    csv = csv_path(symbol, tf, root)
+    path = migrate_csv(csv) if csv.exists() else store_path(symbol, tf, root)
+    if path is not None and path.exists() and pq is not None:
+        return frame_bounds(path)
+    df = load_ohlcv(symbol, tf, root=root)
+    if df is None or df.empty:
+        return None
+    return df.index.min(), df.index.max()
+
+
+def save_ohlcv(symbol: str, tf: str, df: pd.DataFrame, root: Path | str | None = None) -> None:
+    """Simpan data simbol ke store.
+
+    CSV lama dibiarkan; karena lebih tua dari Parquet, ia tidak dipakai lagi.
+    """
+    write_frame(df, store_path(symbol, tf, root))
+
+
+__all__ = [
+    "DATA_ROOT",
+    "store_path",
+    "csv_path",
+    "load_ohlcv",
+    "load_file",
+    "save_ohlcv",
+    "ohlcv_bounds",
+    "migrate_csv",
+    "read_frame",
+    "write_frame",
+]
@@ -3,27 +3,183 @@ import json
 import tempfile
 import shutil
 import logging
-from typing import Any, List, Dict
+import threading
+from typing import Any, List, Dict, Tuple
 
 STATE_DIR = "./runtime_state"
 STATE_FILE = os.path.join(STATE_DIR, "active_trades.json")
 BACKUP_FILE = os.path.join(STATE_DIR, "active_trades.bak.json")
+# Jumlah record journal sebelum dipadatkan menjadi snapshot baru
+JOURNAL_COMPACT_EVERY = int(os.getenv("STATE_JOURNAL_COMPACT", 500))
+
+# Penulisan state diserialkan; versi naik tiap kali state berubah sehingga
+# pembaca in-memory (exit engine) tahu kapan perlu memuat ulang.
+state_lock = threading.RLock()
+_version = 0
+
+# State terakhir yang diketahui proses ini beserta jejak file-nya. Selama
+# file di disk tidak diubah pihak lain, save/load tidak perlu membaca ulang.
+_cache: Dict[str, Dict[str, Any]] | None = None
+_cache_stamp: Tuple | None = None
+_journal_records = 0
+# Nomor urut perubahan terakhir. Snapshot menyimpan nomor yang sudah
+# dicakupnya; record journal dengan nomor <= itu dilewati saat replay
+# sehingga journal lama yang gagal dikosongkan tidak diterapkan dua kali.
+_seq = 0
+
+
+def state_version() -> int:
+    """Nomor versi state di proses ini; berubah setiap save/delete."""
+    return _version
+
+
+def _bump() -> None:
+    global _version
+    _version += 1
+
+
+def journal_file() -> str:
+    """Lokasi journal delta, bersebelahan dengan ``STATE_FILE``."""
+    return os.path.splitext(STATE_FILE)[0] + ".journal"
+
+
+def trade_key(trade: Dict[str, Any]) -> str:
+    """Identitas posisi: ``order_id`` bila ada, selain itu simbol/sisi/waktu."""
+    order_id = trade.get("order_id")
+    if order_id:
+        return f"order:{order_id}"
+    return f"{trade.get('symbol')}|{trade.get('side')}|{trade.get('entry_time')}"
+
+
+def _stamp() -> Tuple:
+    out = []
+    for path in (STATE_FILE, journal_file()):
+        try:
+            st = os.stat(path)
+            out.append((st.st_mtime_ns, st.st_size))
+        except OSError:
+            out.append(None)
+    return (STATE_FILE, *out)
+
+
+def _remember(state: Dict[str, Dict[str, Any]], records: int) -> None:
+    global _cache, _cache_stamp, _journal_records
+    _cache = state
+    _journal_records = records
+    _cache_stamp = _stamp()
+
+
+def _current() -> Dict[str, Dict[str, Any]] | None:
+    """State di memori bila masih sama dengan disk, selain itu replay ulang."""
+    global _seq
+    if _cache is not None and _cache_stamp == _stamp():
+        return _cache
+    trades, records, seq = _replay()
+    _seq = max(_seq, seq)
+    state = {}
+    for trade in trades:
+        key = trade_key(trade)
+        if key in state:
+            return None  # kunci ganda: tidak bisa dijurnal, pakai snapshot penuh
+        state[key] = trade
+    _remember(state, records)
+    return state
+
+
+def _diff(old: Dict[str, Dict[str, Any]], new: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+    records = []
+    for key, trade in new.items():
+        before = old.get(key)
+        if before is None:
+            records.append({"op": "open", "key": key, "trade": trade})
+            continue
+        fields = {k: v for k, v in trade.items() if k not in before or before[k] != v}
+        removed = [k for k in before if k not in trade]
+        if removed:
+            records.append({"op": "open", "key": key, "trade": trade})
+        elif fields:
+            records.append({"op": "update", "key": key, "fields": fields})
+    records.extend({"op": "close", "key": key} for key in old if key not in new)
+    return records
+
+
+def _apply(state: Dict[str, Dict[str, Any]], record: Dict[str, Any]) -> None:
+    op, key = record.get("op"), record.get("key")
+    if op == "open":
+        state[key] = dict(record["trade"])
+    elif op == "update" and key in state:
+        state[key].update(record["fields"])
+    elif op == "close":
+        state.pop(key, None)
+
 
 def save_state(data: List[Dict[str, Any]]) -> None:
     """
-    Simpan state trading secara atomik dengan mekanisme:
-    1. Tulis ke temporary file
-    2. Atomic replace ke file utama
-    3. Buat backup copy
-    
+    Simpan state trading sebagai delta di journal append-only:
+    1. Bandingkan dengan state terakhir (open / update / close per posisi)
+    2. Tambahkan record delta ke journal dalam satu kali tulis
+    3. Padatkan ke snapshot atomik + backup bila snapshot belum ada atau
+       journal sudah melewati ``JOURNAL_COMPACT_EVERY`` record
+
     Args:
         data: Data state yang akan disimpan (list of dicts)
     """
     os.makedirs(STATE_DIR, exist_ok=True)
     if not (os.stat(STATE_DIR).st_mode & 0o200):
         raise RuntimeError("State directory tidak bisa ditulis")
+    with state_lock:
+        new = {}
+        for trade in data:
+            new.setdefault(trade_key(trade), dict(trade))
+        old = _current()
+        if old is None or not os.path.exists(STATE_FILE) or len(new) != len(data):
+            _compact(data)
+        else:
+            records = _diff(old, new)
+            if records and _journal_records + len(records) > JOURNAL_COMPACT_EVERY:
+                _compact(data)
+            elif records:
+                _append(records)
+                _remember(new, _journal_records + len(records))
+        _bump()
+
+
+def _append(records: List[Dict[str, Any]]) -> None:
+    global _seq
+    _seq += 1
+    lines = "".join(json.dumps(dict(r, seq=_seq), separators=(",", ":")) + "\n" for r in records)
+    try:
+        with open(journal_file(), "a") as f:
+            f.write(lines)
+    except (OSError, IOError, TypeError, ValueError) as e:
+        raise RuntimeError(f"Failed to save state: {str(e)}")
+
+
+def _compact(data: List[Dict[str, Any]]) -> None:
+    """Tulis snapshot penuh bernomor urut baru lalu kosongkan journal.
+
+    Bila proses mati sebelum journal dikosongkan, record lama bernomor
+    lebih kecil dari snapshot dan dilewati oleh :func:`_replay`.
+    """
+    global _seq
+    _seq += 1
+    _write_state({"seq": _seq, "trades": data})
+    _reset_journal()
+    state = {}
+    for trade in data:
+        state.setdefault(trade_key(trade), dict(trade))
+    _remember(state if len(state) == len(data) else None, 0)
+
+
+def _reset_journal() -> None:
+    try:
+        open(journal_file(), "w").close()
+    except OSError as e:
+        raise RuntimeError(f"Failed to save state: {str(e)}")
+
+
+def _write_state(data: Dict[str, Any]) -> None:
     tmp_path = None
-    
     try:
         # Stage 1: Tulis ke temp file
         with tempfile.NamedTemporaryFile(
@@ -51,28 +207,77 @@ def save_state(data: List[Dict[str, Any]]) -> None:
                 pass
         raise RuntimeError(f"Failed to save state: {str(e)}")
 
-def load_state() -> List[Dict[str, Any]]:
-    """
-    Muat state dari file dengan fallback ke backup.
-    
-    Returns:
-        List of trade dictionaries atau empty list jika gagal
-    """
+
+def _load_snapshot() -> Tuple[List[Dict[str, Any]], int]:
+    """Isi snapshot dan nomor urutnya; format lama (list polos) bernomor 0."""
     for filepath in [STATE_FILE, BACKUP_FILE]:
         if os.path.exists(filepath):
             try:
                 with open(filepath, "r") as f:
-                    return json.load(f)
-            except (json.JSONDecodeError, OSError, IOError, ValueError):
+                    data = json.load(f)
+                if isinstance(data, dict):
+                    return data["trades"], int(data.get("seq", 0))
+                return data, 0
+            except (json.JSONDecodeError, OSError, IOError, ValueError, KeyError, TypeError):
                 logging.error(f"Gagal load state dari {filepath}")
                 continue
-    return []
+    return [], 0
 
-def delete_state() -> None:
-    """Hapus semua file state dan backup."""
-    for filepath in (STATE_FILE, BACKUP_FILE):
+
+def _replay() -> Tuple[List[Dict[str, Any]], int, int]:
+    """Snapshot ditambah delta journal yang lebih baru; baris rusak dilewati.
+
+    Mengembalikan ``(trades, jumlah record journal, nomor urut terakhir)``.
+    """
+    trades, seq = _load_snapshot()
+    try:
+        with open(journal_file(), "r") as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return trades, 0, seq
+    if not lines:
+        return trades, 0, seq
+    state = {}
+    for trade in trades:
+        state.setdefault(trade_key(trade), trade)
+    if len(state) != len(trades):
+        return trades, len(lines), seq
+    last = seq
+    for n, line in enumerate(lines, 1):
         try:
-            if os.path.exists(filepath):
-                os.unlink(filepath)
-        except OSError:
-            pass
\ No newline at end of file
+            record = json.loads(line)
+            if record.get("seq", 0) <= seq:
+                continue  # sudah tercakup snapshot
+            _apply(state, record)
+            last = max(last, record["seq"])
+        except (json.JSONDecodeError, KeyError, TypeError, AttributeError):
+            # Biasanya baris terakhir yang terpotong karena proses mati
+            logging.error(f"Record journal state #{n} rusak, dilewati")
+    return list(state.values()), len(lines), last
+
+
+def load_state() -> List[Dict[str, Any]]:
+    """
+    Muat state: snapshot (fallback ke backup) lalu replay journal delta.
+    
+    Returns:
+        List of trade dictionaries atau empty list jika gagal
+    """
+    with state_lock:
+        state = _current()
+        if state is None:
+            return _replay()[0]
+        return [dict(t) for t in state.values()]
+
+def delete_state() -> None:
+    """Hapus semua file state, journal dan backup."""
+    global _cache, _cache_stamp, _journal_records
+    with state_lock:
+        for filepath in (STATE_FILE, BACKUP_FILE, journal_file()):
+            try:
+                if os.path.exists(filepath):
+                    os.unlink(filepath)
+            except OSError:
+                pass
+        _cache, _cache_stamp, _journal_records = None, None, 0
+        _bump()
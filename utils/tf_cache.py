@@ -0,0 +1,210 @@
+"""Cache timeframe turunan (5m/15m/1h/4h) dari data dasar 1m.
+
+Bar timeframe besar dibentuk dari bar dasar dengan agregasi OHLCV standar
+dan hanya bar yang sudah tutup yang disimpan. Ada dua bentuk:
+
+- Store di disk (:func:`update_derived` / :func:`load_timeframe`) untuk
+  backtest dan training. Pembaruan hanya membaca bar dasar setelah bar
+  turunan terakhir lalu menambahkan bar yang baru tutup.
+- :class:`TimeframeCache` di memori untuk live; tiap kline dasar yang tutup
+  memperbarui bucket berjalan dan menutup bar turunan tanpa REST.
+"""
+import logging
+from pathlib import Path
+from typing import Dict, Iterable, List
+
+import pandas as pd
+
+from utils.ohlcv_buffer import OHLCV_COLUMNS, OHLCVRingBuffer, interval_to_ms
+from utils.ohlcv_store import load_ohlcv, ohlcv_bounds, save_ohlcv
+
+BASE_TF = "1m"
+DERIVED_TFS = ("5m", "15m", "1h", "4h")
+AGG = {"open": "first", "high": "max", "low": "min", "close": "last", "volume": "sum"}
+WINDOW_SIZE = 100
+
+
+def _step(tf: str) -> pd.Timedelta:
+    return pd.Timedelta(milliseconds=interval_to_ms(tf))
+
+
+def resample_closed(df: pd.DataFrame, tf: str, base_tf: str | None = None) -> pd.DataFrame:
+    """Agregasikan ``df`` ke ``tf`` dan buang bucket yang belum tutup.
+
+    Bucket dianggap tutup bila waktu tutupnya tidak melewati waktu tutup bar
+    dasar terakhir. ``base_tf`` diperkirakan dari jarak antar bar bila tidak
+    diberikan. Bucket disejajarkan ke epoch seperti kline Binance.
+    """
+    cols = [c for c in AGG if c in df.columns]
+    if df.empty or not cols:
+        return pd.DataFrame(columns=cols, index=pd.DatetimeIndex([], name="timestamp"))
+    if base_tf is not None:
+        base_step = _step(base_tf)
+    elif len(df) > 1:
+        base_step = df.index.to_series().diff().median()
+    else:
+        base_step = pd.Timedelta(0)
+    step = _step(tf)
+    out = df[cols].resample(step, origin="epoch").agg({c: AGG[c] for c in cols})
+    out = out.dropna(subset=[cols[0]])
+    out = out[out.index + step <= df.index[-1] + base_step]
+    out.index.name = "timestamp"
+    return out
+
+
+def update_derived(
+    symbol: str,
+    tf: str,
+    base_tf: str = BASE_TF,
+    root: Path | str | None = None,
+) -> int | None:
+    """Tambahkan bar ``tf`` yang baru tutup dari store ``base_tf``.
+
+    Hanya bar dasar setelah bucket turunan terakhir yang dibaca. Bila store
+    turunan belum ada atau dimulai lebih lambat dari data dasar, seluruhnya
+    dibangun ulang. Mengembalikan jumlah bar baru, atau ``None`` bila data
+    dasar belum ada.
+    """
+    try:
+        base_bounds = ohlcv_bounds(symbol, base_tf, root)
+    except Exception:
+        base_bounds = None
+    if not base_bounds:
+        return None
+    step = _step(tf)
+    try:
+        bounds = ohlcv_bounds(symbol, tf, root)
+    except Exception:
+        bounds = None
+
+    start = None
+    if bounds and bounds[0] <= base_bounds[0] + step:
+        start = bounds[1] + step
+        if start + step > base_bounds[1] + _step(base_tf):
+            return 0
+    base = load_ohlcv(symbol, base_tf, start=start, root=root)
+    new = resample_closed(base, tf, base_tf)
+    if new.empty:
+        return 0
+    existing = load_ohlcv(symbol, tf, root=root) if bounds else None
+    if existing is not None and not existing.empty:
+        merged = pd.concat([existing[new.columns], new])
+        merged = merged[~merged.index.duplicated(keep="last")].sort_index()
+    else:
+        merged = new
+    save_ohlcv(symbol, tf, merged, root)
+    logging.info(f"[DATA] {symbol} {tf}: {len(new)} bar turunan dari {base_tf}")
+    return len(new)
+
+
+def load_timeframe(
+    symbol: str,
+    tf: str,
+    start: pd.Timestamp | str | None = None,
+    end: pd.Timestamp | str | None = None,
+    base_tf: str = BASE_TF,
+    root: Path | str | None = None,
+) -> pd.DataFrame | None:
+    """Muat ``tf`` dari store setelah disinkronkan dengan data dasar."""
+    if tf != base_tf and interval_to_ms(tf) > interval_to_ms(base_tf):
+        update_derived(symbol, tf, base_tf, root)
+    return load_ohlcv(symbol, tf, start, end, root)
+
+
+class TimeframeCache:
+    """Bar timeframe turunan yang diperbarui dari kline dasar live.
+
+    Tiap timeframe punya ring buffer bar tertutup dan satu bucket berjalan.
+    :meth:`append` menerima bar dasar yang sudah tutup dan mengembalikan
+    daftar timeframe yang barusan menutup bar baru.
+    """
+
+    def __init__(self, base_tf: str, tfs: Iterable[str] = DERIVED_TFS, maxlen: int = WINDOW_SIZE) -> None:
+        self.base_tf = base_tf
+        self.base_ms = interval_to_ms(base_tf)
+        self.tfs: List[str] = [
+            tf for tf in tfs
+            if interval_to_ms(tf) > self.base_ms and interval_to_ms(tf) % self.base_ms == 0
+        ]
+        self._bars: Dict[str, OHLCVRingBuffer] = {
+            tf: OHLCVRingBuffer(maxlen, interval_to_ms(tf)) for tf in self.tfs
+        }
+        self._partial: Dict[str, list | None] = {tf: None for tf in self.tfs}
+        self.last_time: int | None = None
+
+    def seeded(self, tf: str) -> bool:
+        return tf in self._bars and len(self._bars[tf]) > 0
+
+    def seed(self, tf: str, closed: pd.DataFrame, base: pd.DataFrame | None = None) -> None:
+        """Isi bar tertutup ``tf`` dan bucket berjalannya dari bar dasar.
+
+        ``base`` cukup berisi bar dasar sejak awal bucket berjalan; bar yang
+        sudah tercakup ``closed`` diabaikan.
+        """
+        buf = self._bars[tf]
+        buf.clear()
+        self._partial[tf] = None
+        for ts, row in zip(closed.index, closed[OHLCV_COLUMNS].to_dict("records")):
+            buf.append(int(ts.value // 1_000_000), row)
+        if base is not None and not base.empty:
+            for ts, row in zip(base.index, base[OHLCV_COLUMNS].to_dict("records")):
+                self._add(tf, int(ts.value // 1_000_000), row)
+            last = int(base.index[-1].value // 1_000_000)
+            self.last_time = max(self.last_time or last, last)
+
+    def seed_base(self, base: pd.DataFrame) -> None:
+        """Bangun semua timeframe dari bar dasar saja (mis. data historis)."""
+        for tf in self.tfs:
+            closed = resample_closed(base, tf, self.base_tf)
+            start = closed.index[-1] + _step(tf) if not closed.empty else None
+            rest = base if start is None else base[base.index >= start]
+            self.seed(tf, closed, rest)
+
+    def _add(self, tf: str, open_time: int, bar: Dict[str, float]) -> bool:
+        buf = self._bars[tf]
+        step = buf.interval_ms
+        bucket = open_time - open_time % step
+        if buf.last_time is not None and bucket <= buf.last_time:
+            return False
+        closed = False
+        part = self._partial[tf]
+        if part is not None and part[0] != bucket:
+            # Bucket lama tutup karena waktunya lewat walau ada bar yang hilang
+            closed = buf.append(part[0], dict(zip(OHLCV_COLUMNS, part[1:])))
+            part = None
+        if part is None:
+            part = [bucket, bar["open"], bar["high"], bar["low"], bar["close"], bar["volume"]]
+        else:
+            part[2] = max(part[2], bar["high"])
+            part[3] = min(part[3], bar["low"])
+            part[4] = bar["close"]
+            part[5] += bar["volume"]
+        self._partial[tf] = part
+        if open_time + self.base_ms >= bucket + step:
+            closed = buf.append(bucket, dict(zip(OHLCV_COLUMNS, part[1:]))) or closed
+            self._partial[tf] = None
+        return closed
+
+    def append(self, open_time: int, bar: Dict[str, float]) -> List[str]:
+        """Tambahkan bar dasar tertutup; kembalikan timeframe yang tutup."""
+        if self.last_time is not None and open_time <= self.last_time:
+            return []
+        self.last_time = open_time
+        return [tf for tf in self.tfs if self._add(tf, open_time, bar)]
+
+    def last_closed(self, tf: str) -> int | None:
+        """Open time (ms) bar ``tf`` tertutup terakhir."""
+        return self._bars[tf].last_time
+
+    def frame(self, tf: str) -> pd.DataFrame:
+        return self._bars[tf].to_frame()
+
+
+__all__ = [
+    "BASE_TF",
+    "DERIVED_TFS",
+    "TimeframeCache",
+    "load_timeframe",
+    "resample_closed",
+    "update_derived",
+]